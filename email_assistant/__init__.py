@@ -1,6 +1,14 @@
 """Email Assistant package."""
 
-from email_assistant.agent import graph
 from email_assistant.utils.state import GraphState
 
 __all__ = ["graph", "GraphState"]
+
+
+def __getattr__(name):
+    # The graph is built lazily so importing the package stays cheap.
+    if name == "graph":
+        from email_assistant.agent import get_compiled_graph
+
+        return get_compiled_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,15 +1,43 @@
 """Agent graph construction."""
 
+import threading
+
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
 
 
 from email_assistant.utils import GraphState
-from email_assistant.nodes import triage_router, agent_node, should_respond, should_continue, tool_node
+from email_assistant.utils.accounting import AccountingCallbackHandler
+from email_assistant.utils.metrics import MetricsCallbackHandler
+from email_assistant.nodes import (
+    speculative_triage_router,
+    aspeculative_triage_router,
+    agent_node,
+    aagent_node,
+    route_after_agent,
+    route_after_triage,
+    route_after_tools,
+    budget_exhausted,
+    tool_node,
+)
 
 
-def create_graph():
+def create_graph(checkpointer=None):
     """Create and compile the agent graph.
 
+    Building the graph is side-effect free: it never renders the diagram or
+    touches the filesystem. Use the ``render-graph`` command to produce
+    ``graph.png``.
+
+    Model-calling nodes carry a sync and an async implementation, so
+    ``invoke``/``stream`` and ``ainvoke``/``astream`` both run natively
+    (the latter without blocking the event loop). Token usage of every
+    model call is fed to the usage ledger (see ``utils.accounting``) and
+    node, model and tool latencies to the metrics registry (``utils.metrics``).
+
+    Args:
+        checkpointer: Optional checkpointer; deployments leave it to the platform.
+
     Returns:
         A compiled LangGraph graph.
     """
@@ -17,44 +45,83 @@ def create_graph():
     workflow = StateGraph(GraphState)
 
     # Add nodes
-    workflow.add_node("triage_router", triage_router)
-    workflow.add_node("agent", agent_node)
+    # Plain triage unless speculative drafting is enabled for the sender
+    workflow.add_node(
+        "triage_router", RunnableLambda(speculative_triage_router, afunc=aspeculative_triage_router)
+    )
+    workflow.add_node("agent", RunnableLambda(agent_node, afunc=aagent_node))
     workflow.add_node("tools", tool_node)
+    workflow.add_node("budget_exhausted", budget_exhausted)
 
     # Add edges
     # Start with triage to classify the email
     workflow.add_edge(START, "triage_router")
     
-    # Add conditional edge based on should_respond function
+    # Respond emails go to the agent, or straight to tools when a
+    # speculative draft already holds the agent's first response
     workflow.add_conditional_edges(
         "triage_router",
-        should_respond,
+        route_after_triage,
         {
-            True: "agent",
-            False: END
+            "agent": "agent",
+            "tools": "tools",
+            "budget_exhausted": "budget_exhausted",
+            "end": END
         }
     )
     
-    # Add conditional edge from agent to tools or end (ReAct loop)
+    # Add conditional edge from agent to tools or end (ReAct loop); the tool
+    # calls of a model call that spent the email's budget are not run
     workflow.add_conditional_edges(
         "agent",
-        should_continue,
+        route_after_agent,
         {
             "tools": "tools",
+            "budget_exhausted": "budget_exhausted",
             "end": END
         }
     )
     
-    # After tools execute, loop back to agent for next reasoning step
-    workflow.add_edge("tools", "agent")
-
-    # Compile the graph with memory
-    # Compile the graph without custom checkpointer (handled by platform)
-    graph = workflow.compile()
-    graph.get_graph().draw_mermaid_png(output_file_path="graph.png")
+    # After tools execute, loop back to agent for next reasoning step,
+    # unless the email has spent its call, token or time budget
+    workflow.add_conditional_edges(
+        "tools",
+        route_after_tools,
+        {
+            "agent": "agent",
+            "budget_exhausted": "budget_exhausted"
+        }
+    )
+    workflow.add_edge("budget_exhausted", END)
 
+    # Compile without a custom checkpointer by default (handled by platform)
+    graph = workflow.compile(checkpointer=checkpointer)
+    # Set the handlers on the graph's own config so it stays a CompiledStateGraph
+    graph.config = {**(graph.config or {}), "callbacks": [AccountingCallbackHandler(), MetricsCallbackHandler("agent")]}
     return graph
 
 
-# Create the graph instance
-graph = create_graph()
\ No newline at end of file
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_compiled_graph():
+    """Get the process-wide graph instance, building it on first use.
+
+    Returns:
+        The memoized compiled LangGraph graph.
+    """
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = create_graph()
+    return _graph
+
+
+def __getattr__(name):
+    # Keep `from email_assistant.agent import graph` working without
+    # building the graph when the module is imported.
+    if name == "graph":
+        return get_compiled_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
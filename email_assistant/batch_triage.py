@@ -0,0 +1,123 @@
+"""Batched triage: classify many emails with one model call per batch.
+
+Emails first go through the same shortcuts as ``triage_router`` (rules,
+caches, local classifier). The rest are packed into batches bounded by a
+token budget and an item count, each sent as a single structured-output call
+that carries the system prompt once. Decisions are matched back by index;
+emails whose decision is missing, duplicated or unparseable fall back to an
+individual router call.
+"""
+
+from langchain_core.runnables import RunnableConfig
+
+from email_assistant.helpers import parse_email, estimate_tokens
+from email_assistant.nodes.triage_router import invoke_router, lookup_shortcuts, remember_decision
+from email_assistant.prompts import (
+    compile_triage_system_prompt,
+    profile_from_config,
+    triage_batch_email,
+    triage_batch_user_prompt,
+    triage_user_prompt,
+)
+from email_assistant.utils.router import RouterSchema, get_llm_batch_router
+
+# Input tokens per batch, excluding the system prompt
+DEFAULT_MAX_BATCH_TOKENS = 6000
+
+# Emails per batch; bounds the size of the structured response
+DEFAULT_MAX_BATCH_SIZE = 20
+
+
+def _render(email: tuple) -> str:
+    author, to, subject, email_thread = email
+    return triage_user_prompt.format(author=author, to=to, subject=subject, email_thread=email_thread)
+
+
+def plan_batches(rendered: list, max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE) -> list:
+    """Split rendered emails into batches that respect the budgets.
+
+    Emails keep their order. An email larger than the token budget is sent in
+    a batch of its own.
+
+    Args:
+        rendered: Rendered user prompts, one per email.
+        max_batch_tokens: Estimated input tokens per batch.
+        max_batch_size: Emails per batch.
+
+    Returns:
+        List of batches, each a list of positions into ``rendered``.
+    """
+    batches, current, current_tokens = [], [], 0
+    for position, text in enumerate(rendered):
+        tokens = estimate_tokens(text)
+        if current and (current_tokens + tokens > max_batch_tokens or len(current) >= max_batch_size):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(position)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _invoke_batch(rendered: list, system_prompt: str) -> dict:
+    """Classify one batch; returns {position in batch: RouterSchema} for valid items."""
+    emails = "".join(triage_batch_email.format(index=i, email=text) for i, text in enumerate(rendered))
+    try:
+        response = get_llm_batch_router().invoke(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": triage_batch_user_prompt.format(count=len(rendered), emails=emails)},
+            ]
+        )
+    except Exception as e:
+        print(f"⚠️ Batch triage failed ({e}); classifying {len(rendered)} emails individually")
+        return {}
+
+    decisions, seen = {}, set()
+    for item in response.results:
+        if item.index in seen:
+            decisions.pop(item.index, None)  # ambiguous: fall back for this email
+        elif 0 <= item.index < len(rendered):
+            decisions[item.index] = RouterSchema(reasoning=item.reasoning, classification=item.classification)
+        seen.add(item.index)
+    return decisions
+
+
+def triage_batch(email_inputs: list, config: RunnableConfig = None,
+                 max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE) -> list:
+    """Classify a list of emails, batching the ones that need the model.
+
+    Args:
+        email_inputs: Email dictionaries, as accepted by the graph.
+        config: Optional run config; may carry a ``user_profile`` override.
+        max_batch_tokens: Estimated input tokens per model call.
+        max_batch_size: Emails per model call.
+
+    Returns:
+        One RouterSchema per email, in input order.
+    """
+    system_prompt = compile_triage_system_prompt(profile_from_config(config))
+    results = [None] * len(email_inputs)
+    pending = []  # (position, parsed email, audited neighbour)
+
+    for position, email_input in enumerate(email_inputs):
+        email = parse_email(email_input)
+        result, audited = lookup_shortcuts(email, system_prompt, email_input.get("headers"))
+        if result is not None:
+            results[position] = result
+        else:
+            pending.append((position, email, audited))
+
+    rendered = [_render(email) for _, email, _ in pending]
+    for batch in plan_batches(rendered, max_batch_tokens, max_batch_size):
+        decisions = _invoke_batch([rendered[i] for i in batch], system_prompt) if len(batch) > 1 else {}
+        for offset, i in enumerate(batch):
+            position, email, audited = pending[i]
+            result = decisions.get(offset) or invoke_router(email, system_prompt)
+            remember_decision(email, system_prompt, result, audited)
+            results[position] = result
+
+    return results
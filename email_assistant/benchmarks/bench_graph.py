@@ -0,0 +1,408 @@
+"""End-to-end throughput and overhead benchmark for both agent graphs.
+
+Runs ``email_assistant`` and ``email_assistant_hitl`` over a synthetic
+corpus built from the test email templates, with zero-latency fake models
+standing in for the router and the agent, so what is measured is the
+framework: graph scheduling, state merging, callbacks, tools and
+checkpointing. The HITL graph is driven through its interrupts with
+scripted resumes: drafted actions are accepted, and notify emails are
+alternately answered and ignored.
+
+Reported per graph:
+
+    - emails/sec at concurrency 1, 2, 4, ... up to ``--max-concurrency``
+    - mean time per node and mean graph overhead per email (time outside
+      the nodes), from the metrics registry, at concurrency 1
+    - checkpoint cost per node step: the time spent inside the
+      ``MemorySaver``'s reads and writes, timed directly, at concurrency 1
+    - peak traced memory of a pass at the highest concurrency
+
+``--output`` writes the results as JSON. ``--baseline`` compares against
+an earlier output and exits 1 when a figure regressed by more than
+``--tolerance``.
+
+Usage:
+    python -m email_assistant.benchmarks.bench_graph [--emails 200] [--max-concurrency 16]
+        [--output results.json] [--baseline baseline.json] [--tolerance 0.2]
+"""
+
+import argparse
+import asyncio
+import contextvars
+import importlib
+import json
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import Command
+
+from email_assistant.agent import create_graph
+from email_assistant.dataset import email_inputs, expected_tool_calls, triage_classifications
+from email_assistant.utils.metrics import MetricsRegistry, get_metrics, set_metrics
+from email_assistant.utils.router import RouterSchema
+from email_assistant_hitl.agent import create_graph as create_hitl_graph
+from email_assistant_hitl.utils.router import RouterSchema as HitlRouterSchema
+
+GRAPHS = ("agent", "agent_hitl")
+
+# Tags each synthetic email with its position; the template is position % templates
+REF = re.compile(r"\(ref (\d+)\)")
+
+# Arguments the fake agent passes to each tool
+TOOL_ARGS = {
+    "search_emails": {"query": "project status"},
+    "search_events": {"query": "1:1 meeting"},
+    "check_calendar_availability": {"day": "Thursday"},
+    "update_event": {"event_id": "evt-1", "new_date": "next Thursday"},
+}
+
+# Results where a higher value is better; every other figure is a cost
+HIGHER_IS_BETTER = ("emails_per_s",)
+
+
+def synthetic_corpus(size: int, start: int = 0) -> list:
+    """Copies of the test email templates, each with a unique subject.
+
+    Args:
+        size: Number of emails.
+        start: First reference number, so successive passes miss the triage cache.
+
+    Returns:
+        List of email dictionaries.
+    """
+    corpus = []
+    for ref in range(start, start + size):
+        template = email_inputs[ref % len(email_inputs)]
+        corpus.append({**template, "subject": f"{template['subject']} (ref {ref})"})
+    return corpus
+
+
+def _template(messages) -> int:
+    """Template index of the email a request is about."""
+    for message in messages:
+        content = message["content"] if isinstance(message, dict) else message.content
+        match = REF.search(str(content))
+        if match:
+            return int(match.group(1)) % len(email_inputs)
+    raise ValueError("Request carries no synthetic email reference")
+
+
+class FakeRouter:
+    """Zero-latency router that returns each template's expected classification."""
+
+    def __init__(self, schema):
+        self.schema = schema
+
+    def invoke(self, messages, config=None, **kwargs):
+        return self.schema(reasoning="synthetic", classification=triage_classifications[_template(messages)])
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        return self.invoke(messages)
+
+
+class FakeAgentModel:
+    """Zero-latency agent model that walks each template's expected tool calls.
+
+    It is stateless: the step is the number of tool results in the request.
+    After the expected tools it drafts a reply with ``write_email``, then
+    finishes with a plain message.
+    """
+
+    def invoke(self, messages, config=None, **kwargs):
+        template = _template(messages)
+        step = sum(1 for m in messages if getattr(m, "type", None) == "tool")
+        plan = expected_tool_calls[template]
+        if step < len(plan):
+            name, args = plan[step], TOOL_ARGS[plan[step]]
+        elif step == len(plan):
+            email = email_inputs[template]
+            name = "write_email"
+            args = {"to": email["author"], "subject": f"Re: {email['subject']}", "content": "Thanks, on it."}
+        else:
+            return AIMessage(content="Done")
+        return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{step}"}])
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        return self.invoke(messages)
+
+
+@contextmanager
+def fake_models():
+    """Route both graphs' model lookups to the fakes for the duration."""
+    agent_model = FakeAgentModel()
+    patches = [
+        ("email_assistant.nodes.triage_router", "get_llm_router", lambda: FakeRouter(RouterSchema)),
+        ("email_assistant.nodes.agent_node", "get_llm_router_with_tools", lambda *args: agent_model),
+        ("email_assistant_hitl.nodes.triage_router", "get_llm_router", lambda: FakeRouter(HitlRouterSchema)),
+        ("email_assistant_hitl.nodes.agent_node_hitl", "get_llm_with_tools_hitl", lambda *args: agent_model),
+    ]
+    originals = []
+    for module_name, attribute, fake in patches:
+        module = importlib.import_module(module_name)
+        originals.append((module, attribute, getattr(module, attribute)))
+        setattr(module, attribute, fake)
+    try:
+        yield
+    finally:
+        for module, attribute, original in originals:
+            setattr(module, attribute, original)
+
+
+class TimedSaver(MemorySaver):
+    """A ``MemorySaver`` that adds up the time spent reading and writing checkpoints.
+
+    The async methods delegate to the sync ones, so only the outermost call
+    of a task is timed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.seconds = 0.0
+        self._timing = contextvars.ContextVar("timing", default=False)
+
+    def _timed(self, method, *args, **kwargs):
+        if self._timing.get():
+            return method(*args, **kwargs)
+        token = self._timing.set(True)
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self._timing.reset(token)
+
+    async def _atimed(self, method, *args, **kwargs):
+        if self._timing.get():
+            return await method(*args, **kwargs)
+        token = self._timing.set(True)
+        start = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self._timing.reset(token)
+
+    def get_tuple(self, *args, **kwargs):
+        return self._timed(super().get_tuple, *args, **kwargs)
+
+    def put(self, *args, **kwargs):
+        return self._timed(super().put, *args, **kwargs)
+
+    def put_writes(self, *args, **kwargs):
+        return self._timed(super().put_writes, *args, **kwargs)
+
+    async def aget_tuple(self, *args, **kwargs):
+        return await self._atimed(super().aget_tuple, *args, **kwargs)
+
+    async def aput(self, *args, **kwargs):
+        return await self._atimed(super().aput, *args, **kwargs)
+
+    async def aput_writes(self, *args, **kwargs):
+        return await self._atimed(super().aput_writes, *args, **kwargs)
+
+
+def _resume(request: dict, ref: int) -> Command:
+    """Scripted reviewer: accept drafted actions; answer every other notify email."""
+    action = request["action_request"]["action"]
+    if action.startswith("Email Assistant:"):
+        if ref % 2 == 0:
+            return Command(resume=[{"type": "response", "args": "Please acknowledge."}])
+        return Command(resume=[{"type": "ignore", "args": ""}])
+    return Command(resume=[{"type": "accept", "args": ""}])
+
+
+async def run_email(graph, email: dict, checkpointed: bool):
+    """Run one email to completion, resuming every interrupt."""
+    ref = int(REF.search(email["subject"]).group(1))
+    config = {"configurable": {"thread_id": f"bench-{ref}"}} if checkpointed else None
+    result = await graph.ainvoke({"email_input": email}, config)
+    while checkpointed and result.get("__interrupt__"):
+        result = await graph.ainvoke(_resume(result["__interrupt__"][0].value[0], ref), config)
+    return result
+
+
+def run_pass(name: str, corpus: list, concurrency: int, checkpointed: bool = False) -> dict:
+    """Push a corpus through a fresh graph and collect its timings.
+
+    Args:
+        name: "agent" or "agent_hitl".
+        corpus: Emails to run.
+        concurrency: Emails in flight at once.
+        checkpointed: Compile the agent graph with a ``TimedSaver`` (the HITL
+            graph always has one).
+
+    Returns:
+        Dictionary with seconds, emails_per_s, checkpoint_seconds (time
+        inside the checkpointer) and the metrics snapshot.
+    """
+    saver = TimedSaver()
+    if name == "agent_hitl":
+        graph, checkpointed = create_hitl_graph(checkpointer=saver), True
+    else:
+        graph = create_graph(checkpointer=saver if checkpointed else None)
+    registry = MetricsRegistry()
+
+    async def run_all():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(email):
+            async with semaphore:
+                await run_email(graph, email, checkpointed)
+
+        await asyncio.gather(*(bounded(email) for email in corpus))
+
+    previous = get_metrics()
+    set_metrics(registry)
+    try:
+        start = time.perf_counter()
+        asyncio.run(run_all())
+        seconds = time.perf_counter() - start
+    finally:
+        set_metrics(previous)
+    return {
+        "seconds": seconds,
+        "emails_per_s": len(corpus) / seconds,
+        "checkpoint_seconds": saver.seconds,
+        "metrics": registry.snapshot(),
+    }
+
+
+def _histogram(snapshot: dict, metric: str, by: str = None) -> dict:
+    """Sum a histogram's series, keyed by one label (or "" for all of them)."""
+    totals = {}
+    for key, value in snapshot.get(metric, {}).items():
+        label = dict(key).get(by, "") if by else ""
+        count, total = totals.get(label, (0, 0.0))
+        totals[label] = (count + value["count"], total + value["sum"])
+    return totals
+
+
+def measure(emails: int = 200, max_concurrency: int = 16) -> dict:
+    """Benchmark both graphs.
+
+    Args:
+        emails: Emails per pass.
+        max_concurrency: Highest concurrency level of the scaling sweep.
+
+    Returns:
+        Results per graph, as written by ``--output``.
+    """
+    levels = [1]
+    while levels[-1] * 2 <= max_concurrency:
+        levels.append(levels[-1] * 2)
+    if levels[-1] != max_concurrency:
+        levels.append(max_concurrency)
+
+    results = {}
+    refs = iter(range(0, 10**9, emails))
+    with fake_models():
+        for name in GRAPHS:
+            run_pass(name, synthetic_corpus(min(emails, 20), next(refs)), 1)  # warm up
+
+            scaling = {str(c): run_pass(name, synthetic_corpus(emails, next(refs)), c)["emails_per_s"] for c in levels}
+
+            serial = run_pass(name, synthetic_corpus(emails, next(refs)), 1, checkpointed=False)
+            nodes = _histogram(serial["metrics"], "email_assistant_node_seconds", by="node")
+            steps = sum(count for count, _ in nodes.values())
+            overhead = _histogram(serial["metrics"], "email_assistant_graph_overhead_seconds")
+            overhead_count, overhead_sum = overhead.get("", (0, 0.0))
+            result = {
+                "emails": emails,
+                "emails_per_s": scaling,
+                "node_ms": {node: total / count * 1000 for node, (count, total) in sorted(nodes.items())},
+                "node_steps_per_email": steps / emails,
+                # Per graph run: one per email, or one per leg between HITL interrupts
+                "overhead_ms": overhead_sum / overhead_count * 1000 if overhead_count else 0.0,
+            }
+            # The HITL graph always checkpoints, so its serial pass already has the figures
+            checkpointed = serial
+            if name == "agent":
+                checkpointed = run_pass(name, synthetic_corpus(emails, next(refs)), 1, checkpointed=True)
+            checkpointed_steps = sum(
+                count for count, _ in _histogram(checkpointed["metrics"], "email_assistant_node_seconds", by="node").values()
+            )
+            result["checkpoint_ms_per_step"] = checkpointed["checkpoint_seconds"] / checkpointed_steps * 1000
+
+            tracemalloc.start()
+            try:
+                run_pass(name, synthetic_corpus(emails, next(refs)), max_concurrency)
+                result["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+            finally:
+                tracemalloc.stop()
+            results[name] = result
+    return results
+
+
+def _figures(results: dict) -> dict:
+    """Flatten results into {"graph.figure[.level]": value} for comparison."""
+    figures = {}
+    for name, result in results.items():
+        for level, value in result["emails_per_s"].items():
+            figures[f"{name}.emails_per_s.{level}"] = value
+        for figure in ("overhead_ms", "checkpoint_ms_per_step", "peak_memory_mb"):
+            if figure in result:
+                figures[f"{name}.{figure}"] = result[figure]
+    return figures
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.2) -> list:
+    """List the figures that regressed by more than ``tolerance`` against a baseline.
+
+    Figures missing from either side are skipped.
+    """
+    regressions = []
+    current, previous = _figures(results), _figures(baseline)
+    for figure, value in current.items():
+        before = previous.get(figure)
+        if not before:
+            continue
+        change = (value - before) / before
+        worse = -change if figure.split(".")[1] in HIGHER_IS_BETTER else change
+        if worse > tolerance:
+            regressions.append(f"{figure}: {before:.3f} -> {value:.3f} ({change:+.0%})")
+    return regressions
+
+
+def main(argv=None) -> int:
+    """Run the graph benchmark, print a summary and check it against a baseline."""
+    parser = argparse.ArgumentParser(description="Measure end-to-end graph throughput and overhead.")
+    parser.add_argument("--emails", type=int, default=200, help="Emails per pass")
+    parser.add_argument("--max-concurrency", type=int, default=16, help="Highest concurrency of the scaling sweep")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results written earlier with --output")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression per figure")
+    args = parser.parse_args(argv)
+
+    results = measure(args.emails, args.max_concurrency)
+    for name, result in results.items():
+        print(f"{name}:")
+        scaling = "  ".join(f"{level}: {rate:7.1f}" for level, rate in result["emails_per_s"].items())
+        print(f"  emails/sec by concurrency   {scaling}")
+        for node, ms in result["node_ms"].items():
+            print(f"  node {node:<24} {ms:8.3f} ms")
+        print(f"  graph overhead per run      {result['overhead_ms']:8.3f} ms")
+        if "checkpoint_ms_per_step" in result:
+            print(f"  checkpoint per node step    {result['checkpoint_ms_per_step']:8.3f} ms")
+        print(f"  peak memory                 {result['peak_memory_mb']:8.1f} MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
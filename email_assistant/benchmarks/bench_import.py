@@ -0,0 +1,92 @@
+"""Import-time benchmark for the email assistant packages.
+
+Each sample runs in a fresh interpreter so module caches do not hide the
+cold-start cost. An audit hook counts socket connections and file writes
+while the package is imported, which must both be zero, and the graph is
+then built once to show the cost that moved to first use.
+
+Usage:
+    python -m email_assistant.benchmarks.bench_import [--runs 10]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+MODULES = ["email_assistant", "email_assistant_hitl"]
+
+# Runs inside the child interpreter; prints one JSON line.
+_PROBE = """
+import json, sys, time
+
+io_events = []
+
+def _audit(event, args):
+    if event == "socket.connect":
+        io_events.append(event)
+    elif event == "open" and len(args) > 1 and isinstance(args[1], str) and set(args[1]) & set("wax+"):
+        io_events.append(f"open:{{args[0]}}")
+
+sys.addaudithook(_audit)
+
+start = time.perf_counter()
+module = __import__({module!r})
+import_s = time.perf_counter() - start
+import_io = list(io_events)
+
+start = time.perf_counter()
+module.graph
+build_s = time.perf_counter() - start
+
+print(json.dumps({{"import_s": import_s, "build_s": build_s, "import_io": import_io}}))
+"""
+
+
+def run_sample(module: str) -> dict:
+    """Import a module in a fresh interpreter and time it.
+
+    Args:
+        module: Top-level package to import.
+
+    Returns:
+        Dictionary with import_s, build_s and the I/O events seen during import.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    """Run the import-time benchmark and print a summary per package."""
+    parser = argparse.ArgumentParser(description="Measure package import time.")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per package")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in MODULES:
+        samples = [run_sample(module) for _ in range(args.runs)]
+        import_ms = [s["import_s"] * 1000 for s in samples]
+        build_ms = [s["build_s"] * 1000 for s in samples]
+        io_events = sorted({e for s in samples for e in s["import_io"]})
+        failed = failed or bool(io_events)
+
+        print(f"{module}:")
+        print(f"  import        median {statistics.median(import_ms):8.1f} ms   max {max(import_ms):8.1f} ms")
+        print(f"  first graph   median {statistics.median(build_ms):8.1f} ms   max {max(build_ms):8.1f} ms")
+        print(f"  import I/O    {io_events or 'none'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
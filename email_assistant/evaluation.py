@@ -0,0 +1,204 @@
+"""Concurrent, cached evaluation of triage and agent behavior.
+
+An evaluation case is an email with its expected classification and the
+tools the agent is expected to call (the ``email_assistant.dataset`` cases by
+default). Cases run through ``graph.ainvoke`` on a fixed pool of async
+workers, so at most ``concurrency`` are in flight, and are scored the way
+the triage and agent tests score them: the classification must match, and
+every expected tool must have been called.
+
+Outcomes are cached in a JSONL file keyed by the email, the prompt version
+(the rendered triage and agent prompts) and the models. A rerun only
+evaluates the cases whose email, prompts or models changed; expectations
+are applied at scoring time, so editing them never invalidates the cache.
+``report`` breaks accuracy and latency down per expected classification and
+per expected tool set.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+
+from email_assistant.prompts import compile_agent_system_prompt, compile_triage_system_prompt, triage_user_prompt
+from email_assistant.dataset import email_inputs, expected_tool_calls, triage_classifications
+from email_assistant.utils.model_tiers import get_tier_selector
+from email_assistant.utils.router import AGENT_MODEL, ROUTER_MODEL, tools
+from email_assistant.utils.stats import latency_summary
+from email_assistant.utils.triage_cache import triage_prompt_version
+
+DEFAULT_CONCURRENCY = 8
+
+# Fields of a failed case listed in the report
+FAILURE_FIELDS = ("subject", "expected_classification", "classification", "missing_tools", "error")
+
+
+def default_cases() -> list:
+    """The evaluation cases of the triage and agent test data."""
+    return [
+        {"email_input": email_input, "classification": classification, "tools": expected}
+        for email_input, classification, expected in zip(email_inputs, triage_classifications, expected_tool_calls)
+    ]
+
+
+def read_cases(path) -> list:
+    """Read cases from a JSONL file: ``{"email_input", "classification", "tools"}`` per line."""
+    cases = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                cases.append({**record, "tools": record.get("tools") or []})
+    return cases
+
+
+def prompt_version() -> str:
+    """Version of the rendered triage and agent prompts."""
+    return triage_prompt_version(compile_triage_system_prompt(), triage_user_prompt, compile_agent_system_prompt(tools))
+
+
+def eval_models() -> list:
+    """The router model, then every model the agent loop may use."""
+    selector = get_tier_selector()
+    return [ROUTER_MODEL, *(selector.models if selector is not None else (AGENT_MODEL,))]
+
+
+def case_key(email_input: dict, version: str, models: list) -> str:
+    """Cache key of a case: the email, the prompt version and the models."""
+    payload = json.dumps([email_input, version, models], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class EvalCache:
+    """Case outcomes on disk, one JSON line per evaluated case."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._entries = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._entries[record["key"]] = record["outcome"]
+
+    def get(self, key: str):
+        """Return a cached outcome, or None."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: str, outcome: dict):
+        """Store an outcome; later lines win when the file is read back."""
+        line = json.dumps({"key": key, "outcome": outcome})
+        with self._lock:
+            self._entries[key] = outcome
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+
+def outcome(state: dict, seconds: float) -> dict:
+    """The parts of a final graph state a case is scored on."""
+    messages = state.get("messages") or []
+    called = {call["name"] for message in messages for call in (getattr(message, "tool_calls", None) or [])}
+    return {
+        "classification": state.get("classification_decision"),
+        "tools": sorted(called),
+        "latency_s": seconds,
+    }
+
+
+def score(case: dict, result: dict) -> dict:
+    """Score an outcome against a case's expectations."""
+    called = {name.lower() for name in result.get("tools", [])}
+    missing = [name for name in case["tools"] if name.lower() not in called]
+    return {
+        "subject": case["email_input"].get("subject"),
+        "expected_classification": case["classification"],
+        "expected_tools": case["tools"],
+        **result,
+        "classification_correct": result.get("classification") == case["classification"],
+        "missing_tools": missing,
+        "tools_correct": "error" not in result and not missing,
+    }
+
+
+async def evaluate(cases: list, graph, concurrency: int = DEFAULT_CONCURRENCY, cache: EvalCache = None) -> list:
+    """Run every case not in the cache through the graph with bounded concurrency.
+
+    Args:
+        cases: Cases as returned by ``default_cases`` or ``read_cases``.
+        graph: Compiled graph exposing ``ainvoke``.
+        concurrency: Maximum number of cases in flight.
+        cache: Where outcomes are looked up and stored; None evaluates every case.
+
+    Returns:
+        One scored record per case, in case order; ``cached`` tells which
+        were served from the cache. A case whose run failed carries ``error``.
+    """
+    version, models = prompt_version(), eval_models()
+    results = [None] * len(cases)
+    queue = asyncio.Queue()
+    for index, case in enumerate(cases):
+        key = case_key(case["email_input"], version, models)
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            results[index] = {**score(case, cached), "cached": True}
+        else:
+            queue.put_nowait((index, key, case))
+
+    async def worker():
+        while not queue.empty():
+            index, key, case = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                state = await graph.ainvoke(
+                    {"email_input": case["email_input"]}, {"configurable": {"thread_id": f"eval-{key}"}}
+                )
+            except Exception as e:
+                # Failed runs are reported but never cached, so the next run retries them
+                result = {**outcome({}, time.perf_counter() - start), "error": f"{type(e).__name__}: {e}"}
+            else:
+                result = outcome(state, time.perf_counter() - start)
+                if cache is not None:
+                    cache.set(key, result)
+            results[index] = {**score(case, result), "cached": False}
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, queue.qsize()))))
+    return results
+
+
+def _group(records: list) -> dict:
+    answered = [r for r in records if "error" not in r]
+    return {
+        "cases": len(records),
+        "cached": sum(r["cached"] for r in records),
+        "errors": len(records) - len(answered),
+        "classification_accuracy": sum(r["classification_correct"] for r in records) / len(records),
+        "tool_accuracy": sum(r["tools_correct"] for r in records) / len(records),
+        "latency": latency_summary([r["latency_s"] for r in answered]),
+    }
+
+
+def report(records: list) -> dict:
+    """Accuracy and latency overall, per expected classification and per expected tool set.
+
+    Latencies of cached cases are those measured when they were evaluated.
+    """
+    by_classification, by_tools = {}, {}
+    for record in records:
+        by_classification.setdefault(record["expected_classification"], []).append(record)
+        by_tools.setdefault("+".join(record["expected_tools"]) or "(none)", []).append(record)
+    return {
+        "overall": _group(records) if records else {},
+        "by_classification": {name: _group(group) for name, group in sorted(by_classification.items())},
+        "by_tools": {name: _group(group) for name, group in sorted(by_tools.items())},
+        "failures": [
+            {key: r[key] for key in FAILURE_FIELDS if key in r}
+            for r in records
+            if not (r["classification_correct"] and r["tools_correct"])
+        ],
+    }
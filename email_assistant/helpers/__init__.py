@@ -3,9 +3,11 @@
 from email_assistant.helpers.email_parser import parse_email
 from email_assistant.helpers.email_formatter import format_email_markdown
 from email_assistant.helpers.tools_formatter import format_tools
+from email_assistant.helpers.tokens import estimate_tokens
 
 __all__ = [
     "parse_email",
     "format_email_markdown",
     "format_tools",
+    "estimate_tokens",
 ]
\ No newline at end of file
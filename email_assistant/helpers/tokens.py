@@ -0,0 +1,16 @@
+"""Token estimation utilities."""
+
+# Average characters per token for English text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a text without loading a tokenizer.
+
+    Args:
+        text: The text to measure.
+
+    Returns:
+        Approximate token count (at least 1)
+    """
+    return len(text or "") // CHARS_PER_TOKEN + 1
@@ -0,0 +1,193 @@
+"""Bulk processing of an inbox through the agent graph.
+
+Emails are streamed from a JSONL file, an mbox file or a Maildir directory
+and run through ``graph.ainvoke`` by a fixed pool of async workers, so at
+most ``concurrency`` emails are in flight. Each email gets its own
+``thread_id`` and its result is appended to a JSONL output as soon as it
+finishes. Records carry the email's input offset; resuming skips every
+offset already completed in the output.
+"""
+
+import asyncio
+import email
+import json
+import mailbox
+import time
+from collections import Counter
+from email import policy
+from pathlib import Path
+
+from email_assistant.utils.speculation import get_speculation_policy
+from email_assistant.utils.stats import latency_summary
+
+DEFAULT_CONCURRENCY = 8
+
+
+def detect_format(path) -> str:
+    """Guess the input format: "maildir", "mbox" or "jsonl"."""
+    path = Path(path)
+    if path.is_dir():
+        return "maildir"
+    if path.suffix in (".mbox", ".mbx"):
+        return "mbox"
+    with open(path, "rb") as f:
+        return "mbox" if f.read(5) == b"From " else "jsonl"
+
+
+def message_to_email_input(message) -> dict:
+    """Convert a parsed RFC 5322 message into the graph's email input dict."""
+    body = message.get_body(preferencelist=("plain", "html"))
+    return {
+        "id": message.get("Message-ID", ""),
+        "author": message.get("From", ""),
+        "to": message.get("To", ""),
+        "subject": message.get("Subject", ""),
+        "email_thread": body.get_content() if body is not None else "",
+        "headers": {name: str(value) for name, value in message.items()},
+    }
+
+
+def read_inbox(path, fmt: str = "auto"):
+    """Stream emails from an inbox file or directory.
+
+    Args:
+        path: JSONL file, mbox file or Maildir directory.
+        fmt: "jsonl", "mbox", "maildir" or "auto" to detect it.
+
+    Yields:
+        Tuples of (offset, email input dict), offsets counting from 0 in a
+        stable order (file order; sorted keys for Maildir).
+    """
+    fmt = detect_format(path) if fmt == "auto" else fmt
+    if fmt == "jsonl":
+        with open(path) as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield offset, record.get("email_input", record)
+                    offset += 1
+        return
+
+    if fmt == "mbox":
+        box = mailbox.mbox(path, create=False)
+    elif fmt == "maildir":
+        box = mailbox.Maildir(path, factory=None, create=False)
+    else:
+        raise ValueError(f"Unknown inbox format: {fmt}")
+    try:
+        keys = box.keys() if fmt == "mbox" else sorted(box.keys())
+        for offset, key in enumerate(keys):
+            message = email.message_from_bytes(box.get_bytes(key), policy=policy.default)
+            yield offset, message_to_email_input(message)
+    finally:
+        box.close()
+
+
+def completed_offsets(output_path) -> set:
+    """Return the offsets that finished without error in an existing output."""
+    done = set()
+    if Path(output_path).exists():
+        with open(output_path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    if "error" not in record:
+                        done.add(record["offset"])
+    return done
+
+
+def result_record(offset: int, thread_id: str, email_input: dict, state: dict, seconds: float) -> dict:
+    """Summarize a final graph state as a JSON-serializable output record."""
+    messages = state.get("messages") or []
+    last = messages[-1] if messages else None
+    return {
+        "offset": offset,
+        "thread_id": thread_id,
+        "email_input": email_input,
+        "classification_decision": state.get("classification_decision"),
+        "response": getattr(last, "content", None) if getattr(last, "type", None) == "ai" else None,
+        "tool_calls": [
+            call["name"] for message in messages for call in (getattr(message, "tool_calls", None) or [])
+        ],
+        "latency_s": seconds,
+    }
+
+
+async def process_inbox(
+    emails,
+    output,
+    graph,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    skip=frozenset(),
+    thread_prefix: str = "inbox",
+) -> dict:
+    """Run every email through the graph with bounded concurrency.
+
+    Args:
+        emails: Iterable of (offset, email input) pairs, e.g. ``read_inbox``.
+        output: Writable text file; one JSON record is appended per email.
+        graph: Compiled graph exposing ``ainvoke``.
+        concurrency: Maximum number of emails in flight.
+        skip: Offsets to leave out (already completed).
+        thread_prefix: Prefix of the per-email ``thread_id``.
+
+    Returns:
+        Report with throughput, per-classification counts and latency
+        percentiles.
+    """
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    counts, latencies = Counter(), []
+    skipped = 0
+
+    async def worker():
+        while (item := await queue.get()) is not None:
+            offset, email_input = item
+            thread_id = f"{thread_prefix}-{offset}"
+            start = time.perf_counter()
+            try:
+                state = await graph.ainvoke(
+                    {"email_input": email_input}, {"configurable": {"thread_id": thread_id}}
+                )
+            except Exception as e:
+                counts["error"] += 1
+                record = {"offset": offset, "thread_id": thread_id, "error": f"{type(e).__name__}: {e}"}
+            else:
+                seconds = time.perf_counter() - start
+                latencies.append(seconds)
+                record = result_record(offset, thread_id, email_input, state, seconds)
+                counts[record["classification_decision"]] += 1
+            # Workers share the event loop thread, so whole lines never interleave
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+
+    start = time.perf_counter()
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        for offset, email_input in emails:
+            if offset in skip:
+                skipped += 1
+                continue
+            await queue.put((offset, email_input))
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+    elapsed = time.perf_counter() - start
+
+    processed = sum(counts.values())
+    report = {
+        "emails": processed,
+        "skipped": skipped,
+        "errors": counts.pop("error", 0),
+        "elapsed_s": elapsed,
+        "emails_per_s": processed / elapsed if elapsed else 0.0,
+        "classifications": dict(counts),
+        "latency": latency_summary(latencies),
+    }
+    speculation = get_speculation_policy()
+    if speculation is not None:
+        report["speculation"] = speculation.stats()
+    return report
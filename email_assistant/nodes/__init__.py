@@ -1,14 +1,30 @@
 """Node functions for the email assistant graph."""
 
-from email_assistant.nodes.triage_router import triage_router
-from email_assistant.nodes.agent_node import agent_node
+from email_assistant.nodes.triage_router import triage_router, atriage_router
+from email_assistant.nodes.agent_node import agent_node, aagent_node
 from email_assistant.nodes.tool_node import tool_node
-from email_assistant.nodes.routing import should_respond, should_continue
+from email_assistant.nodes.speculative_triage import speculative_triage_router, aspeculative_triage_router
+from email_assistant.nodes.budget_node import budget_exhausted
+from email_assistant.nodes.routing import (
+    should_respond,
+    should_continue,
+    route_after_agent,
+    route_after_triage,
+    route_after_tools,
+)
 
 __all__ = [
     "triage_router",
+    "atriage_router",
     "agent_node",
+    "aagent_node",
     "tool_node",
+    "speculative_triage_router",
+    "aspeculative_triage_router",
     "should_respond",
     "should_continue",
+    "route_after_agent",
+    "route_after_triage",
+    "route_after_tools",
+    "budget_exhausted",
 ]
\ No newline at end of file
@@ -1,40 +1,154 @@
 """Agent node for email response reasoning and tool calling."""
 
+import time
+
+from langchain_core.runnables import RunnableConfig
+
 from email_assistant.utils.state import GraphState
 from email_assistant.utils.router import get_llm_router_with_tools, tools
-from email_assistant.helpers import format_tools
-from email_assistant.prompts import (
-    agent_system_prompt,
-    AGENT_TOOLS_PROMPT,
-    default_background,
-    default_response_preferences,
-    default_cal_preferences,
-)
+from email_assistant.utils.context_window import get_context_window
+from email_assistant.utils.budget import call_tokens, charge, start_usage
+from email_assistant.utils.hedging import get_hedging_policy
+from email_assistant.utils.model_tiers import get_tier_selector, tool_errors
+from email_assistant.tools import READ_ONLY_TOOLS
+from email_assistant.helpers import parse_email
+from email_assistant.prompts import compile_agent_system_prompt, profile_from_config
+
 
+def agent_messages(state: GraphState, config: RunnableConfig = None) -> list:
+    """Build the agent model input: the system prompt followed by the conversation."""
+    # System prompt with all preferences, rendered once per profile and tool set
+    system_message = {
+        "role": "system",
+        "content": compile_agent_system_prompt(tools, profile_from_config(config)),
+    }
+    return [system_message] + state["messages"]
+
+
+def fit_context(messages: list) -> tuple:
+    """Fit a request to the context budget; state keeps the full history.
+
+    Returns:
+        A tuple of (messages to send, report or None when the window is off).
+    """
+    window = get_context_window()
+    if window is None:
+        return messages, None
+    return window.fit(messages)
 
-def agent_node(state: GraphState) -> GraphState:
+
+def record_context(response, report):
+    """Record on the response what its request dropped to fit the budget."""
+    if report is not None:
+        response.response_metadata["context_window"] = report
+    return response
+
+
+def read_only_step(messages: list) -> bool:
+    """Whether every tool call made so far in the conversation was read-only."""
+    return all(
+        call["name"] in READ_ONLY_TOOLS for message in messages for call in getattr(message, "tool_calls", None) or ()
+    )
+
+
+def agent_hedging(messages: list):
+    """Return the hedging policy if this agent step may be hedged, else None."""
+    hedging = get_hedging_policy()
+    if hedging is not None and hedging.agent and read_only_step(messages):
+        return hedging
+    return None
+
+
+def model_tier(state: GraphState):
+    """Pick the model tier of this agent step.
+
+    The first step scores the email; later steps keep its tier and escalate
+    on tool failures.
+
+    Returns:
+        The {"initial", "tier"} to keep in state, or None when tiering is off.
+    """
+    selector = get_tier_selector()
+    if selector is None:
+        return None
+    current = state.get("model_tier")
+    if not current:
+        tier = selector.select(parse_email(state["email_input"]), state.get("triage_reasoning") or "")
+        current = {"initial": tier, "tier": tier}
+    return selector.escalate(current, tool_errors(state["messages"]))
+
+
+def tier_model(tier):
+    """The model name of a tier, or None (the default model) when tiering is off."""
+    return None if tier is None else get_tier_selector().models[tier["tier"]]
+
+
+def agent_update(usage: dict, messages: list, response, tier, seconds: float) -> dict:
+    """Build the agent node's state update and record the call against its tier."""
+    update = {"messages": [response], "budget_usage": charge(usage, messages, response)}
+    if tier is not None:
+        get_tier_selector().record_call(tier["tier"], call_tokens(messages, response), seconds)
+        update["model_tier"] = tier
+    return update
+
+
+def invoke_agent(messages: list, model_name: str = None):
+    """Call the tool-calling agent model on prepared messages.
+
+    Steps that have only made read-only tool calls so far are hedged when
+    agent hedging is on.
+
+    Args:
+        messages: The request, before fitting it to the context budget.
+        model_name: The model of the step's tier; the default model if None.
+
+    Returns:
+        Tuple of (response, the fitted messages that were sent), so callers
+        charge budgets on what the model actually received.
+    """
+    messages, report = fit_context(messages)
+    llm = get_llm_router_with_tools() if model_name is None else get_llm_router_with_tools(model_name)
+    hedging = agent_hedging(messages)
+    if hedging is None:
+        return record_context(llm.invoke(messages), report), messages
+    return record_context(hedging.call("agent", lambda: llm.invoke(messages), messages), report), messages
+
+
+async def ainvoke_agent(messages: list, model_name: str = None):
+    """Async variant of ``invoke_agent``."""
+    messages, report = fit_context(messages)
+    llm = get_llm_router_with_tools() if model_name is None else get_llm_router_with_tools(model_name)
+    hedging = agent_hedging(messages)
+    if hedging is None:
+        return record_context(await llm.ainvoke(messages), report), messages
+    return record_context(await hedging.acall("agent", lambda: llm.ainvoke(messages), messages), report), messages
+
+
+def agent_node(state: GraphState, config: RunnableConfig = None) -> GraphState:
     """Agent reasoning node where the LLM decides which actions to take.
 
     Args:
         state: The current graph state containing messages.
+        config: The run config; may carry a ``user_profile`` override.
 
     Returns:
-        A dictionary with the LLM's response message (may include tool calls).
+        A dictionary with the LLM's response message (may include tool calls),
+        the email's budget usage including this call and, with model tiering
+        on, the email's model tier.
     """
-    tools_prompt = AGENT_TOOLS_PROMPT.format(tools_descriptions=format_tools(tools))
-    
-    # Build the system prompt with all preferences
-    system_message = {
-        "role": "system",
-        "content": agent_system_prompt.format(
-            tools_prompt=tools_prompt,
-            background=default_background,
-            response_preferences=default_response_preferences,
-            cal_preferences=default_cal_preferences,
-        ),
-    }
+    usage = state.get("budget_usage") or start_usage()
+    messages = agent_messages(state, config)
+    tier = model_tier(state)
+    start = time.perf_counter()
+    response, sent = invoke_agent(messages, tier_model(tier))
+    return agent_update(usage, sent, response, tier, time.perf_counter() - start)
 
-    llm_with_tools = get_llm_router_with_tools()
-    response = llm_with_tools.invoke([system_message] + state["messages"])
 
-    return {"messages": [response]}
\ No newline at end of file
+async def aagent_node(state: GraphState, config: RunnableConfig = None) -> GraphState:
+    """Async variant of ``agent_node``, used by ``graph.ainvoke``/``astream``."""
+    usage = state.get("budget_usage") or start_usage()
+    messages = agent_messages(state, config)
+    tier = model_tier(state)
+    start = time.perf_counter()
+    response, sent = await ainvoke_agent(messages, tier_model(tier))
+    return agent_update(usage, sent, response, tier, time.perf_counter() - start)
@@ -1,5 +1,8 @@
 """Routing functions for conditional edges in the graph."""
 
+from langchain_core.runnables import RunnableConfig
+
+from email_assistant.utils.budget import budget_from_config
 from email_assistant.utils.state import GraphState
 
 
@@ -40,4 +43,55 @@ def should_continue(state: GraphState) -> str:
     if hasattr(last_message, "tool_calls") and last_message.tool_calls:
         return "tools"
     
-    return "end"
\ No newline at end of file
+    return "end"
+
+
+def route_after_agent(state: GraphState, config: RunnableConfig = None) -> str:
+    """Run the agent's tool calls unless the call that made them spent the budget.
+
+    Args:
+        state: The current graph state.
+        config: The run config; may carry an ``email_budget`` override.
+
+    Returns:
+        "tools", "end", or "budget_exhausted" when there are tool calls but
+        the email's budget is spent.
+    """
+    route = should_continue(state)
+    if route == "tools" and budget_from_config(config).exhausted(state.get("budget_usage")):
+        return "budget_exhausted"
+    return route
+
+
+def route_after_triage(state: GraphState, config: RunnableConfig = None) -> str:
+    """Route after triage, skipping the agent when a speculative draft was adopted.
+
+    Args:
+        state: The current graph state.
+        config: The run config; may carry an ``email_budget`` override.
+
+    Returns:
+        "agent" to draft a response, "tools"/"end"/"budget_exhausted" when
+        triage already carries the agent's first response, or "end" when no
+        response is needed.
+    """
+    if not should_respond(state):
+        return "end"
+    if state["messages"][-1].type == "ai":
+        return route_after_agent(state, config)
+    return "agent"
+
+
+def route_after_tools(state: GraphState, config: RunnableConfig = None) -> str:
+    """Loop back to the agent unless the email's budget is spent.
+
+    Args:
+        state: The current graph state.
+        config: The run config; may carry an ``email_budget`` override.
+
+    Returns:
+        "agent" for the next reasoning step, or "budget_exhausted".
+    """
+    if budget_from_config(config).exhausted(state.get("budget_usage")):
+        return "budget_exhausted"
+    return "agent"
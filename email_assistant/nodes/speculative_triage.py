@@ -0,0 +1,201 @@
+"""Triage node that can start drafting the response before triage finishes.
+
+For senders whose emails usually need a response (see
+``SpeculationPolicy``), the first agent step runs concurrently with the
+router model call. When triage confirms ``respond`` the draft is adopted as
+the agent's first message, saving a round trip; otherwise it is cancelled
+and discarded. Speculation only covers the model call: the draft's tool
+calls are executed by the ``tools`` node after triage has confirmed, so no
+tool ever runs speculatively. Emails answered by a local shortcut (rules,
+caches, classifier) never speculate.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.runnables import RunnableConfig
+
+from email_assistant.helpers import estimate_tokens, parse_email
+from email_assistant.nodes.agent_node import agent_messages, ainvoke_agent, invoke_agent, model_tier, tier_model
+from email_assistant.nodes.triage_router import (
+    aclassify_with_router,
+    classify_with_router,
+    lookup_shortcuts,
+    respond_message,
+    triage_update,
+)
+from email_assistant.prompts import compile_triage_system_prompt, profile_from_config
+from email_assistant.utils.budget import call_tokens, charge, start_usage
+from email_assistant.utils.model_tiers import get_tier_selector
+from email_assistant.utils.speculation import get_speculation_policy
+from email_assistant.utils.state import GraphState
+
+DEFAULT_WORKERS = int(os.getenv("EMAIL_ASSISTANT_SPECULATIVE_WORKERS", "8"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(DEFAULT_WORKERS, thread_name_prefix="speculative-draft")
+    return _executor
+
+
+def draft_tokens(messages: list, response=None) -> int:
+    """Tokens spent on a draft: reported usage, else an estimate.
+
+    Without a response (cancelled in flight) only the prompt is counted.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return usage["total_tokens"]
+    tokens = sum(estimate_tokens(str(m["content"] if isinstance(m, dict) else m.content)) for m in messages)
+    if response is not None:
+        tokens += estimate_tokens(str(response.content))
+    return tokens
+
+
+def _timed_draft(messages: list, model_name: str = None):
+    # Returns ((response, fitted messages), seconds)
+    start = time.perf_counter()
+    return invoke_agent(messages, model_name), time.perf_counter() - start
+
+
+async def _atimed_draft(messages: list, model_name: str = None):
+    start = time.perf_counter()
+    return await ainvoke_agent(messages, model_name), time.perf_counter() - start
+
+
+def _draft_tier(state: GraphState, email: tuple):
+    """The model tier of the draft, picked as ``agent_node`` picks its first step's.
+
+    Triage has not finished, so the email is scored without its reasoning.
+    """
+    return model_tier({"email_input": state["email_input"], "messages": [respond_message(email)]})
+
+
+def _adopt_draft(update: dict, usage: dict, sent: list, response, tier, seconds: float) -> dict:
+    """Add an adopted draft to the triage update as the agent's first step."""
+    update["messages"] = update["messages"] + [response]
+    update["budget_usage"] = charge(usage, sent, response)
+    if tier is not None:
+        get_tier_selector().record_call(tier["tier"], call_tokens(sent, response), seconds)
+        update["model_tier"] = tier
+    return update
+
+
+def _prepare(state: GraphState, config: RunnableConfig):
+    """Run the triage shortcuts and decide whether to speculate."""
+    email = parse_email(state["email_input"])
+    system_prompt = compile_triage_system_prompt(profile_from_config(config))
+    result, audited = lookup_shortcuts(email, system_prompt, state["email_input"].get("headers"))
+    policy = get_speculation_policy()
+    speculate = result is None and policy is not None and policy.should_speculate(email[0])
+    return email, system_prompt, result, audited, policy, speculate
+
+
+def speculative_triage_router(state: GraphState, config: RunnableConfig = None) -> GraphState:
+    """Triage the email, drafting the response concurrently when likely needed.
+
+    Args:
+        state: The current graph state containing the email input.
+        config: The run config; may carry a ``user_profile`` override.
+
+    Returns:
+        The triage update; on a confirmed speculation its messages also hold
+        the agent's first response.
+    """
+    email, system_prompt, result, audited, policy, speculate = _prepare(state, config)
+    if result is not None:
+        return triage_update(email, result)
+    if not speculate:
+        result = classify_with_router(email, system_prompt, audited)
+        if policy is not None:
+            policy.observe(email[0], result.classification)
+        return triage_update(email, result)
+
+    draft_input = agent_messages({"messages": [respond_message(email)]}, config)
+    tier = _draft_tier(state, email)
+    usage = start_usage()
+    start = time.perf_counter()
+    # Copy the context so callbacks (tracing, accounting) see the draft call
+    draft = _get_executor().submit(contextvars.copy_context().run, _timed_draft, draft_input, tier_model(tier))
+    try:
+        result = classify_with_router(email, system_prompt, audited)
+    except BaseException:
+        draft.cancel()
+        raise
+    triage_s = time.perf_counter() - start
+    policy.observe(email[0], result.classification)
+    update = triage_update(email, result)
+
+    if result.classification != "respond":
+        policy.record_miss()
+        if not draft.cancel():
+            draft.add_done_callback(
+                lambda f: policy.record_wasted_tokens(
+                    draft_tokens(draft_input, None if f.exception() else f.result()[0][0])
+                )
+            )
+        return update
+
+    try:
+        (response, sent), draft_s = draft.result()
+    except Exception:
+        # The agent node will make the call again
+        policy.record_miss()
+        return update
+    policy.record_hit(min(triage_s, draft_s))
+    return _adopt_draft(update, usage, sent, response, tier, draft_s)
+
+
+async def aspeculative_triage_router(state: GraphState, config: RunnableConfig = None) -> GraphState:
+    """Async variant of ``speculative_triage_router``; discarded drafts are cancelled."""
+    email, system_prompt, result, audited, policy, speculate = _prepare(state, config)
+    if result is not None:
+        return triage_update(email, result)
+    if not speculate:
+        result = await aclassify_with_router(email, system_prompt, audited)
+        if policy is not None:
+            policy.observe(email[0], result.classification)
+        return triage_update(email, result)
+
+    draft_input = agent_messages({"messages": [respond_message(email)]}, config)
+    tier = _draft_tier(state, email)
+    usage = start_usage()
+    start = time.perf_counter()
+    draft = asyncio.create_task(_atimed_draft(draft_input, tier_model(tier)))
+    try:
+        result = await aclassify_with_router(email, system_prompt, audited)
+    except BaseException:
+        draft.cancel()
+        raise
+    triage_s = time.perf_counter() - start
+    policy.observe(email[0], result.classification)
+    update = triage_update(email, result)
+
+    if result.classification != "respond":
+        policy.record_miss()
+        if draft.done() and not draft.cancelled() and draft.exception() is None:
+            policy.record_wasted_tokens(draft_tokens(draft_input, draft.result()[0][0]))
+        else:
+            # Cancelled in flight: the prompt was most likely already sent
+            draft.cancel()
+            policy.record_wasted_tokens(draft_tokens(draft_input))
+        return update
+
+    try:
+        (response, sent), draft_s = await draft
+    except Exception:
+        policy.record_miss()
+        return update
+    policy.record_hit(min(triage_s, draft_s))
+    return _adopt_draft(update, usage, sent, response, tier, draft_s)
@@ -1,6 +1,8 @@
 """Tool execution node."""
 
+from langchain_core.messages import ToolMessage
 from langgraph.prebuilt import ToolNode
+from langgraph.prebuilt.tool_node import ToolCallRequest
 from email_assistant.tools import (
     write_email,
     search_emails,
@@ -8,7 +10,10 @@ from email_assistant.tools import (
     check_calendar_availability,
     search_events,
     update_event,
+    READ_ONLY_TOOLS,
+    MUTATING_TOOLS,
 )
+from email_assistant.utils.tool_cache import get_tool_cache
 
 
 tools = [
@@ -20,4 +25,62 @@ tools = [
     update_event,
 ]
 
-tool_node = ToolNode(tools)
\ No newline at end of file
+def _memo_context(request: ToolCallRequest):
+    """Return (cache, thread_id) when the call may use memoization, else (None, None)."""
+    cache = get_tool_cache()
+    thread_id = (request.runtime.config.get("configurable") or {}).get("thread_id")
+    if cache is None or thread_id is None:
+        return None, None
+    return cache, thread_id
+
+
+def _cached_message(request: ToolCallRequest, cache, thread_id):
+    call = request.tool_call
+    if call["name"] in MUTATING_TOOLS:
+        cache.invalidate(thread_id)
+    elif call["name"] in READ_ONLY_TOOLS:
+        content = cache.get(thread_id, call["name"], call["args"])
+        if content is not None:
+            return ToolMessage(content=content, name=call["name"], tool_call_id=call["id"])
+    return None
+
+
+def _remember(request: ToolCallRequest, cache, thread_id, result, generation: int):
+    call = request.tool_call
+    if call["name"] in MUTATING_TOOLS:
+        # Lookups that ran alongside the write may have cached stale data
+        cache.invalidate(thread_id)
+    elif call["name"] in READ_ONLY_TOOLS and isinstance(result, ToolMessage) and result.status != "error":
+        # Dropped if a write of the same batch invalidated the thread meanwhile
+        cache.set(thread_id, call["name"], call["args"], result.content, generation)
+
+
+def memoize_tool_call(request: ToolCallRequest, execute):
+    """ToolNode wrapper that serves repeated read-only calls from the per-thread cache."""
+    cache, thread_id = _memo_context(request)
+    if cache is None:
+        return execute(request)
+    cached = _cached_message(request, cache, thread_id)
+    if cached is not None:
+        return cached
+    generation = cache.generation()
+    result = execute(request)
+    _remember(request, cache, thread_id, result, generation)
+    return result
+
+
+async def amemoize_tool_call(request: ToolCallRequest, execute):
+    """Async variant of ``memoize_tool_call``."""
+    cache, thread_id = _memo_context(request)
+    if cache is None:
+        return await execute(request)
+    cached = _cached_message(request, cache, thread_id)
+    if cached is not None:
+        return cached
+    generation = cache.generation()
+    result = await execute(request)
+    _remember(request, cache, thread_id, result, generation)
+    return result
+
+
+tool_node = ToolNode(tools, wrap_tool_call=memoize_tool_call, awrap_tool_call=amemoize_tool_call)
\ No newline at end of file
@@ -1,52 +1,224 @@
 """Triage router node for email classification."""
 
+import time
+
+from langchain_core.runnables import RunnableConfig
+
 from email_assistant.utils.state import GraphState
-from email_assistant.utils.router import get_llm_router
+from email_assistant.utils.router import get_llm_router, RouterSchema, ROUTER_MODEL
+from email_assistant.utils.triage_cache import get_triage_cache, triage_cache_key, triage_prompt_version
+from email_assistant.utils.similarity_index import get_similarity_index
+from email_assistant.utils.triage_rules import get_triage_rules
+from email_assistant.utils.triage_classifier import get_classifier_gate
+from email_assistant.utils.hedging import get_hedging_policy
 from email_assistant.helpers import parse_email, format_email_markdown
 from email_assistant.prompts import (
-    triage_system_prompt,
     triage_user_prompt,
-    default_background,
-    default_triage_instructions,
+    compile_triage_system_prompt,
+    profile_from_config,
 )
 
 
-def triage_router(state: GraphState) -> GraphState:
-    """Analyze email content to decide if we should respond, notify, or ignore.
-    
+def _router_messages(email: tuple, system_prompt: str) -> list:
+    author, to, subject, email_thread = email
+    user_prompt = triage_user_prompt.format(
+        author=author, to=to, subject=subject, email_thread=email_thread
+    )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def invoke_router(email: tuple, system_prompt: str) -> RouterSchema:
+    """Classify a parsed email with the router model, bypassing every shortcut.
+
+    The structured call is idempotent, so a slow one is hedged when hedging
+    is on.
+
     Args:
-        state: The current graph state containing the email input.
-        
+        email: The (author, to, subject, email_thread) tuple from parse_email.
+        system_prompt: The compiled triage system prompt.
+
     Returns:
-        A dictionary with updated state including classification decision and messages.
+        The routing decision.
     """
-    author, to, subject, email_thread = parse_email(state["email_input"])
-    system_prompt = triage_system_prompt.format(
-        background=default_background, triage_instructions=default_triage_instructions
-    )
+    messages = _router_messages(email, system_prompt)
+    llm = get_llm_router()
+    hedging = get_hedging_policy()
+    if hedging is None:
+        return llm.invoke(messages)
+    return hedging.call("router", lambda: llm.invoke(messages), messages)
 
-    user_prompt = triage_user_prompt.format(
-        author=author, to=to, subject=subject, email_thread=email_thread
-    )
 
-    result = get_llm_router().invoke(
-        [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-    )
+async def ainvoke_router(email: tuple, system_prompt: str) -> RouterSchema:
+    """Async variant of ``invoke_router``."""
+    messages = _router_messages(email, system_prompt)
+    llm = get_llm_router()
+    hedging = get_hedging_policy()
+    if hedging is None:
+        return await llm.ainvoke(messages)
+    return await hedging.acall("router", lambda: llm.ainvoke(messages), messages)
+
+
+def lookup_shortcuts(email: tuple, system_prompt: str, headers: dict = None):
+    """Try every way of classifying an email without the router model.
+
+    Lookups go from cheapest to most expensive: the deterministic rules, the
+    exact-duplicate cache, the near-duplicate index, then the local
+    classifier (when confident).
+
+    Args:
+        email: The (author, to, subject, email_thread) tuple from parse_email.
+        system_prompt: The compiled triage system prompt.
+        headers: Optional raw email headers, used by the rules.
+
+    Returns:
+        Tuple of (decision, audited neighbour). The decision is None when the
+        router model must be called; the neighbour is the near-duplicate
+        decision sampled for audit, to pass on to ``remember_decision``.
+    """
+    rules = get_triage_rules()
+    if rules is not None:
+        matched = rules.match(email, headers)
+        if matched is not None:
+            rule_name, classification = matched
+            return RouterSchema(reasoning=f"Matched triage rule '{rule_name}'", classification=classification), None
+
+    prompt_version = triage_prompt_version(system_prompt, triage_user_prompt, ROUTER_MODEL)
+
+    # Identical emails are classified once per prompt version
+    cache = get_triage_cache()
+    if cache is not None:
+        cache_key = triage_cache_key(email, prompt_version)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return RouterSchema.model_validate(cached), None
+
+    # Near-duplicates reuse their neighbour's decision unless sampled for audit
+    index = get_similarity_index()
+    neighbour, audit = index.lookup(email, prompt_version) if index is not None else (None, False)
+    if neighbour is not None and not audit:
+        if cache is not None:
+            cache.set(cache_key, neighbour)
+        return RouterSchema.model_validate(neighbour), None
+
+    gate = get_classifier_gate()
+    if gate is not None:
+        prediction = gate.classify(email)
+        if prediction is not None:
+            classification, confidence = prediction
+            return RouterSchema(
+                reasoning=f"Local classifier {gate.classifier.version} ({confidence:.2f} confidence)",
+                classification=classification,
+            ), None
+
+    return None, neighbour if audit else None
+
+
+def remember_decision(email: tuple, system_prompt: str, result: RouterSchema, audited: dict = None):
+    """Store a router model decision in the cache and the near-duplicate index.
+
+    Args:
+        email: The (author, to, subject, email_thread) tuple from parse_email.
+        system_prompt: The compiled triage system prompt.
+        result: The decision returned by the router model.
+        audited: The neighbour decision returned by ``lookup_shortcuts``, if any.
+    """
+    prompt_version = triage_prompt_version(system_prompt, triage_user_prompt, ROUTER_MODEL)
+    decision = result.model_dump()
+
+    cache = get_triage_cache()
+    if cache is not None:
+        cache.set(triage_cache_key(email, prompt_version), decision)
 
+    index = get_similarity_index()
+    if index is not None:
+        if audited is not None:
+            index.record_audit(audited, decision)
+        index.add(email, prompt_version, decision)
+
+
+def classify_email(email: tuple, system_prompt: str, headers: dict = None) -> RouterSchema:
+    """Classify a parsed email, reusing earlier decisions when possible.
+
+    Args:
+        email: The (author, to, subject, email_thread) tuple from parse_email.
+        system_prompt: The compiled triage system prompt.
+        headers: Optional raw email headers, used by the rules.
+
+    Returns:
+        The routing decision.
+    """
+    result, audited = lookup_shortcuts(email, system_prompt, headers)
+    if result is not None:
+        return result
+    return classify_with_router(email, system_prompt, audited)
+
+
+def classify_with_router(email: tuple, system_prompt: str, audited: dict = None) -> RouterSchema:
+    """Classify with the router model and remember the decision.
+
+    Args:
+        email: The (author, to, subject, email_thread) tuple from parse_email.
+        system_prompt: The compiled triage system prompt.
+        audited: The neighbour decision returned by ``lookup_shortcuts``, if any.
+
+    Returns:
+        The routing decision.
+    """
+    start = time.perf_counter()
+    result = invoke_router(email, system_prompt)
+    rules = get_triage_rules()
+    if rules is not None:
+        rules.record_model_latency(time.perf_counter() - start)
+
+    remember_decision(email, system_prompt, result, audited)
+    return result
+
+
+async def aclassify_email(email: tuple, system_prompt: str, headers: dict = None) -> RouterSchema:
+    """Async variant of ``classify_email``.
+
+    The shortcut lookups are local and fast, so only the router model call
+    is awaited.
+    """
+    result, audited = lookup_shortcuts(email, system_prompt, headers)
+    if result is not None:
+        return result
+    return await aclassify_with_router(email, system_prompt, audited)
+
+
+async def aclassify_with_router(email: tuple, system_prompt: str, audited: dict = None) -> RouterSchema:
+    """Async variant of ``classify_with_router``."""
+    start = time.perf_counter()
+    result = await ainvoke_router(email, system_prompt)
+    rules = get_triage_rules()
+    if rules is not None:
+        rules.record_model_latency(time.perf_counter() - start)
+
+    remember_decision(email, system_prompt, result, audited)
+    return result
+
+
+def respond_message(email: tuple) -> dict:
+    """Build the user message that hands a ``respond`` email to the agent."""
+    author, to, subject, email_thread = email
+    return {
+        "role": "user",
+        "content": f"Respond to the email: \n\n{format_email_markdown(subject, author, to, email_thread)}",
+    }
+
+
+def triage_update(email: tuple, result: RouterSchema) -> dict:
+    """Build the state update for a routing decision."""
     # Store classification decision in state
     update = {"classification_decision": result.classification}
 
     if result.classification == "respond":
         print("📧 Classification: RESPOND - This email requires a response")
-        update["messages"] = [
-            {
-                "role": "user",
-                "content": f"Respond to the email: \n\n{format_email_markdown(subject, author, to, email_thread)}",
-            }
-        ]
+        update["messages"] = [respond_message(email)]
+        update["triage_reasoning"] = result.reasoning
     elif result.classification == "ignore":
         print("🚫 Classification: IGNORE - This email can be safely ignored")
     elif result.classification == "notify":
@@ -54,4 +226,28 @@ def triage_router(state: GraphState) -> GraphState:
     else:
         raise ValueError(f"Invalid classification: {result.classification}")
 
-    return update
\ No newline at end of file
+    return update
+
+
+def triage_router(state: GraphState, config: RunnableConfig = None) -> GraphState:
+    """Analyze email content to decide if we should respond, notify, or ignore.
+    
+    Args:
+        state: The current graph state containing the email input.
+        config: The run config; may carry a ``user_profile`` override.
+        
+    Returns:
+        A dictionary with updated state including classification decision and messages.
+    """
+    email = parse_email(state["email_input"])
+    system_prompt = compile_triage_system_prompt(profile_from_config(config))
+    result = classify_email(email, system_prompt, state["email_input"].get("headers"))
+    return triage_update(email, result)
+
+
+async def atriage_router(state: GraphState, config: RunnableConfig = None) -> GraphState:
+    """Async variant of ``triage_router``, used by ``graph.ainvoke``/``astream``."""
+    email = parse_email(state["email_input"])
+    system_prompt = compile_triage_system_prompt(profile_from_config(config))
+    result = await aclassify_email(email, system_prompt, state["email_input"].get("headers"))
+    return triage_update(email, result)
@@ -9,11 +9,21 @@ from email_assistant.prompts.defaults import (
 from email_assistant.prompts.triage_prompts import (
     triage_system_prompt,
     triage_user_prompt,
+    triage_batch_user_prompt,
+    triage_batch_email,
 )
 from email_assistant.prompts.agent_prompts import (
     agent_system_prompt,
     AGENT_TOOLS_PROMPT,
 )
+from email_assistant.prompts.compiler import (
+    UserProfile,
+    DEFAULT_PROFILE,
+    profile_from_config,
+    compile_triage_system_prompt,
+    compile_agent_system_prompt,
+    clear_compiled_prompts,
+)
 
 __all__ = [
     "default_background",
@@ -22,6 +32,14 @@ __all__ = [
     "default_cal_preferences",
     "triage_system_prompt",
     "triage_user_prompt",
+    "triage_batch_user_prompt",
+    "triage_batch_email",
     "agent_system_prompt",
     "AGENT_TOOLS_PROMPT",
+    "UserProfile",
+    "DEFAULT_PROFILE",
+    "profile_from_config",
+    "compile_triage_system_prompt",
+    "compile_agent_system_prompt",
+    "clear_compiled_prompts",
 ]
\ No newline at end of file
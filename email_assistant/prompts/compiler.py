@@ -0,0 +1,112 @@
+"""Compiled system prompts keyed by user profile and tool set."""
+
+import threading
+from dataclasses import dataclass
+
+from email_assistant.helpers.tools_formatter import format_tools
+from email_assistant.prompts.defaults import (
+    default_background,
+    default_triage_instructions,
+    default_response_preferences,
+    default_cal_preferences,
+)
+from email_assistant.prompts.triage_prompts import triage_system_prompt
+from email_assistant.prompts.agent_prompts import agent_system_prompt, AGENT_TOOLS_PROMPT
+
+
+@dataclass(frozen=True)
+class UserProfile:
+    """Per-user values substituted into the system prompts.
+
+    Profiles are immutable and hashed by content, so changing any field
+    yields a new cache key and the prompt is re-rendered on next use.
+    """
+
+    background: str = default_background
+    triage_instructions: str = default_triage_instructions
+    response_preferences: str = default_response_preferences
+    cal_preferences: str = default_cal_preferences
+
+
+DEFAULT_PROFILE = UserProfile()
+
+# Maximum number of compiled prompts kept; oldest entries are evicted first
+MAX_COMPILED_PROMPTS = 1024
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def profile_from_config(config) -> UserProfile:
+    """Get the user profile for a run.
+
+    Args:
+        config: The runnable config. ``config["configurable"]["user_profile"]``
+            may hold a UserProfile or a dict overriding any of its fields.
+
+    Returns:
+        The profile to render prompts with (the default profile if none is set).
+    """
+    overrides = ((config or {}).get("configurable") or {}).get("user_profile")
+    if not overrides:
+        return DEFAULT_PROFILE
+    if isinstance(overrides, UserProfile):
+        return overrides
+    return UserProfile(**overrides)
+
+
+def _get_or_render(key, render) -> str:
+    """Return the cached prompt for key, rendering it on a miss."""
+    prompt = _compiled.get(key)
+    if prompt is None:
+        prompt = render()
+        with _compiled_lock:
+            if len(_compiled) >= MAX_COMPILED_PROMPTS:
+                _compiled.pop(next(iter(_compiled)))
+            _compiled[key] = prompt
+    return prompt
+
+
+def compile_triage_system_prompt(profile: UserProfile = DEFAULT_PROFILE) -> str:
+    """Get the triage system prompt for a profile, rendered once and cached.
+
+    Args:
+        profile: The user profile.
+
+    Returns:
+        The rendered triage system prompt.
+    """
+    return _get_or_render(
+        ("triage", profile),
+        lambda: triage_system_prompt.format(
+            background=profile.background,
+            triage_instructions=profile.triage_instructions,
+        ),
+    )
+
+
+def compile_agent_system_prompt(tools, profile: UserProfile = DEFAULT_PROFILE) -> str:
+    """Get the agent system prompt for a profile and tool set, rendered once and cached.
+
+    Args:
+        tools: The tools bound to the agent model (keyed by tool name).
+        profile: The user profile.
+
+    Returns:
+        The rendered agent system prompt.
+    """
+    return _get_or_render(
+        ("agent", profile, tuple(tool.name for tool in tools)),
+        lambda: agent_system_prompt.format(
+            tools_prompt=AGENT_TOOLS_PROMPT.format(tools_descriptions=format_tools(tools)),
+            background=profile.background,
+            response_preferences=profile.response_preferences,
+            cal_preferences=profile.cal_preferences,
+        ),
+    )
+
+
+def clear_compiled_prompts():
+    """Drop every compiled prompt, e.g. after editing the prompt templates."""
+    with _compiled_lock:
+        _compiled.clear()
@@ -17,4 +17,17 @@ Subject: {subject}
 
 Email Thread:
 {email_thread}
-"""
\ No newline at end of file
+"""
+
+# User prompt for batched triage; {emails} holds one triage_batch_email block per email
+triage_batch_user_prompt = """
+Classify each of the following {count} emails independently, as if it were the only one.
+Return exactly one decision per email, identified by its index.
+
+{emails}
+"""
+
+triage_batch_email = """
+### Email {index}
+{email}
+"""
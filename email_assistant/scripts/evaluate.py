@@ -0,0 +1,73 @@
+"""Evaluate triage and agent behavior on a set of cases, concurrently and cached.
+
+Usage:
+    python -m email_assistant.scripts.evaluate [--cases cases.jsonl] [--concurrency 16] [--output report.json]
+
+Without ``--cases`` the triage and agent test data is evaluated. Outcomes
+are cached in ``--cache`` (``.eval-cache.jsonl``) by email, prompt version
+and models, so a rerun only evaluates what changed; ``--no-cache`` runs
+every case. The report gives accuracy and latency overall, per expected
+classification and per expected tool set, and lists the failed cases.
+The exit status is 1 when overall accuracy is below ``--fail-under``.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+from email_assistant.agent import get_compiled_graph
+from email_assistant.evaluation import DEFAULT_CONCURRENCY, EvalCache, default_cases, evaluate, read_cases, report
+
+
+def _row(name: str, group: dict) -> str:
+    return (
+        f"  {name:<32} {group['cases']:>5} {group['classification_accuracy']:>8.0%} {group['tool_accuracy']:>8.0%}"
+        f" {group['latency']['p50_ms']:>9.0f} {group['latency']['p90_ms']:>9.0f} {group['cached']:>7}"
+    )
+
+
+def main(argv=None) -> int:
+    """Evaluate every case and print the report."""
+    parser = argparse.ArgumentParser(description="Concurrent, cached evaluation of triage and agent behavior.")
+    parser.add_argument("--cases", type=Path, help="JSONL file of cases (default: the test data)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Cases in flight")
+    parser.add_argument("--cache", type=Path, default=Path(".eval-cache.jsonl"), help="JSONL file of cached outcomes")
+    parser.add_argument("--no-cache", action="store_true", help="Evaluate every case, ignoring the cache")
+    parser.add_argument("--output", type=Path, help="Write the report and every case record to this JSON file")
+    parser.add_argument("--fail-under", type=float, default=0.0, help="Minimum overall triage and tool accuracy")
+    args = parser.parse_args(argv)
+
+    cases = read_cases(args.cases) if args.cases else default_cases()
+    cache = None if args.no_cache else EvalCache(args.cache)
+    start = time.perf_counter()
+    records = asyncio.run(evaluate(cases, get_compiled_graph(), args.concurrency, cache))
+    elapsed = time.perf_counter() - start
+    summary = report(records)
+
+    header = f"  {'':<32} {'cases':>5} {'triage':>8} {'tools':>8} {'p50 ms':>9} {'p90 ms':>9} {'cached':>7}"
+    print(f"Evaluated {len(records)} cases in {elapsed:.1f}s")
+    if records:
+        print(header)
+        print(_row("overall", summary["overall"]))
+        for name, group in summary["by_classification"].items():
+            print(_row(f"classification={name}", group))
+        for name, group in summary["by_tools"].items():
+            print(_row(f"tools={name}", group))
+    for failure in summary["failures"]:
+        print(f"FAILED {json.dumps(failure)}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({**summary, "elapsed_s": elapsed, "cases": records}, f, indent=2)
+
+    overall = summary["overall"]
+    if overall and min(overall["classification_accuracy"], overall["tool_accuracy"]) < args.fail_under:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Run a whole inbox through the email assistant graph.
+
+Usage:
+    python -m email_assistant.scripts.process_inbox --input inbox.mbox --output results.jsonl [--concurrency 16] [--resume]
+
+The input is a JSONL file (the email dict or ``{"email_input": ...}`` per
+line), an mbox file or a Maildir directory. One JSON record per email is
+appended to the output as it completes; ``--resume`` skips the emails that
+already completed there, so an interrupted backfill can be restarted.
+
+``--metrics-port`` serves latency metrics at ``http://127.0.0.1:<port>/metrics``
+while the run is in progress, and ``--metrics-file`` dumps them to a file
+periodically and at the end.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from email_assistant.agent import get_compiled_graph
+from email_assistant.inbox import DEFAULT_CONCURRENCY, completed_offsets, process_inbox, read_inbox
+from email_assistant.utils.metrics import start_metrics_dump, start_metrics_server, write_metrics
+
+
+def main(argv=None) -> int:
+    """Process every email of the inbox and print the run report."""
+    parser = argparse.ArgumentParser(description="Bulk inbox processing.")
+    parser.add_argument("--input", type=Path, required=True, help="JSONL file, mbox file or Maildir directory")
+    parser.add_argument("--format", choices=["auto", "jsonl", "mbox", "maildir"], default="auto")
+    parser.add_argument("--output", type=Path, required=True, help="JSONL file of results")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Emails in flight")
+    parser.add_argument("--resume", action="store_true", help="Skip emails already completed in the output")
+    parser.add_argument("--metrics-port", type=int, help="Serve OpenMetrics on this local port")
+    parser.add_argument("--metrics-file", type=Path, help="Dump OpenMetrics to this file periodically")
+    args = parser.parse_args(argv)
+
+    server = start_metrics_server(args.metrics_port) if args.metrics_port else None
+    dump = start_metrics_dump(str(args.metrics_file)) if args.metrics_file else None
+
+    skip = completed_offsets(args.output) if args.resume else set()
+    with open(args.output, "a" if args.resume else "w") as out:
+        report = asyncio.run(
+            process_inbox(
+                read_inbox(args.input, args.format),
+                out,
+                get_compiled_graph(),
+                concurrency=args.concurrency,
+                skip=skip,
+                thread_prefix=args.input.name,
+            )
+        )
+
+    if server is not None:
+        server.shutdown()
+    if dump is not None:
+        dump.set()
+        write_metrics(str(args.metrics_file))
+
+    print(
+        f"Processed {report['emails']} emails in {report['elapsed_s']:.1f}s "
+        f"({report['emails_per_s']:.2f} emails/s), skipped {report['skipped']}, errors {report['errors']}"
+    )
+    print(json.dumps(report, indent=2))
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
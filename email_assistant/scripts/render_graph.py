@@ -0,0 +1,97 @@
+"""Render the agent graph diagrams, with a local rendering cache.
+
+Graph construction never draws the diagram. This command does it on demand:
+the Mermaid source is generated locally, and the PNG is looked up in a cache
+keyed by a hash of that source. The remote renderer is only contacted when
+the graph changed and ``--offline`` is not set.
+
+Usage:
+    python -m email_assistant.scripts.render_graph [--graph agent] [--offline]
+"""
+
+import argparse
+import hashlib
+import importlib
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Graph name -> (module exposing get_compiled_graph, default output path)
+GRAPHS = {
+    "agent": ("email_assistant.agent", PROJECT_ROOT / "graph.png"),
+    "agent_hitl": ("email_assistant_hitl.agent", PROJECT_ROOT / "email_assistant_hitl" / "graph.png"),
+}
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("EMAIL_ASSISTANT_CACHE_DIR", Path.home() / ".cache" / "email-assistant")
+) / "graphs"
+
+
+def render_graph(graph, output_path: Path, cache_dir: Path = DEFAULT_CACHE_DIR, offline: bool = False) -> str:
+    """Render a compiled graph to a PNG file, reusing cached renders.
+
+    Args:
+        graph: A compiled LangGraph graph.
+        output_path: Where to write the PNG.
+        cache_dir: Directory holding cached renders keyed by Mermaid source hash.
+        offline: Never contact the remote renderer. On a cache miss the
+            Mermaid source is written next to ``output_path`` instead.
+
+    Returns:
+        How the diagram was produced: "cache", "rendered" or "mermaid".
+    """
+    drawable = graph.get_graph()
+    mermaid = drawable.draw_mermaid()
+    key = hashlib.sha256(mermaid.encode("utf-8")).hexdigest()
+    cached = Path(cache_dir) / f"{key}.png"
+
+    if cached.exists():
+        png, source = cached.read_bytes(), "cache"
+    elif offline:
+        output_path.with_suffix(".mmd").write_text(mermaid)
+        return "mermaid"
+    else:
+        try:
+            png = drawable.draw_mermaid_png()
+        except Exception as e:
+            print(f"⚠️ Remote rendering failed ({e}); writing Mermaid source instead", file=sys.stderr)
+            output_path.with_suffix(".mmd").write_text(mermaid)
+            return "mermaid"
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        cached.write_bytes(png)
+        source = "rendered"
+
+    # Skip the write when the diagram on disk is already up to date
+    if not output_path.exists() or output_path.read_bytes() != png:
+        output_path.write_bytes(png)
+    return source
+
+
+def main(argv=None) -> int:
+    """Render one or all graph diagrams."""
+    parser = argparse.ArgumentParser(description="Render the email assistant graph diagrams.")
+    parser.add_argument("--graph", choices=[*GRAPHS, "all"], default="all", help="Graph to render")
+    parser.add_argument("--output", type=Path, help="Output path (only with a single --graph)")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR, help="Rendering cache directory")
+    parser.add_argument("--offline", action="store_true", help="Never contact the remote renderer")
+    args = parser.parse_args(argv)
+
+    names = list(GRAPHS) if args.graph == "all" else [args.graph]
+    if args.output and len(names) > 1:
+        parser.error("--output requires a single --graph")
+
+    for name in names:
+        module_name, default_output = GRAPHS[name]
+        graph = importlib.import_module(module_name).get_compiled_graph()
+        output_path = args.output or default_output
+        source = render_graph(graph, output_path, cache_dir=args.cache_dir, offline=args.offline)
+        if source == "mermaid":
+            output_path = output_path.with_suffix(".mmd")
+        print(f"{name}: {output_path} ({source})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
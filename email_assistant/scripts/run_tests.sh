@@ -59,6 +59,11 @@ case "${1:-all}" in
         pytest email_assistant/tests/ -v -m "not langsmith"
         ;;
     
+    "eval")
+        echo "Running the concurrent, cached triage and agent evaluation..."
+        python -m email_assistant.scripts.evaluate "${@:2}"
+        ;;
+    
     "all")
         echo "Running all tests with LangSmith logging..."
         echo ""
@@ -82,12 +87,14 @@ case "${1:-all}" in
         echo "  triage   Run only triage classification tests"
         echo "  agent    Run only agent behavior tests"
         echo "  quick    Run tests without LangSmith logging"
+        echo "  eval     Evaluate triage and agent cases concurrently, skipping cached ones"
         echo "  help     Show this help message"
         echo ""
         echo "Examples:"
         echo "  ./scripts/run_tests.sh          # Run all tests"
         echo "  ./scripts/run_tests.sh triage   # Run triage tests only"
         echo "  ./scripts/run_tests.sh quick    # Quick test run"
+        echo "  ./scripts/run_tests.sh eval --concurrency 16   # Fast evaluation"
         echo ""
         echo "Environment Variables:"
         echo "  LANGSMITH_API_KEY    Your LangSmith API key for logging"
@@ -0,0 +1,72 @@
+"""Serve a local OpenAI-compatible stub model for load testing.
+
+Usage:
+    python -m email_assistant.scripts.stub_server [--port 8765] [--latency lognormal:0.8,0.5]
+        [--error-rate 0.01] [--rate-limit-rate 0.02] [--rpm 3000] [--script policy.json] [--seed 0]
+
+Then run the assistant against it:
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub python -m email_assistant.scripts.process_inbox ...
+
+``GET /stats`` on the same port reports requests, injected failures and peak
+concurrency.
+"""
+
+import argparse
+import json
+import sys
+import threading
+
+from email_assistant.stub_server import DecisionPolicy, StubModelServer
+
+
+def parse_weights(spec: str) -> dict:
+    """Parse "respond=0.4,notify=0.3,ignore=0.3" into classification weights."""
+    weights = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        weights[name.strip()] = float(value)
+    return weights
+
+
+def main(argv=None) -> int:
+    """Run the stub server until interrupted."""
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub model server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0", help="fixed:<s>, uniform:<a>,<b>, exp:<mean> or lognormal:<median>,<sigma>")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with a 429")
+    parser.add_argument("--rpm", type=float, default=0.0, help="Server-side requests per minute before 429s (0: unlimited)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--weights", type=parse_weights, help="Random classification weights, e.g. respond=0.5,notify=0.3,ignore=0.2")
+    parser.add_argument("--script", help="JSON decision script (router rules, default, agent_plan)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    script = None
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+    stub = StubModelServer(
+        DecisionPolicy(args.seed, args.weights, script),
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        rpm=args.rpm,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    stub.start(args.port, args.host)
+    print(f"Stub model serving at {stub.url} (stats at {stub.url[:-3]}/stats)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.stop()
+        print(json.dumps(stub.stats()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
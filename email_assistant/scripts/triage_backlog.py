@@ -0,0 +1,63 @@
+"""Triage a backlog of emails with batched model calls.
+
+Reads emails as JSON lines (the email dict itself or ``{"email_input": ...}``)
+and writes one decision per line, in input order, as it goes. The output
+doubles as training history for ``triage-classifier``.
+
+Usage:
+    python -m email_assistant.scripts.triage_backlog --input backlog.jsonl --output decisions.jsonl
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from email_assistant.batch_triage import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_BATCH_TOKENS, triage_batch
+
+
+def read_emails(path):
+    """Yield email input dicts from a JSONL file."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield record.get("email_input", record)
+
+
+def main(argv=None) -> int:
+    """Triage every email of the input file."""
+    parser = argparse.ArgumentParser(description="Batched triage of an email backlog.")
+    parser.add_argument("--input", type=Path, required=True, help="JSONL file of emails")
+    parser.add_argument("--output", type=Path, required=True, help="JSONL file of decisions")
+    parser.add_argument("--max-batch-tokens", type=int, default=DEFAULT_MAX_BATCH_TOKENS)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--chunk-size", type=int, default=200, help="Emails read per round")
+    args = parser.parse_args(argv)
+
+    counts = Counter()
+    start = time.perf_counter()
+    emails = read_emails(args.input)
+    with open(args.output, "w") as out:
+        while chunk := list(itertools.islice(emails, args.chunk_size)):
+            results = triage_batch(chunk, max_batch_tokens=args.max_batch_tokens, max_batch_size=args.max_batch_size)
+            for email_input, result in zip(chunk, results):
+                counts[result.classification] += 1
+                out.write(json.dumps({
+                    "email_input": email_input,
+                    "classification_decision": result.classification,
+                    "reasoning": result.reasoning,
+                }) + "\n")
+            out.flush()
+
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(f"Triaged {total} emails in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f} emails/s): {dict(counts)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
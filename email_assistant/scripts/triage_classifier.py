@@ -0,0 +1,126 @@
+"""Train, export and evaluate the local triage classifier.
+
+Usage:
+    python -m email_assistant.scripts.triage_classifier train --data history.jsonl [--include-test-data]
+    python -m email_assistant.scripts.triage_classifier eval --model triage-classifier-<version>.json [--offline]
+
+Training records are JSON lines holding the email (``email_input`` or the
+email fields at top level) and its ``classification_decision`` (or
+``classification``), e.g. the output of ``process-inbox``.
+
+Evaluation runs the confidence gate over ``email_classification_pairs`` and
+defers uncertain emails to the router model. With ``--offline`` deferred
+emails are only counted, so accuracy covers the locally answered ones.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from email_assistant.helpers import parse_email
+from email_assistant.nodes.triage_router import invoke_router
+from email_assistant.prompts import compile_triage_system_prompt
+from email_assistant.dataset import email_classification_pairs
+from email_assistant.utils.stats import latency_summary
+from email_assistant.utils.triage_classifier import DEFAULT_THRESHOLD, ConfidenceGate, TriageClassifier
+
+
+def load_examples(path) -> list:
+    """Read (email tuple, classification) pairs from a JSONL history file."""
+    examples = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            classification = record.get("classification_decision") or record.get("classification")
+            if classification:
+                examples.append((parse_email(record.get("email_input", record)), classification))
+    return examples
+
+
+def evaluate(gate: ConfidenceGate, pairs, offline: bool = False) -> dict:
+    """Run the gated triage path over labelled emails.
+
+    Args:
+        gate: The confidence gate to evaluate.
+        pairs: Iterable of (email_input, expected classification).
+        offline: Count deferred emails instead of calling the router model.
+
+    Returns:
+        Report with accuracy, fraction of model calls avoided and latency.
+    """
+    system_prompt = compile_triage_system_prompt()
+    latencies, local_correct, local_total, correct, resolved, deferred = [], 0, 0, 0, 0, 0
+    for email_input, expected in pairs:
+        start = time.perf_counter()
+        email = parse_email(email_input)
+        prediction = gate.classify(email)
+        if prediction is not None:
+            actual = prediction[0]
+            local_total += 1
+            local_correct += actual == expected
+        elif offline:
+            actual = None
+            deferred += 1
+        else:
+            actual = invoke_router(email, system_prompt).classification
+            deferred += 1
+        latencies.append(time.perf_counter() - start)
+        if actual is not None:
+            resolved += 1
+            correct += actual == expected
+
+    total = local_total + deferred
+    return {
+        "model_version": gate.classifier.version,
+        "threshold": gate.threshold,
+        "emails": total,
+        "accuracy": correct / resolved if resolved else None,
+        "local_accuracy": local_correct / local_total if local_total else None,
+        "llm_calls_avoided": local_total / total if total else 0.0,
+        "latency": latency_summary(latencies),
+    }
+
+
+def main(argv=None) -> int:
+    """Train or evaluate the triage classifier."""
+    parser = argparse.ArgumentParser(description="Local triage classifier.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train = commands.add_parser("train", help="Train and export a model artifact")
+    train.add_argument("--data", type=Path, action="append", default=[], help="JSONL history file (repeatable)")
+    train.add_argument("--include-test-data", action="store_true", help="Also train on email_classification_pairs")
+    train.add_argument("--alpha", type=float, default=1.0, help="Laplace smoothing")
+    train.add_argument("--output", type=Path, help="Artifact path (default: triage-classifier-<version>.json)")
+
+    evaluate_cmd = commands.add_parser("eval", help="Evaluate against email_classification_pairs")
+    evaluate_cmd.add_argument("--model", type=Path, required=True, help="Model artifact")
+    evaluate_cmd.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Confidence threshold")
+    evaluate_cmd.add_argument("--offline", action="store_true", help="Do not call the router model")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        examples = [example for path in args.data for example in load_examples(path)]
+        if args.include_test_data:
+            examples += [(parse_email(email), label) for email, label in email_classification_pairs]
+        model = TriageClassifier.train(examples, alpha=args.alpha)
+        output = args.output or Path(f"triage-classifier-{model.version}.json")
+        model.save(output)
+        print(f"Trained on {len(examples)} emails -> {output} (version {model.version})")
+        return 0
+
+    start = time.perf_counter()
+    model = TriageClassifier.load(args.model)
+    load_ms = (time.perf_counter() - start) * 1000
+    report = evaluate(ConfidenceGate(model, args.threshold), email_classification_pairs, offline=args.offline)
+    report["load_ms"] = load_ms
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Break down token usage and cost recorded by the usage ledger.
+
+Usage:
+    python -m email_assistant.scripts.usage_report --usage jsonl:usage.jsonl [--json]
+    python -m email_assistant.scripts.usage_report --usage sqlite:usage.db
+
+The sink is the one the graphs wrote to through ``EMAIL_ASSISTANT_ACCOUNTING``.
+Costs are broken down per classification, per node and per model.
+"""
+
+import argparse
+import json
+import sys
+
+from email_assistant.utils.accounting import create_usage_sink, summarize
+
+
+def format_table(title: str, rows: dict) -> str:
+    """Render one breakdown as an aligned text table, most expensive first."""
+    lines = [
+        f"\n{title}",
+        f"{'':<28}{'calls':>8}{'input':>12}{'cached':>12}{'output':>12}{'cost (USD)':>14}",
+    ]
+    for key, totals in sorted(rows.items(), key=lambda item: -item[1]["cost_usd"]):
+        lines.append(
+            f"{str(key):<28}{totals['calls']:>8}{totals['input_tokens']:>12}{totals['cached_tokens']:>12}"
+            f"{totals['output_tokens']:>12}{totals['cost_usd']:>14.4f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    """Print the usage breakdown of a sink."""
+    parser = argparse.ArgumentParser(description="Token and cost report.")
+    parser.add_argument("--usage", required=True, help="Usage sink: jsonl:<path> or sqlite:<path>")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = summarize(create_usage_sink(args.usage).read())
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    total = report["total"]
+    print(
+        f"{total['calls']} model calls for {report['emails']} emails: {total['input_tokens']} input tokens "
+        f"({total['cached_tokens']} cached), {total['output_tokens']} output tokens, ${total['cost_usd']:.4f}"
+    )
+    print(format_table("By classification", report["by_classification"]))
+    print(format_table("By node", report["by_node"]))
+    print(format_table("By model", report["by_model"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Incremental output from a graph run.
+
+``astream_email`` turns ``graph.astream_events`` into a small set of events a
+UI can render as they happen:
+
+    - ``node_start`` / ``node_end``: a graph node began or finished.
+    - ``token``: a piece of model output text (from ``token_nodes`` only).
+    - ``tool_start`` / ``tool_end``: a tool call and its result.
+    - ``done``: the final state, with time-to-first-token and total latency.
+
+``stream_email`` is the same stream for synchronous callers.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+# Only the agent's reply is user-facing; triage output is structured JSON
+DEFAULT_TOKEN_NODES = ("agent",)
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    """One incremental update from a graph run.
+
+    Attributes:
+        kind: "node_start", "node_end", "token", "tool_start", "tool_end" or "done".
+        node: The graph node the event belongs to ("" for "done").
+        data: Token text, tool name/input/output, or the final run summary.
+        elapsed_s: Seconds since the run started.
+    """
+
+    kind: str
+    node: str
+    data: dict = field(default_factory=dict)
+    elapsed_s: float = 0.0
+
+
+async def astream_email(email_input: dict, graph=None, config: dict = None, token_nodes=DEFAULT_TOKEN_NODES):
+    """Run one email through the graph, yielding events as they happen.
+
+    Args:
+        email_input: The email dict.
+        graph: Compiled graph; defaults to the process-wide agent graph.
+        config: Run config (thread_id, user_profile, ...).
+        token_nodes: Nodes whose model tokens are emitted.
+
+    Yields:
+        StreamEvent objects, ending with a "done" event whose data holds the
+        final ``state``, ``ttft_s`` (None when no token was emitted) and
+        ``total_s``.
+    """
+    if graph is None:
+        from email_assistant.agent import get_compiled_graph
+
+        graph = get_compiled_graph()
+
+    start = time.perf_counter()
+    root_id, final_state, ttft = None, None, None
+    async for event in graph.astream_events({"email_input": email_input}, config, version="v2"):
+        kind, parents = event["event"], event["parent_ids"]
+        node = event["metadata"].get("langgraph_node", "")
+        elapsed = time.perf_counter() - start
+
+        if root_id is None:
+            root_id = event["run_id"]
+        elif event["run_id"] == root_id:
+            if kind == "on_chain_end":
+                final_state = event["data"].get("output")
+        elif kind in ("on_chain_start", "on_chain_end") and parents and parents[-1] == root_id:
+            yield StreamEvent("node_start" if kind == "on_chain_start" else "node_end", node, {}, elapsed)
+        elif kind == "on_chat_model_stream" and node in token_nodes:
+            text = event["data"]["chunk"].text
+            if text:
+                if ttft is None:
+                    ttft = elapsed
+                yield StreamEvent("token", node, {"text": text}, elapsed)
+        elif kind == "on_tool_start":
+            yield StreamEvent("tool_start", node, {"name": event["name"], "input": event["data"].get("input")}, elapsed)
+        elif kind == "on_tool_end":
+            output = event["data"].get("output")
+            yield StreamEvent(
+                "tool_end", node, {"name": event["name"], "output": getattr(output, "content", output)}, elapsed
+            )
+
+    total = time.perf_counter() - start
+    yield StreamEvent("done", "", {"state": final_state, "ttft_s": ttft, "total_s": total}, total)
+
+
+def stream_email(email_input: dict, graph=None, config: dict = None, token_nodes=DEFAULT_TOKEN_NODES):
+    """Synchronous generator over ``astream_email`` on a private event loop."""
+    loop = asyncio.new_event_loop()
+    events = astream_email(email_input, graph, config, token_nodes)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(anext(events))
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(events.aclose())
+        loop.close()
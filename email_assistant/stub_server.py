@@ -0,0 +1,351 @@
+"""Local OpenAI-compatible chat completions server for load testing.
+
+``StubModelServer`` answers ``POST /v1/chat/completions`` the way the
+assistant's models are called, so the whole stack (HTTP pool, rate limiter,
+retries, timeouts) runs against it with no network:
+
+    - structured output (``response_format`` JSON schema, or a forced
+      function call) gets an object built from the schema, with the
+      ``classification`` chosen by the decision policy;
+    - requests with ``tools`` get a plan of tool calls: read-only lookups,
+      then ``write_email``, then a final text reply;
+    - ``stream: true`` is answered with server-sent event chunks.
+
+Decisions are either random (seeded per email, so a run is reproducible
+regardless of request order) or scripted from a JSON file. Latency follows a
+configurable distribution, and a fraction of requests can fail with a 500 or
+a 429 (with ``Retry-After``); ``rpm`` adds a server-side request limit.
+``GET /stats`` returns request, error and concurrency counts.
+
+Point the models at it with ``OPENAI_BASE_URL=http://127.0.0.1:<port>/v1``.
+"""
+
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CLASSIFICATIONS = ("respond", "notify", "ignore")
+DEFAULT_WEIGHTS = {"respond": 0.4, "notify": 0.3, "ignore": 0.3}
+READ_ONLY_TOOLS = ("search_events", "check_calendar_availability", "search_emails")
+# Placeholder arguments by parameter name, before falling back to the JSON type
+ARGUMENT_VALUES = {
+    "to": "sender@example.com",
+    "subject": "Re: your email",
+    "content": "Thanks for your email, I will get back to you shortly.",
+    "day": "2025-05-22",
+    "query": "meeting",
+    "attendees": ["sender@example.com"],
+    "duration_minutes": 30,
+    "preferred_day": "2025-05-22",
+    "start_time": 14,
+    "event_id": "evt_1",
+}
+TYPE_VALUES = {"string": "stub", "integer": 1, "number": 1.0, "boolean": False, "array": [], "object": {}}
+
+
+def parse_latency(spec: str):
+    """Build a latency sampler from a spec string.
+
+    Args:
+        spec: "fixed:<s>", "uniform:<low>,<high>", "exp:<mean>" or
+            "lognormal:<median>,<sigma>" (seconds).
+
+    Returns:
+        A function taking a ``random.Random`` and returning seconds.
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",")] if args else []
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1 / values[0]) if values[0] > 0 else 0.0
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+def _text(message: dict) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+def _email_text(messages: list) -> str:
+    """The first user message: the email being triaged or answered."""
+    return next((_text(m) for m in messages if m.get("role") == "user"), "")
+
+
+def placeholder(schema: dict, name: str = "", classification: str = "respond"):
+    """Build a value that validates against a (simple) JSON schema."""
+    if "enum" in schema:
+        return classification if classification in schema["enum"] else schema["enum"][0]
+    if "anyOf" in schema:
+        return placeholder(next(s for s in schema["anyOf"] if s.get("type") != "null"), name, classification)
+    if schema.get("type") == "object":
+        # Optional tool arguments are left out, as a model usually would
+        properties = schema.get("properties", {})
+        required = schema.get("required", list(properties))
+        return {key: placeholder(properties[key], key, classification) for key in required if key in properties}
+    if name == "reasoning":
+        return f"Stub decision: {classification}"
+    if name in ARGUMENT_VALUES:
+        return ARGUMENT_VALUES[name]
+    return TYPE_VALUES.get(schema.get("type"), "stub")
+
+
+class DecisionPolicy:
+    """Random or scripted triage decisions and agent tool plans.
+
+    The script is a dict with optional ``router`` rules
+    (``[{"contains": "...", "classification": "..."}]``, first match wins),
+    a ``default`` classification and an ``agent_plan`` (tool names called
+    in order before the final reply).
+    """
+
+    def __init__(self, seed: int = 0, weights: dict = None, script: dict = None):
+        self.seed = seed
+        self.weights = weights or DEFAULT_WEIGHTS
+        self.script = script or {}
+
+    def _rng(self, messages: list) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}:{_email_text(messages)}".encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def classify(self, messages: list) -> str:
+        text = _email_text(messages).lower()
+        for rule in self.script.get("router", ()):
+            if rule["contains"].lower() in text:
+                return rule["classification"]
+        if "default" in self.script:
+            return self.script["default"]
+        names = list(self.weights)
+        return self._rng(messages).choices(names, weights=[self.weights[n] for n in names])[0]
+
+    def agent_plan(self, messages: list, tool_names: list) -> list:
+        if "agent_plan" in self.script:
+            return [name for name in self.script["agent_plan"] if name in tool_names]
+        rng = self._rng(messages)
+        lookups = [name for name in READ_ONLY_TOOLS if name in tool_names]
+        plan = rng.sample(lookups, rng.randint(0, min(2, len(lookups))))
+        return plan + (["write_email"] if "write_email" in tool_names else [])
+
+
+class StubModelServer:
+    """Chat completions stand-in with latency, error and 429 injection."""
+
+    def __init__(
+        self,
+        policy: DecisionPolicy = None,
+        latency: str = "fixed:0",
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        rpm: float = 0.0,
+        retry_after: float = 1.0,
+        seed: int = 0,
+    ):
+        self.policy = policy or DecisionPolicy(seed)
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rpm = rpm
+        self.retry_after = retry_after
+        self.counters = Counter()
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._window = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.server = None
+
+    @property
+    def url(self) -> str:
+        """Base URL for the OpenAI client (``.../v1``)."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _admit(self):
+        """Return an injected (status, message), or None to answer normally."""
+        with self._lock:
+            self.counters["requests"] += 1
+            draw = self._rng.random()
+            if self.rpm:
+                now = time.monotonic()
+                self._window = [t for t in self._window if now - t < 60]
+                if len(self._window) >= self.rpm:
+                    self.counters["rate_limited"] += 1
+                    return 429, "Rate limit reached for requests"
+                self._window.append(now)
+            if draw < self.rate_limit_rate:
+                self.counters["rate_limited"] += 1
+                return 429, "Rate limit reached for requests"
+            if draw < self.rate_limit_rate + self.error_rate:
+                self.counters["errors"] += 1
+                return 500, "The server had an error while processing your request"
+        return None
+
+    def _enter(self) -> float:
+        with self._lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            return self.latency(self._rng)
+
+    def _exit(self):
+        with self._lock:
+            self._in_flight -= 1
+            self.counters["completed"] += 1
+
+    def complete(self, request: dict) -> dict:
+        """Build the assistant message for a chat completions request."""
+        messages = request.get("messages", [])
+        classification = self.policy.classify(messages)
+        response_format = request.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"]["schema"]
+            return {"role": "assistant", "content": json.dumps(placeholder(schema, classification=classification))}
+
+        tools = {t["function"]["name"]: t["function"] for t in request.get("tools", ())}
+        choice = request.get("tool_choice")
+        forced = choice.get("function", {}).get("name") if isinstance(choice, dict) else None
+        if forced in tools:
+            # Structured output through a forced function call
+            args = placeholder(tools[forced].get("parameters", {}), classification=classification)
+            return self._tool_call_message(forced, args)
+        if tools:
+            plan = self.policy.agent_plan(messages, list(tools))
+            step = sum(1 for m in messages if m.get("role") == "tool")
+            if step < len(plan):
+                name = plan[step]
+                return self._tool_call_message(name, placeholder(tools[name].get("parameters", {})))
+            return {"role": "assistant", "content": "I have replied to the email."}
+        return {"role": "assistant", "content": f"Stub reply ({classification})."}
+
+    @staticmethod
+    def _tool_call_message(name: str, args: dict) -> dict:
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {"id": f"call_{uuid.uuid4().hex[:12]}", "type": "function", "function": {"name": name, "arguments": json.dumps(args)}}
+            ],
+        }
+
+    def stats(self) -> dict:
+        """Return requests, completions, injected failures and peak concurrency."""
+        with self._lock:
+            return {**self.counters, "in_flight": self._in_flight, "max_in_flight": self.max_in_flight}
+
+    def start(self, port: int = 0, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve on a daemon thread; port 0 picks a free port (see ``url``)."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path.rstrip("/") != "/stats":
+                    self.send_error(404)
+                    return
+                self._json(200, stub.stats())
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                injected = stub._admit()
+                if injected is not None:
+                    status, message = injected
+                    headers = {"Retry-After": str(stub.retry_after)} if status == 429 else {}
+                    self._json(status, {"error": {"message": message, "type": "stub_error", "code": status}}, headers)
+                    return
+                delay = stub._enter()
+                try:
+                    time.sleep(delay)
+                    message = stub.complete(body)
+                    self._respond(body, message)
+                finally:
+                    stub._exit()
+
+            def _respond(self, request: dict, message: dict):
+                prompt_tokens = sum(len(_text(m)) for m in request.get("messages", [])) // 4
+                completion_tokens = len(json.dumps(message)) // 4
+                base = {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                    "created": int(time.time()),
+                    "model": request.get("model", "stub"),
+                }
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                }
+                finish = "tool_calls" if message.get("tool_calls") else "stop"
+                if not request.get("stream"):
+                    self._json(200, {
+                        **base,
+                        "object": "chat.completion",
+                        "choices": [{"index": 0, "message": message, "finish_reason": finish}],
+                        "usage": usage,
+                    })
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for delta, reason in _stream_deltas(message, finish):
+                    chunk = {**base, "object": "chat.completion.chunk",
+                             "choices": [{"index": 0, "delta": delta, "finish_reason": reason}]}
+                    if reason is not None and (request.get("stream_options") or {}).get("include_usage"):
+                        chunk["usage"] = usage
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def _json(self, status: int, payload: dict, headers: dict = None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.server = server
+        return server
+
+    def stop(self):
+        """Shut the server down."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def _stream_deltas(message: dict, finish: str):
+    """Split an assistant message into streaming deltas, word by word for text."""
+    yield {"role": "assistant", "content": ""}, None
+    if message.get("tool_calls"):
+        for index, call in enumerate(message["tool_calls"]):
+            yield {"tool_calls": [{"index": index, "id": call["id"], "type": "function",
+                                   "function": {"name": call["function"]["name"], "arguments": ""}}]}, None
+            yield {"tool_calls": [{"index": index, "function": {"arguments": call["function"]["arguments"]}}]}, None
+    else:
+        words = (message.get("content") or "").split(" ")
+        for i, word in enumerate(words):
+            yield {"content": word if i == 0 else f" {word}"}, None
+    yield {}, finish
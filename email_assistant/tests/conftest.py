@@ -1,8 +1,66 @@
 """Pytest configuration and fixtures."""
 
+import importlib
+import os
+from pathlib import Path
+
 import pytest
 import uuid
 from email_assistant.agent import graph
+from email_assistant.utils.router import RouterSchema
+from email_assistant.utils.triage_cache import MemoryTriageCache, set_triage_cache
+from email_assistant.utils.similarity_index import SimilarityIndex, set_similarity_index
+from email_assistant.utils import tool_cache
+from email_assistant.utils.cassette import Cassette, get_cassette, set_cassette
+
+
+# Model calls of the live tests, recorded with --cassette=record
+CASSETTE_PATH = Path(__file__).parent / "cassettes" / "models.jsonl"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--cassette",
+        choices=["off", "replay", "record", "auto"],
+        default=None,
+        help="Model cassette mode (default: replay when the cassette exists, else skip live tests)",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip the tests that call real models when there is nothing to replay.
+
+    They only reach the network when asked to with ``--cassette=off``,
+    ``record`` or ``auto`` (or ``EMAIL_ASSISTANT_CASSETTE``).
+    """
+    if config.getoption("--cassette") or os.getenv("EMAIL_ASSISTANT_CASSETTE") or CASSETTE_PATH.exists():
+        return
+    skip = pytest.mark.skip(reason=f"no model cassette at {CASSETTE_PATH}; record one with --cassette=record")
+    for item in items:
+        if "langsmith" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def model_cassette(request):
+    """Record or replay the model calls of the whole session.
+
+    ``EMAIL_ASSISTANT_CASSETTE`` takes precedence when set and no mode is given.
+
+    Returns:
+        The active Cassette, or None when models are called live
+    """
+    mode = request.config.getoption("--cassette")
+    if mode is None and get_cassette() is not None:
+        yield get_cassette()
+        return
+    if mode is None:
+        mode = "replay" if CASSETTE_PATH.exists() else "off"
+    previous = get_cassette()
+    cassette = None if mode == "off" else Cassette(str(CASSETTE_PATH), mode)
+    set_cassette(cassette)
+    yield cassette
+    set_cassette(previous)
 
 
 @pytest.fixture
@@ -24,4 +82,76 @@ def thread_config():
     Returns:
         Configuration dict with unique thread_id
     """
-    return {"configurable": {"thread_id": f"test-thread-{uuid.uuid4()}"}}
\ No newline at end of file
+    return {"configurable": {"thread_id": f"test-thread-{uuid.uuid4()}"}}
+
+
+@pytest.fixture(autouse=True)
+def triage_cache():
+    """Give each test an empty in-memory triage cache.
+
+    Returns:
+        The MemoryTriageCache active for the test
+    """
+    cache = MemoryTriageCache()
+    set_triage_cache(cache)
+    yield cache
+    set_triage_cache(MemoryTriageCache())
+
+
+@pytest.fixture(autouse=True)
+def tool_cache_store():
+    """Give each test an empty tool result cache, shared by both graphs.
+
+    Returns:
+        The ToolResultCache instance
+    """
+    cache = tool_cache.ToolResultCache()
+    tool_cache.set_tool_cache(cache)
+    yield cache
+    tool_cache.set_tool_cache(tool_cache.ToolResultCache())
+
+
+@pytest.fixture
+def similarity_index():
+    """Enable an empty near-duplicate index that never audits.
+
+    Returns:
+        The SimilarityIndex active for the test
+    """
+    index = SimilarityIndex(audit_rate=0.0)
+    set_similarity_index(index)
+    yield index
+    set_similarity_index(None)
+
+
+class StubRouter:
+    """Offline stand-in for the triage router LLM.
+
+    Returns a fixed classification and records every prompt it receives.
+    """
+
+    def __init__(self, classification: str = "ignore"):
+        self.classification = classification
+        self.calls = []
+        self.async_calls = 0
+
+    def invoke(self, messages):
+        self.calls.append(messages)
+        return RouterSchema(reasoning="stub", classification=self.classification)
+
+    async def ainvoke(self, messages):
+        self.async_calls += 1
+        return self.invoke(messages)
+
+
+@pytest.fixture
+def stub_router(monkeypatch):
+    """Replace the triage router LLM with a StubRouter.
+
+    Returns:
+        The StubRouter; set its ``classification`` to change the decision
+    """
+    router = StubRouter()
+    triage_module = importlib.import_module("email_assistant.nodes.triage_router")
+    monkeypatch.setattr(triage_module, "get_llm_router", lambda: router)
+    return router
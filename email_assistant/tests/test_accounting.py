@@ -0,0 +1,84 @@
+"""Tests for per-node, per-email and per-model token accounting."""
+
+import importlib
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from email_assistant.agent import create_graph
+from email_assistant.scripts import usage_report
+from email_assistant.tests.test_data import get_test_email
+from email_assistant.tests.utils import ScriptedChatModel
+from email_assistant.utils.accounting import UsageLedger, call_cost, create_usage_sink, set_usage_ledger, summarize
+
+USAGE = {"input_tokens": 1000, "output_tokens": 100, "total_tokens": 1100, "input_token_details": {"cache_read": 400}}
+
+
+@pytest.fixture
+def ledger():
+    ledger = UsageLedger()
+    set_usage_ledger(ledger)
+    yield ledger
+    set_usage_ledger(UsageLedger())
+
+
+def test_cached_tokens_are_billed_at_the_cached_price():
+    # 600 uncached at $0.15/M, 400 cached at $0.075/M, 100 output at $0.60/M
+    assert call_cost("gpt-4o-mini-2024-07-18", 1000, 400, 100) == pytest.approx((90 + 30 + 60) / 1_000_000)
+    assert call_cost("unknown-model", 1000, 0, 100) == 0.0
+
+
+def test_calls_before_triage_move_to_the_classification():
+    ledger = UsageLedger()
+    ledger.record_call("t1", "triage_router", "gpt-4o-mini", USAGE)
+    ledger.record_classification("t1", "respond")
+    ledger.record_call("t1", "agent", "gpt-4o", USAGE)
+    ledger.record_call(None, "agent", "gpt-4o", USAGE)
+
+    stats = ledger.stats()
+    assert stats["by_classification"]["respond"]["calls"] == 2
+    assert stats["by_classification"]["unknown"]["calls"] == 1
+    assert stats["by_node"]["agent"]["cached_tokens"] == 800
+    assert stats["by_node_model"]["triage_router/gpt-4o-mini"]["calls"] == 1
+    assert ledger.thread_usage("t1")["classification"] == "respond"
+
+
+@pytest.mark.parametrize("kind", ["jsonl", "sqlite"])
+def test_flushed_records_summarize_like_the_ledger(tmp_path, kind):
+    spec = f"{kind}:{tmp_path / 'usage'}"
+    ledger = UsageLedger(create_usage_sink(spec), flush_records=2)
+    ledger.record_call("t1", "triage_router", "gpt-4o-mini", USAGE)
+    ledger.record_classification("t1", "notify")
+    ledger.record_call("t2", "triage_router", "gpt-4o-mini", USAGE)
+    ledger.flush()
+
+    report = summarize(create_usage_sink(spec).read())
+    assert report["emails"] == 1
+    assert report["by_classification"]["notify"]["calls"] == 1
+    assert report["by_classification"]["unknown"]["calls"] == 1
+    assert report["total"]["cost_usd"] == pytest.approx(ledger.stats()["total"]["cost_usd"])
+
+
+def test_usage_report_prints_the_breakdown(tmp_path, capsys):
+    spec = f"jsonl:{tmp_path / 'usage.jsonl'}"
+    ledger = UsageLedger(create_usage_sink(spec))
+    ledger.record_call("t1", "agent", "gpt-4o", USAGE)
+    ledger.flush()
+
+    assert usage_report.main(["--usage", spec]) == 0
+    output = capsys.readouterr().out
+    assert "By classification" in output and "gpt-4o" in output
+
+
+def test_graph_runs_are_attributed_to_node_model_and_thread(monkeypatch, stub_router, ledger, thread_config):
+    stub_router.classification = "respond"
+    reply = AIMessage(content="Done", usage_metadata=USAGE, response_metadata={"model_name": "gpt-4o"})
+    llm = ScriptedChatModel(responses=[reply])
+    monkeypatch.setattr(importlib.import_module("email_assistant.nodes.agent_node"), "get_llm_router_with_tools", lambda: llm)
+
+    create_graph().invoke({"email_input": get_test_email(3)}, thread_config)
+
+    usage = ledger.thread_usage(thread_config["configurable"]["thread_id"])
+    assert usage["classification"] == "respond"
+    assert usage["calls"] == 1 and usage["cached_tokens"] == 400
+    assert ledger.stats()["by_node_model"]["agent/gpt-4o"]["input_tokens"] == 1000
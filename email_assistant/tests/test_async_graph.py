@@ -0,0 +1,141 @@
+"""Tests for the async graph execution path."""
+
+import asyncio
+import importlib
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import Command
+
+from email_assistant.agent import create_graph
+from email_assistant.tests.test_data import get_test_email
+from email_assistant_hitl.agent import create_graph as create_hitl_graph
+from email_assistant_hitl.utils.router import RouterSchema as HitlRouterSchema
+
+# An email no bundled triage rule matches
+EMAIL = get_test_email(3)
+
+
+class StubChatModel:
+    """Replays scripted AI messages and records which path served each call."""
+
+    def __init__(self, responses, delay=0.0):
+        self.responses = list(responses)
+        self.delay = delay
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append("sync")
+        return self.responses.pop(0)
+
+    async def ainvoke(self, messages):
+        self.calls.append("async")
+        await asyncio.sleep(self.delay)
+        return self.responses.pop(0)
+
+
+def tool_call(name, args, call_id="call_1"):
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": call_id}])
+
+
+@pytest.fixture
+def stub_agent_llm(monkeypatch):
+    """Script the agent LLM: one search_emails call, then a final answer."""
+    llm = StubChatModel([tool_call("search_emails", {"query": "status"}), AIMessage(content="Done")])
+    agent_module = importlib.import_module("email_assistant.nodes.agent_node")
+    monkeypatch.setattr(agent_module, "get_llm_router_with_tools", lambda: llm)
+    return llm
+
+
+def test_ainvoke_runs_every_node_async(stub_router, stub_agent_llm):
+    stub_router.classification = "respond"
+
+    result = asyncio.run(create_graph().ainvoke({"email_input": EMAIL}))
+
+    assert stub_router.async_calls == len(stub_router.calls) == 1
+    assert stub_agent_llm.calls == ["async", "async"]
+    assert result["messages"][-2].content.startswith("Found emails matching 'status'")
+    assert result["messages"][-1].content == "Done"
+
+
+def test_sync_invoke_still_works(stub_router, stub_agent_llm):
+    stub_router.classification = "respond"
+
+    result = create_graph().invoke({"email_input": EMAIL})
+
+    assert stub_agent_llm.calls == ["sync", "sync"]
+    assert result["messages"][-1].content == "Done"
+
+
+def test_astream_yields_node_updates(stub_router, stub_agent_llm):
+    stub_router.classification = "respond"
+
+    async def collect():
+        return [list(chunk) async for chunk in create_graph().astream({"email_input": EMAIL})]
+
+    assert asyncio.run(collect()) == [["triage_router"], ["agent"], ["tools"], ["agent"]]
+
+
+def test_concurrent_runs_do_not_block_the_event_loop(monkeypatch, stub_router):
+    stub_router.classification = "respond"
+    agent_module = importlib.import_module("email_assistant.nodes.agent_node")
+    llm = StubChatModel([AIMessage(content="Done") for _ in range(10)], delay=0.2)
+    monkeypatch.setattr(agent_module, "get_llm_router_with_tools", lambda: llm)
+    graph = create_graph()
+
+    async def run_all():
+        return await asyncio.gather(*(graph.ainvoke({"email_input": EMAIL}) for _ in range(10)))
+
+    start = time.perf_counter()
+    results = asyncio.run(run_all())
+
+    # Ten 0.2s model calls overlap instead of running back to back
+    assert time.perf_counter() - start < 1.0
+    assert all(r["messages"][-1].content == "Done" for r in results)
+
+
+@pytest.fixture
+def stub_hitl_llms(monkeypatch):
+    """Script the HITL graph: respond, draft one email, then confirm."""
+    router = StubChatModel([HitlRouterSchema(reasoning="stub", classification="respond")])
+    llm = StubChatModel([
+        tool_call("write_email", {"to": "a@example.com", "subject": "Re: hi", "content": "Hello"}),
+        AIMessage(content="Sent the reply"),
+    ])
+    monkeypatch.setattr(importlib.import_module("email_assistant_hitl.nodes.triage_router"), "get_llm_router", lambda: router)
+    monkeypatch.setattr(importlib.import_module("email_assistant_hitl.nodes.agent_node_hitl"), "get_llm_with_tools_hitl", lambda: llm)
+    return router, llm
+
+
+def check_hitl_run(first, resumed):
+    assert first["__interrupt__"][0].value[0]["action_request"]["action"] == "write_email"
+    assert resumed["messages"][-2].content == "Email sent to a@example.com with subject 'Re: hi' and content: Hello"
+    assert resumed["messages"][-1].content == "Sent the reply"
+
+
+def test_hitl_graph_interrupts_and_resumes_async(stub_hitl_llms):
+    graph = create_hitl_graph(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "async-hitl"}}
+
+    async def run():
+        first = await graph.ainvoke({"email_input": EMAIL}, config)
+        resumed = await graph.ainvoke(Command(resume=[{"type": "accept", "args": ""}]), config)
+        return first, resumed
+
+    check_hitl_run(*asyncio.run(run()))
+    router, llm = stub_hitl_llms
+    assert router.calls == ["async"] and llm.calls == ["async", "async"]
+
+
+def test_hitl_graph_interrupts_and_resumes_sync(stub_hitl_llms):
+    graph = create_hitl_graph(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "sync-hitl"}}
+
+    first = graph.invoke({"email_input": EMAIL}, config)
+    resumed = graph.invoke(Command(resume=[{"type": "accept", "args": ""}]), config)
+
+    check_hitl_run(first, resumed)
+    router, llm = stub_hitl_llms
+    assert router.calls == ["sync"] and llm.calls == ["sync", "sync"]
@@ -0,0 +1,110 @@
+"""Tests for batched triage."""
+
+import json
+
+import pytest
+
+from email_assistant import batch_triage
+from email_assistant.scripts import triage_backlog
+from email_assistant.tests.test_data import get_test_email
+from email_assistant.utils.router import BatchRouterItem, BatchRouterSchema
+
+# Emails no bundled triage rule matches, so they all need the model
+MODEL_EMAILS = [get_test_email(i) for i in (0, 1, 3, 6)]
+LABELS = ["respond", "notify", "respond", "respond"]
+
+
+class StubBatchRouter:
+    """Answers batches from a subject -> classification map."""
+
+    def __init__(self, drop=(), duplicate=(), fail=False):
+        self.drop, self.duplicate, self.fail = set(drop), set(duplicate), fail
+        self.batches = []
+
+    def invoke(self, messages):
+        prompt = messages[1]["content"]
+        count = prompt.count("### Email ")
+        self.batches.append(count)
+        if self.fail:
+            raise ValueError("malformed response")
+        items = []
+        for index in reversed(range(count)):
+            block = prompt.split(f"### Email {index}\n")[1]
+            label = next(l for e, l in zip(MODEL_EMAILS, LABELS) if e["subject"] in block.split("### Email")[0])
+            if index not in self.drop:
+                items.append(BatchRouterItem(index=index, reasoning="batch", classification=label))
+            if index in self.duplicate:
+                items.append(BatchRouterItem(index=index, reasoning="batch", classification="ignore"))
+        return BatchRouterSchema(results=items)
+
+
+@pytest.fixture
+def batch_router(monkeypatch):
+    router = StubBatchRouter()
+    monkeypatch.setattr(batch_triage, "get_llm_batch_router", lambda: router)
+    return router
+
+
+def test_plan_batches_respects_budgets():
+    texts = ["x" * 400] * 5  # ~101 tokens each
+    assert batch_triage.plan_batches(texts, max_batch_tokens=250, max_batch_size=10) == [[0, 1], [2, 3], [4]]
+    assert batch_triage.plan_batches(texts, max_batch_tokens=10_000, max_batch_size=3) == [[0, 1, 2], [3, 4]]
+    assert batch_triage.plan_batches(["x" * 4000, "y"], max_batch_tokens=100) == [[0], [1]]
+
+
+def test_one_call_per_batch_in_input_order(batch_router, stub_router):
+    results = batch_triage.triage_batch(MODEL_EMAILS)
+
+    assert [r.classification for r in results] == LABELS
+    assert batch_router.batches == [4]
+    assert stub_router.calls == []
+
+
+def test_shortcuts_are_not_batched(batch_router, stub_router):
+    results = batch_triage.triage_batch([get_test_email(5)] + MODEL_EMAILS)
+
+    assert results[0].classification == "ignore"
+    assert batch_router.batches == [4]
+
+
+def test_batches_are_split_by_size(batch_router, stub_router):
+    batch_triage.triage_batch(MODEL_EMAILS, max_batch_size=3)
+    assert batch_router.batches == [3]  # the trailing single email goes straight to the router
+    assert len(stub_router.calls) == 1
+
+
+@pytest.mark.parametrize("router", [StubBatchRouter(drop={1}), StubBatchRouter(duplicate={2})])
+def test_missing_or_ambiguous_items_fall_back(monkeypatch, stub_router, router):
+    monkeypatch.setattr(batch_triage, "get_llm_batch_router", lambda: router)
+    stub_router.classification = "notify"
+
+    results = batch_triage.triage_batch(MODEL_EMAILS)
+
+    assert len(stub_router.calls) == 1
+    assert sum(r.reasoning == "stub" for r in results) == 1
+
+
+def test_failed_batch_falls_back_per_item(monkeypatch, stub_router):
+    monkeypatch.setattr(batch_triage, "get_llm_batch_router", lambda: StubBatchRouter(fail=True))
+
+    results = batch_triage.triage_batch(MODEL_EMAILS)
+
+    assert len(stub_router.calls) == len(MODEL_EMAILS)
+    assert all(r.reasoning == "stub" for r in results)
+
+
+def test_decisions_are_cached(batch_router, stub_router):
+    batch_triage.triage_batch(MODEL_EMAILS)
+    batch_triage.triage_batch(MODEL_EMAILS)
+    assert batch_router.batches == [4]
+
+
+def test_backlog_command(batch_router, stub_router, tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    source.write_text("".join(json.dumps({"email_input": e}) + "\n" for e in MODEL_EMAILS))
+
+    assert triage_backlog.main(["--input", str(source), "--output", str(output)]) == 0
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["classification_decision"] for r in records] == LABELS
+    assert records[0]["email_input"] == MODEL_EMAILS[0]
@@ -0,0 +1,53 @@
+"""Tests for the end-to-end graph benchmark."""
+
+import asyncio
+
+from email_assistant.benchmarks.bench_graph import TimedSaver, compare, measure, synthetic_corpus
+from email_assistant.tests.test_data import email_inputs
+from email_assistant.utils.metrics import MetricsRegistry, get_metrics, set_metrics
+
+
+def test_corpus_subjects_are_unique_per_pass():
+    first, second = synthetic_corpus(len(email_inputs) * 2), synthetic_corpus(3, start=100)
+    subjects = [email["subject"] for email in first + second]
+    assert len(set(subjects)) == len(subjects)
+    assert first[len(email_inputs)]["author"] == email_inputs[0]["author"]
+
+
+def test_measure_runs_both_graphs_to_completion():
+    results = measure(emails=len(email_inputs) * 2, max_concurrency=3)
+
+    assert set(results) == {"agent", "agent_hitl"}
+    assert list(results["agent"]["emails_per_s"]) == ["1", "2", "3"]
+    assert {"triage_router", "agent", "tools"} <= set(results["agent"]["node_ms"])
+    assert "action_handler_hitl" in results["agent_hitl"]["node_ms"]
+    assert all(result["checkpoint_ms_per_step"] > 0 for result in results.values())
+    assert all(result["peak_memory_mb"] > 0 for result in results.values())
+
+
+def test_measure_restores_the_metrics_registry():
+    registry = MetricsRegistry()
+    set_metrics(registry)
+
+    measure(emails=len(email_inputs), max_concurrency=1)
+
+    assert get_metrics() is registry
+
+
+def test_timed_saver_times_checkpoint_reads():
+    saver = TimedSaver()
+    config = {"configurable": {"thread_id": "t", "checkpoint_ns": ""}}
+
+    assert asyncio.run(saver.aget_tuple(config)) is None
+    assert saver.get_tuple(config) is None
+    assert saver.seconds > 0
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"agent": {"emails_per_s": {"1": 100.0}, "overhead_ms": 1.0, "peak_memory_mb": 10.0}}
+    results = {"agent": {"emails_per_s": {"1": 70.0}, "overhead_ms": 1.1, "peak_memory_mb": 20.0}}
+
+    regressions = compare(results, baseline, tolerance=0.2)
+
+    assert [r.split(":")[0] for r in regressions] == ["agent.emails_per_s.1", "agent.peak_memory_mb"]
+    assert compare(baseline, baseline) == []
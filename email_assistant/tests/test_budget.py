@@ -0,0 +1,127 @@
+"""Tests for per-email call, token and time budgets."""
+
+import asyncio
+import importlib
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+from langgraph.checkpoint.memory import MemorySaver
+
+from email_assistant import tools
+from email_assistant.agent import create_graph
+from email_assistant.tests.test_data import get_test_email
+from email_assistant.tests.utils import ScriptedChatModel, tool_call_message
+from email_assistant.utils.budget import EmailBudget, budget_from_config, call_tokens, charge, start_usage
+from email_assistant_hitl.agent import create_graph as create_hitl_graph
+from email_assistant_hitl.utils.router import RouterSchema as HitlRouterSchema
+
+EMAIL = get_test_email(3)
+
+
+def endless_searches(count: int = 50) -> list:
+    """A model that never stops looking things up."""
+    return [tool_call_message("search_events", {"query": f"q{i}"}, f"call_{i}") for i in range(count)]
+
+
+class RespondRouter:
+    def invoke(self, messages):
+        return HitlRouterSchema(reasoning="stub", classification="respond")
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+@pytest.fixture
+def looping_agent(monkeypatch, stub_router):
+    stub_router.classification = "respond"
+    monkeypatch.setattr(tools.search_events, "coroutine", None)
+    llm = ScriptedChatModel(responses=endless_searches())
+    monkeypatch.setattr(importlib.import_module("email_assistant.nodes.agent_node"), "get_llm_router_with_tools", lambda: llm)
+
+
+def test_budget_from_config_overrides_defaults():
+    budget = budget_from_config({"configurable": {"email_budget": {"max_llm_calls": 2}}})
+
+    assert budget.max_llm_calls == 2
+    assert budget.max_tokens == EmailBudget().max_tokens
+    assert budget_from_config(None) == EmailBudget()
+    with pytest.raises(TypeError):
+        budget_from_config({"configurable": {"email_budget": {"max_calls": 2}}})
+
+
+def test_exhausted_reports_the_first_spent_budget():
+    usage = charge(start_usage(), [{"role": "user", "content": "hi"}], AIMessage(content="hello"))
+
+    assert usage["llm_calls"] == 1 and usage["tokens"] > 0
+    assert EmailBudget(max_llm_calls=1).exhausted(usage) == "llm_calls"
+    assert EmailBudget(max_llm_calls=0, max_tokens=1).exhausted(usage) == "tokens"
+    usage["started_at"] = time.time() - 10
+    assert EmailBudget(max_llm_calls=0, max_tokens=0, deadline_seconds=5).exhausted(usage) == "deadline"
+    assert EmailBudget(max_llm_calls=0, max_tokens=0, deadline_seconds=0).exhausted(usage) is None
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_call_budget_stops_the_loop_gracefully(looping_agent, mode):
+    config = {"configurable": {"email_budget": {"max_llm_calls": 3}}}
+    payload = {"email_input": EMAIL}
+
+    result = create_graph().invoke(payload, config) if mode == "sync" else asyncio.run(create_graph().ainvoke(payload, config))
+
+    usage = result["budget_usage"]
+    assert usage["exhausted"] == "llm_calls"
+    assert usage["llm_calls"] == 3
+    # The partial work stays in state; the third call spent the budget, so its lookup never ran
+    assert len([m for m in result["messages"] if m.type == "tool"]) == 2
+    assert "budget" in result["messages"][-1].content
+
+
+def test_token_budget_stops_the_loop(looping_agent):
+    result = create_graph().invoke({"email_input": EMAIL}, {"configurable": {"email_budget": {"max_tokens": 1}}})
+
+    assert result["budget_usage"]["exhausted"] == "tokens"
+    assert result["budget_usage"]["llm_calls"] == 1
+    assert not [m for m in result["messages"] if m.type == "tool"]
+
+
+def test_budget_is_charged_on_the_fitted_request(monkeypatch, stub_router):
+    stub_router.classification = "respond"
+    agent_node = importlib.import_module("email_assistant.nodes.agent_node")
+    llm = ScriptedChatModel(responses=[AIMessage(content="Done")])
+    monkeypatch.setattr(agent_node, "get_llm_router_with_tools", lambda: llm)
+    # A context window that keeps only the system prompt
+    monkeypatch.setattr(agent_node, "fit_context", lambda messages: (messages[:1], None))
+
+    usage = create_graph().invoke({"email_input": EMAIL})["budget_usage"]
+
+    assert usage["tokens"] == call_tokens(agent_node.agent_messages({"messages": []})[:1], AIMessage(content="Done"))
+
+
+def test_runs_within_budget_report_usage(monkeypatch, stub_router):
+    stub_router.classification = "respond"
+    llm = ScriptedChatModel(responses=[AIMessage(content="Done")])
+    monkeypatch.setattr(importlib.import_module("email_assistant.nodes.agent_node"), "get_llm_router_with_tools", lambda: llm)
+
+    usage = create_graph().invoke({"email_input": EMAIL})["budget_usage"]
+
+    assert usage["llm_calls"] == 1
+    assert usage["exhausted"] is None
+
+
+def test_hitl_call_budget_stops_the_loop(monkeypatch):
+    def search_events(query: str) -> str:
+        """Search calendar events."""
+        return f"events for {query}"
+
+    handler = importlib.import_module("email_assistant_hitl.nodes.action_handler_hitl")
+    monkeypatch.setitem(handler.tools_by_name, "search_events", StructuredTool.from_function(search_events))
+    monkeypatch.setattr(importlib.import_module("email_assistant_hitl.nodes.triage_router"), "get_llm_router", RespondRouter)
+    llm = ScriptedChatModel(responses=endless_searches())
+    monkeypatch.setattr(importlib.import_module("email_assistant_hitl.nodes.agent_node_hitl"), "get_llm_with_tools_hitl", lambda: llm)
+    config = {"configurable": {"thread_id": "budget-hitl", "email_budget": {"max_llm_calls": 2}}}
+
+    result = create_hitl_graph(checkpointer=MemorySaver()).invoke({"email_input": EMAIL}, config)
+
+    assert result["budget_usage"]["exhausted"] == "llm_calls"
+    assert result["budget_usage"]["llm_calls"] == 2
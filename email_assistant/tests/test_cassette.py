@@ -0,0 +1,120 @@
+"""Tests for recording and replaying model calls."""
+
+import importlib
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from email_assistant.agent import create_graph
+from email_assistant.tests.test_data import get_test_email
+from email_assistant.tests.utils import tool_call_message
+from email_assistant.utils.cassette import (
+    Cassette,
+    CassetteMiss,
+    CassetteRunnable,
+    get_cassette,
+    model_signature,
+    request_key,
+    set_cassette,
+)
+from email_assistant.utils.router import RouterSchema
+from email_assistant.utils.triage_cache import set_triage_cache
+
+MESSAGES = [{"role": "system", "content": "Classify"}, {"role": "user", "content": "Lunch?"}]
+
+
+class FakeModel:
+    """Returns the given response and counts calls; fails if ``response`` is None."""
+
+    def __init__(self, response=None):
+        self.response = response
+        self.calls = 0
+
+    def invoke(self, input, config=None, **kwargs):
+        self.calls += 1
+        if self.response is None:
+            raise AssertionError("the model was called during replay")
+        return self.response
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        return self.invoke(input, config)
+
+
+@pytest.fixture(autouse=True)
+def restore_cassette():
+    previous = get_cassette()
+    yield
+    set_cassette(previous)
+
+
+def test_structured_and_message_responses_replay_offline(tmp_path):
+    path = str(tmp_path / "models.jsonl")
+    router_signature = model_signature("gpt-4o-mini", schema=RouterSchema)
+    agent_signature = model_signature("gpt-4o", temperature=0)
+    decision = RouterSchema(reasoning="Lunch invite", classification="respond")
+    reply = tool_call_message("search_events", {"query": "lunch"}, call_id="call_recorded")
+
+    set_cassette(Cassette(path, "record"))
+    CassetteRunnable(FakeModel(decision), router_signature, RouterSchema).invoke(MESSAGES)
+    CassetteRunnable(FakeModel(reply), agent_signature).invoke(MESSAGES)
+
+    set_cassette(Cassette(path, "replay"))
+    assert CassetteRunnable(FakeModel(), router_signature, RouterSchema).invoke(MESSAGES) == decision
+    replayed = CassetteRunnable(FakeModel(), agent_signature).invoke(MESSAGES)
+    assert replayed.tool_calls[0]["name"] == "search_events" and replayed.tool_calls[0]["id"] == "call_recorded"
+
+
+def test_keys_ignore_tool_call_ids_but_not_the_model():
+    first = [tool_call_message("search_events", {"query": "lunch"}, call_id="a")]
+    second = [tool_call_message("search_events", {"query": "lunch"}, call_id="b")]
+    signature = model_signature("gpt-4o")
+    assert request_key(signature, first) == request_key(signature, second)
+    assert request_key(signature, first) != request_key(model_signature("gpt-4o-mini"), first)
+
+
+def test_unrecorded_request_fails_in_replay_and_records_in_auto(tmp_path):
+    path = str(tmp_path / "models.jsonl")
+    signature = model_signature("gpt-4o")
+    set_cassette(Cassette(path, "auto"))
+    model = FakeModel(AIMessage(content="Recorded"))
+    runnable = CassetteRunnable(model, signature)
+    assert runnable.invoke(MESSAGES).content == "Recorded"
+    assert runnable.invoke(MESSAGES).content == "Recorded"
+    assert model.calls == 1
+
+    cassette = Cassette(path, "replay")
+    set_cassette(cassette)
+    with pytest.raises(CassetteMiss):
+        CassetteRunnable(FakeModel(), signature).invoke(MESSAGES + [{"role": "user", "content": "And dinner?"}])
+    assert cassette.stats()["misses"] == 1
+
+
+def test_replay_can_simulate_recorded_latency(tmp_path):
+    path = str(tmp_path / "models.jsonl")
+    signature = model_signature("gpt-4o")
+    set_cassette(Cassette(path, "record"))
+    CassetteRunnable(FakeModel(AIMessage(content="ok")), signature).invoke(MESSAGES)
+    set_cassette(Cassette(path, "replay", latency="0.05"))
+
+    start = time.perf_counter()
+    CassetteRunnable(FakeModel(), signature).invoke(MESSAGES)
+    assert time.perf_counter() - start >= 0.05
+
+
+def test_graph_run_replays_without_the_model(monkeypatch, tmp_path):
+    path = str(tmp_path / "models.jsonl")
+    signature = model_signature("gpt-4o-mini", schema=RouterSchema)
+    triage_module = importlib.import_module("email_assistant.nodes.triage_router")
+    decision = RouterSchema(reasoning="Newsletter", classification="ignore")
+    set_triage_cache(None)  # the replayed run must reach the router
+
+    set_cassette(Cassette(path, "record"))
+    monkeypatch.setattr(triage_module, "get_llm_router", lambda: CassetteRunnable(FakeModel(decision), signature, RouterSchema))
+    recorded = create_graph().invoke({"email_input": get_test_email(0)})
+
+    set_cassette(Cassette(path, "replay"))
+    monkeypatch.setattr(triage_module, "get_llm_router", lambda: CassetteRunnable(FakeModel(), signature, RouterSchema))
+    replayed = create_graph().invoke({"email_input": get_test_email(0)})
+
+    assert replayed["classification_decision"] == recorded["classification_decision"] == "ignore"
@@ -0,0 +1,98 @@
+"""Tests for the token-budgeted agent message window."""
+
+import importlib
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from email_assistant import tools
+from email_assistant.agent import create_graph
+from email_assistant.tests.test_data import get_test_email
+from email_assistant.tests.utils import ScriptedChatModel, tool_call_message
+from email_assistant.utils.context_window import ELIDED_OBSERVATION, ContextWindow, set_context_window
+
+LONG_OUTPUT = "event details " * 400  # ~1400 tokens
+
+
+def react_history(steps: int) -> list:
+    """System prompt, the email, then ``steps`` search steps with long results."""
+    messages = [{"role": "system", "content": "You are an assistant."}, HumanMessage(content="Respond to the email: hi")]
+    for i in range(steps):
+        messages.append(tool_call_message("search_events", {"query": f"q{i}"}, f"call_{i}"))
+        messages.append(ToolMessage(content=LONG_OUTPUT, tool_call_id=f"call_{i}"))
+    return messages
+
+
+@pytest.fixture
+def context_window():
+    window = ContextWindow(budget_tokens=2000, max_observation_tokens=100)
+    set_context_window(window)
+    yield window
+    set_context_window(ContextWindow())
+
+
+def test_fit_leaves_small_requests_untouched():
+    messages = react_history(1)
+    fitted, report = ContextWindow(budget_tokens=8000).fit(messages)
+
+    assert fitted is messages
+    assert report["truncated"] == report["elided"] == []
+    assert report["tokens_after"] == report["tokens_before"]
+
+
+def test_fit_truncates_older_observations_and_keeps_the_latest():
+    messages = react_history(3)
+    fitted, report = ContextWindow(budget_tokens=2000, max_observation_tokens=100).fit(messages)
+
+    assert report["truncated"] == ["call_0", "call_1"]
+    assert report["elided"] == []
+    assert report["tokens_after"] <= 2000 < report["tokens_before"]
+    assert "tokens truncated]" in fitted[3].content
+    assert fitted[-1].content == LONG_OUTPUT
+    assert fitted[1].content == messages[1].content
+    # The caller's messages (the graph state) are never modified
+    assert messages[3].content == LONG_OUTPUT
+
+
+def test_fit_elides_when_truncation_is_not_enough():
+    messages = react_history(12)
+    fitted, report = ContextWindow(budget_tokens=2000, max_observation_tokens=100).fit(messages)
+
+    assert len(report["truncated"]) == 11
+    assert report["elided"][0] == "call_0"
+    assert fitted[3].content == ELIDED_OBSERVATION
+    assert fitted[-1].content == LONG_OUTPUT
+    assert len(fitted) == len(messages)
+
+
+def test_fit_reports_requests_it_cannot_fit():
+    window = ContextWindow(budget_tokens=100)
+    window.fit(react_history(1))
+
+    assert window.stats()["over_budget"] == 1
+
+
+def test_agent_requests_shrink_but_state_keeps_full_history(monkeypatch, stub_router, context_window):
+    stub_router.classification = "respond"
+    monkeypatch.setattr(tools.search_events, "func", lambda query, start_date=None, end_date=None: LONG_OUTPUT)
+    monkeypatch.setattr(tools.search_events, "coroutine", None)
+    requests = []
+
+    class RecordingModel(ScriptedChatModel):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            requests.append(messages)
+            return super()._generate(messages, stop, run_manager, **kwargs)
+
+    responses = [tool_call_message("search_events", {"query": f"q{i}"}, f"call_{i}") for i in range(3)]
+    llm = RecordingModel(responses=responses + [AIMessage(content="Done")])
+    monkeypatch.setattr(importlib.import_module("email_assistant.nodes.agent_node"), "get_llm_router_with_tools", lambda: llm)
+
+    result = create_graph().invoke({"email_input": get_test_email(3)})
+
+    assert all(m.content == LONG_OUTPUT for m in result["messages"] if m.type == "tool")
+    assert requests[-1][3].content != LONG_OUTPUT
+    assert requests[-1][-1].content == LONG_OUTPUT
+    report = result["messages"][-1].response_metadata["context_window"]
+    assert report["truncated"][0] == "call_0"
+    assert "call_2" not in report["truncated"] + report["elided"]
+    assert context_window.stats()["requests"] == 4
@@ -0,0 +1,93 @@
+"""Tests for the concurrent, cached evaluation runner."""
+
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage
+
+from email_assistant.evaluation import EvalCache, default_cases, evaluate, read_cases, report
+from email_assistant.scripts import evaluate as evaluate_script
+from email_assistant.tests.test_data import email_inputs, expected_tool_calls, triage_classifications
+
+
+class StubGraph:
+    """Answers every case as expected, except the subjects it is told to get wrong or fail."""
+
+    def __init__(self, wrong_subjects=(), fail_subjects=()):
+        self.wrong_subjects = set(wrong_subjects)
+        self.fail_subjects = set(fail_subjects)
+        self.in_flight = self.max_in_flight = 0
+        self.subjects = []
+
+    async def ainvoke(self, state, config):
+        subject = state["email_input"]["subject"]
+        self.subjects.append(subject)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if subject in self.fail_subjects:
+            raise RuntimeError("model unavailable")
+        index = [e["subject"] for e in email_inputs].index(subject)
+        calls = [{"name": name, "args": {}, "id": name} for name in expected_tool_calls[index]]
+        if subject in self.wrong_subjects:
+            return {"classification_decision": "ignore", "messages": []}
+        return {
+            "classification_decision": triage_classifications[index],
+            "messages": [AIMessage(content="", tool_calls=calls), AIMessage(content="Done")],
+        }
+
+
+def test_cases_run_concurrently_and_are_scored():
+    graph = StubGraph(wrong_subjects=[email_inputs[0]["subject"]])
+
+    records = asyncio.run(evaluate(default_cases(), graph, concurrency=3))
+
+    assert graph.max_in_flight == 3
+    assert [r["subject"] for r in records] == [e["subject"] for e in email_inputs]
+    assert records[0]["missing_tools"] == ["search_events", "update_event"]
+    assert not records[0]["classification_correct"]
+    assert all(r["classification_correct"] and r["tools_correct"] for r in records[1:])
+
+
+def test_cache_skips_unchanged_cases_but_retries_failures(tmp_path):
+    cache_path = tmp_path / "cache.jsonl"
+    failing = email_inputs[1]["subject"]
+    asyncio.run(evaluate(default_cases(), StubGraph(fail_subjects=[failing]), cache=EvalCache(cache_path)))
+
+    graph = StubGraph()
+    cases = default_cases()
+    cases[2] = {**cases[2], "email_input": {**cases[2]["email_input"], "email_thread": "Edited"}}
+    records = asyncio.run(evaluate(cases, graph, cache=EvalCache(cache_path)))
+
+    assert sorted(graph.subjects) == sorted([failing, email_inputs[2]["subject"]])
+    assert [r["cached"] for r in records].count(True) == len(email_inputs) - 2
+    assert all("error" not in r for r in records)
+
+
+def test_report_groups_by_classification_and_tool_set():
+    graph = StubGraph(fail_subjects=[email_inputs[3]["subject"]])
+    summary = report(asyncio.run(evaluate(default_cases(), graph)))
+
+    assert summary["overall"]["cases"] == len(email_inputs)
+    assert summary["by_classification"]["respond"]["errors"] == 1
+    assert summary["by_classification"]["ignore"]["classification_accuracy"] == 1.0
+    assert summary["by_tools"]["search_emails"]["tool_accuracy"] == 0.0
+    assert summary["by_tools"]["search_events+update_event"]["tool_accuracy"] == 1.0
+    assert [f["subject"] for f in summary["failures"]] == [email_inputs[3]["subject"]]
+
+
+def test_cli_reads_cases_and_writes_report(tmp_path, monkeypatch, capsys):
+    cases = tmp_path / "cases.jsonl"
+    case = {"email_input": email_inputs[3], "classification": "respond", "tools": ["search_emails"]}
+    cases.write_text(json.dumps(case) + "\n")
+    output = tmp_path / "report.json"
+    graph = StubGraph(wrong_subjects=[email_inputs[3]["subject"]])
+    monkeypatch.setattr(evaluate_script, "get_compiled_graph", lambda: graph)
+
+    argv = ["--cases", str(cases), "--cache", str(tmp_path / "cache.jsonl"), "--output", str(output)]
+    assert evaluate_script.main(argv + ["--fail-under", "0.5"]) == 1
+
+    assert read_cases(cases)[0]["tools"] == ["search_emails"]
+    assert json.loads(output.read_text())["overall"]["classification_accuracy"] == 0.0
+    assert "FAILED" in capsys.readouterr().out
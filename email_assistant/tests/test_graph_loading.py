@@ -0,0 +1,76 @@
+"""Tests for lazy graph construction and diagram rendering."""
+
+import hashlib
+import subprocess
+import sys
+
+from langgraph.graph.state import CompiledStateGraph
+
+import email_assistant
+import email_assistant_hitl
+from email_assistant import agent
+from email_assistant_hitl import agent as agent_hitl
+from email_assistant.scripts.render_graph import render_graph
+
+
+def test_import_does_not_build_graph():
+    """Importing the agent modules must not build or render any graph."""
+    code = (
+        "import email_assistant.agent as a, email_assistant_hitl.agent as h; "
+        "assert a._graph is None and h._graph is None"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_graph_is_memoized():
+    """The module-level graph is built once and shared."""
+    assert agent.get_compiled_graph() is agent.get_compiled_graph()
+    assert agent.graph is agent.get_compiled_graph()
+    assert email_assistant.graph is agent.get_compiled_graph()
+
+
+def test_hitl_graph_shares_checkpointer():
+    """Every access to the HITL graph must see the same checkpointer."""
+    assert agent_hitl.graph is agent_hitl.get_compiled_graph()
+    assert email_assistant_hitl.graph is agent_hitl.graph
+    assert agent_hitl.checkpointer is agent_hitl.graph.checkpointer
+
+
+def test_graphs_are_compiled_with_their_handlers():
+    """Both graphs stay CompiledStateGraph instances with the accounting and metrics handlers."""
+    for graph in (agent.create_graph(), agent_hitl.create_graph()):
+        assert isinstance(graph, CompiledStateGraph)
+        handlers = {type(handler).__name__ for handler in graph.config["callbacks"]}
+        assert handlers == {"AccountingCallbackHandler", "MetricsCallbackHandler"}
+
+
+def test_create_graph_writes_nothing(tmp_path, monkeypatch):
+    """Building a graph must not write graph.png to the working directory."""
+    monkeypatch.chdir(tmp_path)
+    agent.create_graph()
+    agent_hitl.create_graph()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_render_graph_uses_cache(tmp_path):
+    """A cached render is reused without contacting the remote renderer."""
+    graph = agent.get_compiled_graph()
+    mermaid = graph.get_graph().draw_mermaid()
+    key = hashlib.sha256(mermaid.encode("utf-8")).hexdigest()
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / f"{key}.png").write_bytes(b"cached-png")
+
+    output = tmp_path / "graph.png"
+    assert render_graph(graph, output, cache_dir=cache_dir, offline=True) == "cache"
+    assert output.read_bytes() == b"cached-png"
+
+
+def test_render_graph_offline_miss_writes_mermaid(tmp_path):
+    """Offline cache misses fall back to the Mermaid source."""
+    graph = agent.get_compiled_graph()
+    output = tmp_path / "graph.png"
+
+    assert render_graph(graph, output, cache_dir=tmp_path / "cache", offline=True) == "mermaid"
+    assert not output.exists()
+    assert "triage_router" in (tmp_path / "graph.mmd").read_text()
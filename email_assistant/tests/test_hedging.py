@@ -0,0 +1,114 @@
+"""Tests for hedged router and agent model requests."""
+
+import asyncio
+import importlib
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from email_assistant.nodes.agent_node import read_only_step
+from email_assistant.nodes.triage_router import ainvoke_router, invoke_router
+from email_assistant.tests.utils import tool_call_message
+from email_assistant.utils.hedging import HedgingPolicy, set_hedging_policy
+from email_assistant.utils.router import RouterSchema
+
+EMAIL = ("alice@example.com", "me@example.com", "Lunch?", "Are you free for lunch?")
+
+
+class DelayedRouter:
+    """Router stand-in whose calls take the given delays in turn."""
+
+    def __init__(self, delays):
+        self.delays = list(delays)
+        self.calls = 0
+        self.cancelled = 0
+        self.threads = []
+
+    def _next(self):
+        self.calls += 1
+        self.threads.append(threading.current_thread())
+        return self.delays.pop(0) if self.delays else 0.0
+
+    def invoke(self, messages):
+        time.sleep(self._next())
+        return RouterSchema(reasoning="stub", classification="respond")
+
+    async def ainvoke(self, messages):
+        try:
+            await asyncio.sleep(self._next())
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return RouterSchema(reasoning="stub", classification="respond")
+
+
+@pytest.fixture
+def policy():
+    policy = HedgingPolicy(percentile=0.9, max_rate=1.0, min_samples=5)
+    for _ in range(5):
+        policy.observe("router", 0.01)
+    set_hedging_policy(policy)
+    yield policy
+    set_hedging_policy(None)
+
+
+@pytest.fixture
+def router(monkeypatch):
+    def install(delays):
+        router = DelayedRouter(delays)
+        monkeypatch.setattr(importlib.import_module("email_assistant.nodes.triage_router"), "get_llm_router", lambda: router)
+        return router
+    return install
+
+
+def test_no_hedging_until_enough_samples():
+    policy = HedgingPolicy(min_samples=3)
+    assert policy.hedge_delay("router") is None
+    for seconds in (0.1, 0.2, 0.3):
+        policy.observe("router", seconds)
+    assert policy.hedge_delay("router") == 0.3
+
+
+def test_slow_router_call_is_hedged_and_the_hedge_wins(policy, router):
+    stub = router([0.5, 0.0])
+
+    start = time.perf_counter()
+    assert invoke_router(EMAIL, "system").classification == "respond"
+
+    assert time.perf_counter() - start < 0.4
+    assert stub.calls == 2
+    assert [thread.name.split("_")[0] for thread in stub.threads] == ["hedged-primary", "hedged-request"]
+    time.sleep(0.6)  # the primary finishes in the background and is charged
+    stats = policy.stats()["router"]
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+    assert stats["extra_tokens"] > 0
+
+
+def test_hedge_rate_is_capped(policy, router):
+    policy.max_rate = 0.0
+    stub = router([0.05])
+
+    invoke_router(EMAIL, "system")
+
+    assert stub.calls == 1
+    assert stub.threads == [threading.current_thread()]
+    assert policy.stats()["router"]["hedges"] == 0
+
+
+def test_async_hedge_cancels_the_slow_request(policy, router):
+    stub = router([0.5, 0.0])
+
+    assert asyncio.run(ainvoke_router(EMAIL, "system")).classification == "respond"
+
+    assert stub.cancelled == 1
+    stats = policy.stats()["router"]
+    assert stats["hedge_wins"] == 1 and stats["extra_tokens"] > 0
+
+
+def test_only_read_only_agent_steps_are_hedged():
+    search = tool_call_message("search_events", {"query": "1:1"})
+    write = tool_call_message("write_email", {"to": "a@example.com", "subject": "Re", "content": "Hi"})
+    assert read_only_step([{"role": "user", "content": "hi"}, search, AIMessage(content="ok")])
+    assert not read_only_step([{"role": "user", "content": "hi"}, search, write])
@@ -0,0 +1,119 @@
+"""Tests for tool execution in the HITL action handler."""
+
+import asyncio
+import importlib
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import Command
+
+from email_assistant.tests.test_data import get_test_email
+from email_assistant.tests.utils import ScriptedChatModel
+from email_assistant_hitl.agent import create_graph
+from email_assistant_hitl.utils.router import RouterSchema
+
+LOOKUP_DELAY = 0.2
+
+
+class RespondRouter:
+    def invoke(self, messages):
+        return RouterSchema(reasoning="stub", classification="respond")
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+def slow_tool(name):
+    """A stand-in lookup backend that takes LOOKUP_DELAY seconds."""
+
+    def lookup(query: str) -> str:
+        time.sleep(LOOKUP_DELAY)
+        return f"{name}:{query}"
+
+    async def alookup(query: str) -> str:
+        await asyncio.sleep(LOOKUP_DELAY)
+        return f"{name}:{query}"
+
+    return StructuredTool.from_function(func=lookup, coroutine=alookup, name=name, description=name)
+
+
+def calls(*names):
+    """An AI message calling each named tool in order (ids call_0, call_1, ...)."""
+    draft = {"to": "a@example.com", "subject": "Re", "content": "Hi"}
+    return AIMessage(content="", tool_calls=[
+        {"name": name, "args": draft if name == "write_email" else {"query": f"q{i}"}, "id": f"call_{i}"}
+        for i, name in enumerate(names)
+    ])
+
+
+@pytest.fixture
+def hitl_graph(monkeypatch):
+    """HITL graph whose read-only tools are slow stand-ins."""
+    handler = importlib.import_module("email_assistant_hitl.nodes.action_handler_hitl")
+    for name in ("search_emails", "search_events", "check_calendar_availability"):
+        monkeypatch.setitem(handler.tools_by_name, name, slow_tool(name))
+    monkeypatch.setattr(importlib.import_module("email_assistant_hitl.nodes.triage_router"), "get_llm_router", RespondRouter)
+
+    def script(*responses):
+        llm = ScriptedChatModel(responses=list(responses))
+        monkeypatch.setattr(importlib.import_module("email_assistant_hitl.nodes.agent_node_hitl"), "get_llm_with_tools_hitl", lambda: llm)
+        return create_graph(checkpointer=MemorySaver())
+
+    return script
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_lookups_run_concurrently_in_call_order(hitl_graph, mode):
+    graph = hitl_graph(calls("search_emails", "check_calendar_availability", "search_events"), AIMessage(content="Done"))
+    config = {"configurable": {"thread_id": f"lookups-{mode}"}}
+    payload = {"email_input": get_test_email(3)}
+
+    start = time.perf_counter()
+    result = graph.invoke(payload, config) if mode == "sync" else asyncio.run(graph.ainvoke(payload, config))
+    elapsed = time.perf_counter() - start
+
+    # The slowest lookup, not the sum of all three
+    assert elapsed < 2.5 * LOOKUP_DELAY
+    tool_messages = [m for m in result["messages"] if m.type == "tool"]
+    assert [m.tool_call_id for m in tool_messages] == ["call_0", "call_1", "call_2"]
+    assert [m.content for m in tool_messages] == [
+        "search_emails:q0", "check_calendar_availability:q1", "search_events:q2"
+    ]
+
+
+def test_review_tools_keep_interrupt_semantics(hitl_graph):
+    graph = hitl_graph(calls("search_emails", "write_email", "search_events"), AIMessage(content="Done"))
+    config = {"configurable": {"thread_id": "mixed"}}
+
+    first = graph.invoke({"email_input": get_test_email(3)}, config)
+    assert first["__interrupt__"][0].value[0]["action_request"]["action"] == "write_email"
+
+    result = graph.invoke(Command(resume=[{"type": "accept", "args": ""}]), config)
+    tool_messages = [m for m in result["messages"] if m.type == "tool"]
+    assert [m.tool_call_id for m in tool_messages] == ["call_0", "call_1", "call_2"]
+    assert tool_messages[1].content.startswith("Email sent to a@example.com")
+    assert result["messages"][-1].content == "Done"
+
+
+def test_lookups_after_a_review_wait_for_it(hitl_graph, monkeypatch):
+    handler = importlib.import_module("email_assistant_hitl.nodes.action_handler_hitl")
+    queries = []
+
+    def search_events(query: str) -> str:
+        queries.append(query)
+        return f"search_events:{query}"
+
+    tool = StructuredTool.from_function(func=search_events, name="search_events", description="search_events")
+    monkeypatch.setitem(handler.tools_by_name, "search_events", tool)
+    graph = hitl_graph(calls("search_events", "write_email", "search_events"), AIMessage(content="Done"))
+    config = {"configurable": {"thread_id": "ordered"}}
+
+    graph.invoke({"email_input": get_test_email(3)}, config)
+    assert queries == ["q0"]
+
+    graph.invoke(Command(resume=[{"type": "accept", "args": ""}]), config)
+    # The lookup before the review is served from the tool cache on resume
+    assert queries == ["q0", "q2"]
@@ -0,0 +1,121 @@
+"""Tests for hot-path latency metrics and their OpenMetrics export."""
+
+import importlib
+import urllib.request
+
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import Command
+
+from email_assistant.agent import create_graph
+from email_assistant.tests.test_data import get_test_email
+from email_assistant.tests.utils import ScriptedChatModel, tool_call_message
+from email_assistant.utils.metrics import (
+    MetricsRegistry,
+    set_metrics,
+    start_metrics_exporters,
+    start_metrics_server,
+    write_metrics,
+)
+from email_assistant_hitl.agent import create_graph as create_hitl_graph
+from email_assistant_hitl.utils.router import RouterSchema as HitlRouterSchema
+
+EMAIL = get_test_email(3)
+AGENT = (("graph", "agent"),)
+
+
+@pytest.fixture
+def registry():
+    registry = MetricsRegistry()
+    set_metrics(registry)
+    yield registry
+    set_metrics(MetricsRegistry())
+
+
+def test_histograms_render_cumulative_buckets():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.observe("email_assistant_node_seconds", 0.05, graph="agent", node="tools")
+    registry.observe("email_assistant_node_seconds", 0.5, graph="agent", node="tools")
+    registry.inc("email_assistant_classifications", graph="agent", classification="respond")
+
+    text = registry.render()
+    assert 'email_assistant_node_seconds_bucket{graph="agent",node="tools",le="0.1"} 1' in text
+    assert 'email_assistant_node_seconds_bucket{graph="agent",node="tools",le="+Inf"} 2' in text
+    assert 'email_assistant_node_seconds_count{graph="agent",node="tools"} 2' in text
+    assert 'email_assistant_classifications_total{classification="respond",graph="agent"} 1' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_agent_run_reports_node_model_tool_and_overhead_time(monkeypatch, stub_router, registry):
+    stub_router.classification = "respond"
+    llm = ScriptedChatModel(responses=[tool_call_message("search_events", {"query": "1:1"}), AIMessage(content="Done")])
+    monkeypatch.setattr(importlib.import_module("email_assistant.nodes.agent_node"), "get_llm_router_with_tools", lambda: llm)
+
+    create_graph().invoke({"email_input": EMAIL})
+
+    snapshot = registry.snapshot()
+    assert snapshot["email_assistant_email_seconds"][AGENT]["count"] == 1
+    assert snapshot["email_assistant_graph_overhead_seconds"][AGENT]["count"] == 1
+    assert snapshot["email_assistant_node_seconds"][(("graph", "agent"), ("node", "agent"))]["count"] == 2
+    assert sum(s["count"] for s in snapshot["email_assistant_model_seconds"].values()) == 2
+    assert snapshot["email_assistant_tool_seconds"][(("graph", "agent"), ("tool", "search_events"))]["count"] == 1
+    assert snapshot["email_assistant_classifications"][(("classification", "respond"), ("graph", "agent"))] == 1
+    assert snapshot["email_assistant_emails_in_flight"][AGENT] == 0
+
+
+def test_hitl_interrupt_wait_is_reported_separately(monkeypatch, registry):
+    class RespondRouter:
+        def invoke(self, messages):
+            return HitlRouterSchema(reasoning="stub", classification="respond")
+
+    draft = tool_call_message("write_email", {"to": "a@example.com", "subject": "Re", "content": "Hi"})
+    llm = ScriptedChatModel(responses=[draft, AIMessage(content="Sent")])
+    monkeypatch.setattr(importlib.import_module("email_assistant_hitl.nodes.triage_router"), "get_llm_router", RespondRouter)
+    monkeypatch.setattr(importlib.import_module("email_assistant_hitl.nodes.agent_node_hitl"), "get_llm_with_tools_hitl", lambda: llm)
+    graph = create_hitl_graph(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "metrics-hitl"}}
+
+    graph.invoke({"email_input": EMAIL}, config)
+    graph.invoke(Command(resume=[{"type": "accept", "args": ""}]), config)
+
+    # Same registry as the agent graph, so any exporter started for it sees the waits
+    waits = registry.snapshot()["email_assistant_human_wait_seconds"]
+    assert waits[(("graph", "agent_hitl"),)]["count"] == 1
+
+
+def test_metrics_are_served_and_dumped(tmp_path, registry):
+    registry.inc("email_assistant_tool_calls", graph="agent", tool="search_emails", status="ok")
+    server = start_metrics_server(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode()
+            assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+    finally:
+        server.shutdown()
+
+    assert "email_assistant_tool_calls_total" in body
+    write_metrics(str(tmp_path / "metrics.txt"))
+    assert (tmp_path / "metrics.txt").read_text() == registry.render()
+
+
+def test_exporters_start_from_the_environment(tmp_path, monkeypatch, registry):
+    monkeypatch.setenv("EMAIL_ASSISTANT_METRICS_PORT", "0")
+    monkeypatch.setenv("EMAIL_ASSISTANT_METRICS_FILE", str(tmp_path / "metrics.txt"))
+    registry.inc("email_assistant_classifications", graph="agent_hitl", classification="notify")
+
+    server, dump = start_metrics_exporters()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            assert 'graph="agent_hitl"' in response.read().decode()
+    finally:
+        server.shutdown()
+        dump.set()
+
+
+def test_exporters_are_off_without_configuration(monkeypatch):
+    monkeypatch.delenv("EMAIL_ASSISTANT_METRICS_PORT", raising=False)
+    monkeypatch.delenv("EMAIL_ASSISTANT_METRICS_FILE", raising=False)
+    assert start_metrics_exporters() == (None, None)
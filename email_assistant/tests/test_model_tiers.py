@@ -0,0 +1,107 @@
+"""Tests for complexity-based agent model tiers."""
+
+import importlib
+
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from email_assistant.agent import create_graph
+from email_assistant.tests.utils import ScriptedChatModel, tool_call_message
+from email_assistant.utils.model_tiers import TierSelector, create_tier_selector, email_features, set_tier_selector
+from email_assistant_hitl.agent import create_graph as create_hitl_graph
+from email_assistant_hitl.utils.router import RouterSchema as HitlRouterSchema
+
+SIMPLE = {
+    "author": "Alice <alice@example.com>",
+    "to": "me@example.com",
+    "subject": "Thursday",
+    "email_thread": "Can you confirm Thursday?",
+}
+COMPLEX = (
+    "Bob <bob@example.com>",
+    "me@example.com, carol@example.com, dan@example.com, erin@example.com",
+    "Moving the planning meeting",
+    "Can we move the planning meeting to next week? Which day works for everyone? Carol is out Monday.",
+)
+
+
+@pytest.fixture
+def selector():
+    selector = TierSelector()
+    set_tier_selector(selector)
+    yield selector
+    set_tier_selector(None)
+
+
+def test_simple_and_multi_party_emails_get_different_tiers():
+    selector = TierSelector()
+    simple = tuple(SIMPLE.values())
+    assert email_features(simple)["attendees"] == 0
+    assert selector.select(simple, "Asks to confirm a date") == 0
+    assert selector.select(COMPLEX, "Reschedule request involving multiple attendees") == 1
+    assert selector.stats()["gpt-4o"]["emails"] == 1
+
+
+def test_tool_failures_escalate_and_count_once_per_email():
+    selector = TierSelector(models=("a", "b", "c"), thresholds=(10, 20), escalate_after_tool_errors=2)
+    tier = {"initial": 0, "tier": 0}
+    selector.select(tuple(SIMPLE.values()))
+    assert selector.escalate(tier, 1) == tier
+    tier = selector.escalate(tier, 2)
+    tier = selector.escalate(tier, 9)
+    assert tier == {"initial": 0, "tier": 2}
+    assert selector.stats()["a"]["escalation_rate"] == 1.0
+    assert selector.stats()["b"]["escalations"] == 1
+
+
+def test_policy_file_overrides_defaults(tmp_path):
+    path = tmp_path / "tiers.json"
+    path.write_text('{"thresholds": [1.0], "weights": {"questions": 2.0}}')
+    selector = create_tier_selector(str(path))
+    assert selector.models == ("gpt-4o-mini", "gpt-4o")
+    assert selector.select(tuple(SIMPLE.values())) == 1
+
+
+def test_agent_escalates_after_a_failed_tool_call(monkeypatch, stub_router, selector):
+    stub_router.classification = "respond"
+    llm = ScriptedChatModel(responses=[tool_call_message("lookup_crm", {"name": "Alice"}), AIMessage(content="Done")])
+    models = []
+
+    def get_llm_router_with_tools(model_name="gpt-4o-mini"):
+        models.append(model_name)
+        return llm
+
+    monkeypatch.setattr(importlib.import_module("email_assistant.nodes.agent_node"), "get_llm_router_with_tools", get_llm_router_with_tools)
+
+    state = create_graph().invoke({"email_input": SIMPLE})
+
+    assert models == ["gpt-4o-mini", "gpt-4o"]
+    assert state["model_tier"] == {"initial": 0, "tier": 1}
+    stats = selector.stats()
+    assert stats["gpt-4o-mini"]["calls"] == 1 and stats["gpt-4o"]["calls"] == 1
+    assert stats["gpt-4o-mini"]["escalation_rate"] == 1.0
+
+
+def test_hitl_agent_escalates_after_a_failed_tool_call(monkeypatch, selector):
+    class RespondRouter:
+        def invoke(self, messages):
+            return HitlRouterSchema(reasoning="stub", classification="respond")
+
+    llm = ScriptedChatModel(responses=[tool_call_message("lookup_crm", {"name": "Alice"}), AIMessage(content="Done")])
+    models = []
+
+    def get_llm_with_tools_hitl(model_name="gpt-4o"):
+        models.append(model_name)
+        return llm
+
+    monkeypatch.setattr(importlib.import_module("email_assistant_hitl.nodes.triage_router"), "get_llm_router", RespondRouter)
+    monkeypatch.setattr(importlib.import_module("email_assistant_hitl.nodes.agent_node_hitl"), "get_llm_with_tools_hitl", get_llm_with_tools_hitl)
+
+    state = create_hitl_graph(checkpointer=MemorySaver()).invoke(
+        {"email_input": SIMPLE}, {"configurable": {"thread_id": "tiers-hitl"}}
+    )
+
+    assert models == ["gpt-4o-mini", "gpt-4o"]
+    assert state["model_tier"] == {"initial": 0, "tier": 1}
+    assert [m.status for m in state["messages"] if m.type == "tool"] == ["error"]
@@ -0,0 +1,118 @@
+"""Tests for bulk inbox processing."""
+
+import asyncio
+import io
+import json
+import mailbox
+from email.message import EmailMessage
+
+from email_assistant.inbox import completed_offsets, process_inbox, read_inbox
+from email_assistant.scripts import process_inbox as process_inbox_script
+from email_assistant.tests.test_data import email_inputs
+
+
+def to_message(email_input):
+    message = EmailMessage()
+    message["From"] = email_input["author"]
+    message["To"] = email_input["to"]
+    message["Subject"] = email_input["subject"]
+    message["Message-ID"] = f"<{email_input['subject'].replace(' ', '.')}@example.com>"
+    message.set_content(email_input["email_thread"])
+    return message
+
+
+class StubGraph:
+    """Classifies by subject after a short delay and tracks concurrency."""
+
+    def __init__(self, fail_subjects=()):
+        self.fail_subjects = set(fail_subjects)
+        self.in_flight = self.max_in_flight = 0
+        self.thread_ids = []
+
+    async def ainvoke(self, state, config):
+        self.thread_ids.append(config["configurable"]["thread_id"])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        subject = state["email_input"]["subject"]
+        if subject in self.fail_subjects:
+            raise RuntimeError("model unavailable")
+        return {"classification_decision": "respond" if "?" in subject else "ignore"}
+
+
+def jsonl_inbox(tmp_path, emails=email_inputs):
+    path = tmp_path / "inbox.jsonl"
+    path.write_text("".join(json.dumps(e) + "\n" for e in emails))
+    return path
+
+
+def test_read_inbox_formats(tmp_path):
+    mbox_path = tmp_path / "inbox.mbox"
+    box = mailbox.mbox(mbox_path)
+    for email_input in email_inputs[:3]:
+        box.add(to_message(email_input))
+    box.close()
+
+    maildir = mailbox.Maildir(tmp_path / "Maildir")
+    for email_input in email_inputs[:3]:
+        maildir.add(to_message(email_input))
+
+    assert [e for _, e in read_inbox(jsonl_inbox(tmp_path))] == email_inputs
+
+    from_mbox = list(read_inbox(mbox_path))
+    assert [offset for offset, _ in from_mbox] == [0, 1, 2]
+    assert from_mbox[1][1]["subject"] == email_inputs[1]["subject"]
+    assert from_mbox[1][1]["email_thread"].strip() == email_inputs[1]["email_thread"]
+    assert from_mbox[1][1]["headers"]["Message-ID"].startswith("<URGENT")
+
+    from_maildir = list(read_inbox(tmp_path / "Maildir"))
+    assert sorted(e["subject"] for _, e in from_maildir) == sorted(e["subject"] for e in email_inputs[:3])
+    assert from_maildir == list(read_inbox(tmp_path / "Maildir", "maildir"))
+
+
+def test_process_inbox_bounds_concurrency_and_reports():
+    graph = StubGraph()
+    emails = [(i, {"subject": f"Email {i}{'?' if i % 2 else ''}"}) for i in range(20)]
+    out = io.StringIO()
+
+    report = asyncio.run(process_inbox(emails, out, graph, concurrency=4))
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert graph.max_in_flight == 4
+    assert sorted(r["offset"] for r in records) == list(range(20))
+    assert len(set(graph.thread_ids)) == 20
+    assert report["emails"] == 20 and report["errors"] == 0
+    assert report["classifications"] == {"respond": 10, "ignore": 10}
+    assert report["emails_per_s"] > 0 and report["latency"]["p50_ms"] >= 10
+
+
+def test_resume_skips_completed_and_retries_errors(tmp_path):
+    inbox = jsonl_inbox(tmp_path)
+    output = tmp_path / "results.jsonl"
+    failing = email_inputs[2]["subject"]
+
+    with open(output, "w") as out:
+        report = asyncio.run(process_inbox(read_inbox(inbox), out, StubGraph(fail_subjects=[failing])))
+    assert report["errors"] == 1
+    assert completed_offsets(output) == set(range(len(email_inputs))) - {2}
+
+    graph = StubGraph()
+    with open(output, "a") as out:
+        report = asyncio.run(process_inbox(read_inbox(inbox), out, graph, skip=completed_offsets(output)))
+
+    assert graph.thread_ids == ["inbox-2"]
+    assert report["skipped"] == len(email_inputs) - 1
+    assert completed_offsets(output) == set(range(len(email_inputs)))
+
+
+def test_cli_runs_graph(tmp_path, stub_router, capsys):
+    inbox = jsonl_inbox(tmp_path, [email_inputs[3]] * 3)
+    output = tmp_path / "results.jsonl"
+
+    assert process_inbox_script.main(["--input", str(inbox), "--output", str(output), "--concurrency", "2"]) == 0
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert {r["classification_decision"] for r in records} == {"ignore"}
+    assert sorted(r["thread_id"] for r in records) == ["inbox.jsonl-0", "inbox.jsonl-1", "inbox.jsonl-2"]
+    assert "Processed 3 emails" in capsys.readouterr().out
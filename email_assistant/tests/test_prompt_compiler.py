@@ -0,0 +1,72 @@
+"""Tests for profile-keyed compiled system prompts."""
+
+import pytest
+
+from email_assistant import agent
+from email_assistant.helpers import format_tools
+from email_assistant.prompts import (
+    AGENT_TOOLS_PROMPT,
+    DEFAULT_PROFILE,
+    UserProfile,
+    agent_system_prompt,
+    clear_compiled_prompts,
+    compile_agent_system_prompt,
+    compile_triage_system_prompt,
+    default_background,
+    default_cal_preferences,
+    default_response_preferences,
+    profile_from_config,
+)
+from email_assistant.tests.test_data import get_test_email
+from email_assistant.utils.router import tools
+
+
+@pytest.fixture(autouse=True)
+def empty_prompt_cache():
+    clear_compiled_prompts()
+    yield
+    clear_compiled_prompts()
+
+
+def test_default_agent_prompt_matches_template():
+    expected = agent_system_prompt.format(
+        tools_prompt=AGENT_TOOLS_PROMPT.format(tools_descriptions=format_tools(tools)),
+        background=default_background,
+        response_preferences=default_response_preferences,
+        cal_preferences=default_cal_preferences,
+    )
+    assert compile_agent_system_prompt(tools) == expected
+
+
+def test_prompts_are_rendered_once():
+    assert compile_triage_system_prompt() is compile_triage_system_prompt()
+    assert compile_agent_system_prompt(tools) is compile_agent_system_prompt(tools)
+
+
+def test_profile_change_rerenders_prompt():
+    custom = UserProfile(background="You manage email for Dr. Rivera.")
+    assert "Dr. Rivera" in compile_triage_system_prompt(custom)
+    assert "Dr. Rivera" in compile_agent_system_prompt(tools, custom)
+    assert "Dr. Rivera" not in compile_triage_system_prompt(DEFAULT_PROFILE)
+
+
+def test_tool_set_is_part_of_the_key():
+    assert "- update_event:" not in compile_agent_system_prompt(tools[:2])
+    assert "- update_event:" in compile_agent_system_prompt(tools)
+
+
+def test_profile_from_config():
+    assert profile_from_config(None) is DEFAULT_PROFILE
+    assert profile_from_config({"configurable": {}}) is DEFAULT_PROFILE
+
+    profile = profile_from_config({"configurable": {"user_profile": {"cal_preferences": "- Afternoons only"}}})
+    assert profile.cal_preferences == "- Afternoons only"
+    assert profile.background == default_background
+
+
+def test_graph_uses_profile_from_config(stub_router):
+    config = {"configurable": {"thread_id": "profile-test", "user_profile": {"background": "Profile for Kim."}}}
+
+    agent.create_graph().invoke({"email_input": get_test_email(3)}, config=config)
+
+    assert "Profile for Kim." in stub_router.calls[0][0]["content"]
@@ -0,0 +1,200 @@
+"""Tests for the shared model rate limiter and its adaptive concurrency."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from email_assistant.utils.metrics import MetricsRegistry, set_metrics
+from email_assistant.utils.rate_limiter import (
+    ModelRateLimiter,
+    RateLimitedRunnable,
+    SQLiteTokenBucket,
+    TokenBucket,
+    set_rate_limiter,
+)
+
+
+class RateLimitError(Exception):
+    """Stands in for the OpenAI client's 429 error."""
+
+    status_code = 429
+    response = SimpleNamespace(headers={"retry-after": "0"})
+
+
+class ServerError(Exception):
+    """Stands in for the OpenAI client's 503 error."""
+
+    status_code = 503
+
+
+class BadRequestError(Exception):
+    """Stands in for the OpenAI client's 400 error."""
+
+    status_code = 400
+
+
+class FlakyModel:
+    """Fake model that fails the first ``failures`` calls with ``error`` (a 429 by default)."""
+
+    def __init__(self, failures: int = 0, latency: float = 0.0, error=RateLimitError):
+        self.failures = failures
+        self.latency = latency
+        self.error = error
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, input, config=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            fail = self.calls <= self.failures
+        try:
+            time.sleep(self.latency)
+            if fail:
+                raise self.error("failed")
+            return AIMessage(content="ok")
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+            fail = self.calls <= self.failures
+        await asyncio.sleep(self.latency)
+        if fail:
+            raise self.error("failed")
+        return AIMessage(content="ok")
+
+
+@pytest.fixture
+def registry():
+    registry = MetricsRegistry()
+    set_metrics(registry)
+    yield registry
+    set_metrics(MetricsRegistry())
+
+
+@pytest.fixture
+def limiter():
+    limiter = ModelRateLimiter(TokenBucket(6000), TokenBucket(10_000_000), max_concurrency=8)
+    set_rate_limiter(limiter)
+    yield limiter
+    set_rate_limiter(ModelRateLimiter())
+
+
+def test_bucket_delays_callers_once_empty():
+    bucket = TokenBucket(60)  # one unit per second
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_sqlite_buckets_share_budget_across_instances(tmp_path):
+    path = str(tmp_path / "limits.db")
+    first = SQLiteTokenBucket(path, "requests", 60)
+    second = SQLiteTokenBucket(path, "requests", 60)
+    assert first.reserve(60) == 0
+    assert second.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_429s_are_retried_and_halve_the_limit(limiter, registry):
+    model = RateLimitedRunnable(FlakyModel(failures=2))
+
+    assert model.invoke("hello").content == "ok"
+
+    stats = limiter.stats()
+    assert stats["throttled"] == 2 and stats["calls"] == 1
+    assert stats["limit"] < 8
+    snapshot = registry.snapshot()
+    assert snapshot["email_assistant_rate_limited"][()] == 2
+    assert snapshot["email_assistant_rate_limit_wait_seconds"][()]["count"] == 3
+
+
+def test_limit_grows_back_after_fast_successes(limiter):
+    limiter.limit = 2.0
+    model = RateLimitedRunnable(FlakyModel())
+    for _ in range(10):
+        model.invoke("hello")
+    assert 2.0 < limiter.stats()["limit"] <= 8
+
+
+def test_calls_in_flight_stay_under_the_limit(limiter):
+    limiter.max_concurrency = 3
+    limiter.limit = 3.0
+    fake = FlakyModel(latency=0.02)
+    model = RateLimitedRunnable(fake)
+
+    threads = [threading.Thread(target=model.invoke, args=("hello",)) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fake.max_in_flight <= 3
+
+
+def test_async_calls_retry_under_the_shared_backoff(limiter):
+    model = RateLimitedRunnable(FlakyModel(failures=1))
+
+    async def run():
+        return await asyncio.gather(*(model.ainvoke("hello") for _ in range(4)))
+
+    assert [m.content for m in asyncio.run(run())] == ["ok"] * 4
+    assert limiter.stats()["throttled"] == 1
+
+
+@pytest.mark.parametrize("error", [ServerError, TimeoutError, ConnectionResetError])
+def test_transient_errors_are_retried(limiter, registry, monkeypatch, error):
+    # No Retry-After on these: keep the exponential backoff short
+    monkeypatch.setattr("email_assistant.utils.rate_limiter.BACKOFF_BASE_SECONDS", 0.01)
+    model = RateLimitedRunnable(FlakyModel(failures=2, error=error))
+
+    assert model.invoke("hello").content == "ok"
+
+    stats = limiter.stats()
+    assert stats["retried"] == 2 and stats["throttled"] == 0
+    assert "email_assistant_rate_limited" not in registry.snapshot()
+
+
+def test_client_errors_are_not_retried(limiter):
+    fake = FlakyModel(failures=1, error=BadRequestError)
+    with pytest.raises(BadRequestError):
+        RateLimitedRunnable(fake).invoke("hello")
+    assert fake.calls == 1
+
+
+def test_retries_give_up_after_max_retries(limiter):
+    limiter.max_retries = 1
+    with pytest.raises(RateLimitError):
+        RateLimitedRunnable(FlakyModel(failures=5)).invoke("hello")
+
+
+def test_disabled_limiter_calls_straight_through(limiter):
+    set_rate_limiter(None)
+    fake = FlakyModel()
+    assert RateLimitedRunnable(fake).invoke("hello").content == "ok"
+    assert fake.calls == 1 and limiter.stats()["calls"] == 0
+
+
+def test_disabled_limiter_retries_each_call_itself(limiter):
+    model = RateLimitedRunnable(FlakyModel(failures=2))
+    set_rate_limiter(None)
+    assert model.invoke("hello").content == "ok"
+    assert model.bound.calls == 3 and limiter.stats()["throttled"] == 0
+
+    # The same runnable follows the limiter that is active at call time
+    set_rate_limiter(limiter)
+    model.bound.failures = 4
+    assert model.invoke("hello").content == "ok"
+    assert limiter.stats()["throttled"] == 1
+
+    set_rate_limiter(None)
+    with pytest.raises(RateLimitError):
+        asyncio.run(RateLimitedRunnable(FlakyModel(failures=3)).ainvoke("hello"))
@@ -0,0 +1,63 @@
+"""Tests for the process-wide LLM client registry."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from email_assistant.utils import router
+from email_assistant_hitl.utils import router as hitl_router
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    """Give each test an empty registry and a dummy API key."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    limits = dict(router.pool_limits)
+    router.configure_http_pool()
+    yield
+    router.configure_http_pool(**limits)
+
+
+def test_same_configuration_returns_same_runnable():
+    assert router.get_llm_router() is router.get_llm_router()
+    assert router.get_llm_router_with_tools() is router.get_llm_router_with_tools()
+
+
+def test_configurations_are_keyed_separately():
+    assert router.get_llm("gpt-4o-mini", temperature=0) is not router.get_llm("gpt-4o-mini", temperature=1)
+    assert router.get_llm("gpt-4o-mini") is not router.get_llm("gpt-4o")
+    assert router.get_llm_router() is not router.get_llm_router_with_tools()
+
+
+def test_clients_share_one_http_pool():
+    first = router.get_llm("gpt-4o-mini")
+    second = router.get_llm("gpt-4o", temperature=0)
+    assert first.http_client is second.http_client
+    assert first.http_async_client is second.http_async_client
+
+
+def test_hitl_runnables_come_from_the_shared_registry():
+    assert hitl_router.get_llm_router() is router.get_llm("gpt-4o-mini", schema=hitl_router.RouterSchema)
+    assert hitl_router.get_llm_with_tools_hitl() is router.get_llm("gpt-4o", tools=hitl_router.tools_hitl, temperature=0)
+    assert hitl_router.get_llm_with_tools_hitl() is not router.get_llm_router_with_tools("gpt-4o")
+
+
+def test_registry_is_thread_safe():
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        runnables = list(pool.map(lambda _: router.get_llm("gpt-4o", temperature=0.5), range(32)))
+    assert all(r is runnables[0] for r in runnables)
+
+
+def test_configure_http_pool_applies_new_limits():
+    before = router.get_llm("gpt-4o-mini")
+    router.configure_http_pool(max_connections=7)
+    after = router.get_llm("gpt-4o-mini")
+
+    assert after is not before
+    assert after.http_client is not before.http_client
+    assert router.pool_limits["max_connections"] == 7
+
+
+def test_configure_http_pool_rejects_unknown_limits():
+    with pytest.raises(ValueError):
+        router.configure_http_pool(max_sockets=1)
@@ -0,0 +1,105 @@
+"""Tests for near-duplicate triage reuse."""
+
+import random
+
+from email_assistant import agent
+from email_assistant.utils.similarity_index import SimilarityIndex, simhash
+
+ORDER_1 = (
+    "shop@store.com", "me@company.com", "Your order #48213 has shipped",
+    "Hi Alex, your order 48213 shipped on 2024-03-01 10:32. Track it in your account. Thanks for shopping with us!",
+)
+ORDER_2 = (
+    "shop@store.com", "me@company.com", "Your order #99107 has shipped",
+    "Hi Jordan, your order 99107 shipped on 2024-05-17 18:05. Track it in your account. Thanks for shopping with us!",
+)
+MEETING = (
+    "boss@company.com", "me@company.com", "Can we meet tomorrow?",
+    "I would like to discuss the quarterly roadmap with you before the planning session.",
+)
+IGNORE = {"reasoning": "shipping notice", "classification": "ignore"}
+
+
+def test_simhash_is_close_for_near_duplicates():
+    near = (simhash(ORDER_1[2], ORDER_1[3]) ^ simhash(ORDER_2[2], ORDER_2[3])).bit_count()
+    far = (simhash(ORDER_1[2], ORDER_1[3]) ^ simhash(MEETING[2], MEETING[3])).bit_count()
+    assert near <= 6
+    assert far > 12
+
+
+def test_lookup_reuses_near_duplicates():
+    index = SimilarityIndex(audit_rate=0.0)
+    index.add(ORDER_1, "v1", IGNORE)
+
+    assert index.lookup(ORDER_2, "v1") == (IGNORE, False)
+    assert index.lookup(MEETING, "v1") == (None, False)
+    assert index.lookup(ORDER_2, "v2") == (None, False)
+    assert index.stats()["reuse_rate"] == 1 / 3
+
+
+def test_respond_decisions_are_not_indexed():
+    index = SimilarityIndex()
+    index.add(MEETING, "v1", {"reasoning": "question", "classification": "respond"})
+    assert len(index) == 0
+
+
+def test_index_is_memory_bounded():
+    index = SimilarityIndex(max_entries=2)
+    for i in range(5):
+        index.add(("a", "b", f"subject {i} " + "x" * i, f"body number {i}"), "v1", IGNORE)
+    assert len(index) == 2
+
+
+def test_audits_report_disagreement_rate():
+    index = SimilarityIndex(audit_rate=1.0)
+    index.add(ORDER_1, "v1", IGNORE)
+
+    neighbour, audit = index.lookup(ORDER_2, "v1")
+    assert audit
+    index.record_audit(neighbour, {"reasoning": "model", "classification": "notify"})
+
+    stats = index.stats()
+    assert (stats["audits"], stats["disagreements"], stats["reuses"]) == (1, 1, 0)
+    assert stats["disagreement_rate"] == 1.0
+
+
+def test_index_persists_to_disk(tmp_path):
+    path = str(tmp_path / "index.json")
+    index = SimilarityIndex(path=path, save_every=1)
+    index.add(ORDER_1, "v1", IGNORE)
+
+    reloaded = SimilarityIndex(path=path, audit_rate=0.0)
+    assert reloaded.lookup(ORDER_2, "v1") == (IGNORE, False)
+
+
+def test_triage_reuses_near_duplicate_decision(stub_router, similarity_index):
+    graph = agent.create_graph()
+    author, to, subject, thread = ORDER_1
+    graph.invoke({"email_input": {"author": author, "to": to, "subject": subject, "email_thread": thread}})
+    author, to, subject, thread = ORDER_2
+    result = graph.invoke({"email_input": {"author": author, "to": to, "subject": subject, "email_thread": thread}})
+
+    assert len(stub_router.calls) == 1
+    assert result["classification_decision"] == "ignore"
+
+
+def test_banded_lookup_matches_a_full_scan():
+    rng = random.Random(7)
+    for max_distance in (3, 6):
+        index = SimilarityIndex(max_distance=max_distance, max_entries=500)
+        for i in range(1000):
+            fingerprint = rng.getrandbits(64)
+            index._insert(("v1", fingerprint), {"classification": "ignore", "fingerprint": fingerprint})
+        fingerprints = [fp for _, fp in index._entries]
+        for fingerprint in rng.sample(fingerprints, 50):
+            query = fingerprint
+            for bit in rng.sample(range(64), rng.randint(0, max_distance + 2)):
+                query ^= 1 << bit
+            nearest = min((query ^ fp).bit_count() for fp in fingerprints)
+            result = index._nearest("v1", query)
+            if nearest > max_distance:
+                assert result is None
+            else:
+                assert (query ^ result["fingerprint"]).bit_count() == nearest
+        # Evicted entries leave their band buckets
+        assert sum(len(bucket) for bucket in index._buckets["v1"].values()) == 500 * (max_distance + 1)
@@ -0,0 +1,168 @@
+"""Tests for speculative response drafting."""
+
+import asyncio
+import importlib
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from email_assistant.agent import create_graph
+from email_assistant.tests.test_data import get_test_email
+from email_assistant.tests.utils import tool_call_message
+from email_assistant.utils.router import RouterSchema
+from email_assistant.utils.model_tiers import TierSelector, set_tier_selector
+from email_assistant.utils.speculation import SpeculationPolicy, set_speculation_policy
+
+EMAIL = get_test_email(3)
+SENDER = EMAIL["author"]
+
+
+class SlowModel:
+    """Sleeps before each scripted response; records calls and cancellations."""
+
+    def __init__(self, responses, delay):
+        self.responses = list(responses)
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = False
+
+    def invoke(self, messages):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.responses.pop(0)
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def policy():
+    """A policy that already expects SENDER to need a response."""
+    policy = SpeculationPolicy(threshold=0.7, min_observations=3)
+    for _ in range(4):
+        policy.observe(SENDER, "respond")
+    set_speculation_policy(policy)
+    yield policy
+    set_speculation_policy(None)
+
+
+def patch_models(monkeypatch, classification, agent_responses, delay=0.1):
+    router = SlowModel([RouterSchema(reasoning="stub", classification=classification)], delay)
+    agent = SlowModel(agent_responses, delay)
+    monkeypatch.setattr(importlib.import_module("email_assistant.nodes.triage_router"), "get_llm_router", lambda: router)
+    monkeypatch.setattr(importlib.import_module("email_assistant.nodes.agent_node"), "get_llm_router_with_tools", lambda: agent)
+    return router, agent
+
+
+def test_policy_likelihood_threshold_and_persistence(tmp_path):
+    policy = SpeculationPolicy(threshold=0.7, min_observations=3)
+    policy.observe("Ann <ANN@example.com>", "respond")
+    policy.observe("ann@example.com", "respond")
+    assert policy.likelihood("ann@example.com") is None
+
+    policy.observe("ann@example.com", "respond")
+    assert policy.likelihood("Ann <ann@example.com>") == pytest.approx(0.8)
+    assert policy.should_speculate("ann@example.com")
+    policy.observe("ann@example.com", "ignore")
+    assert not policy.should_speculate("ann@example.com")
+
+    path = tmp_path / "senders.json"
+    policy.save(path)
+    assert SpeculationPolicy(path=str(path)).likelihood("ann@example.com") == pytest.approx(4 / 6)
+
+
+def test_hit_adopts_draft_and_saves_a_round_trip(monkeypatch, policy):
+    _, agent = patch_models(
+        monkeypatch,
+        "respond",
+        [tool_call_message("search_emails", {"query": "alpha"}), AIMessage(content="Done")],
+        delay=0.2,
+    )
+
+    start = time.perf_counter()
+    result = create_graph().invoke({"email_input": EMAIL})
+    elapsed = time.perf_counter() - start
+
+    # Triage and the first agent step overlapped: two model rounds (0.4s), not three (0.6s)
+    assert elapsed < 0.55
+    assert agent.calls == 2
+    assert [m.type for m in result["messages"]] == ["human", "ai", "tool", "ai"]
+    stats = policy.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 0
+    assert stats["saved_seconds"] > 0.1
+
+
+def test_draft_uses_the_model_tier(monkeypatch, policy):
+    patch_models(monkeypatch, "respond", [])
+    agent = SlowModel([AIMessage(content="Done")], 0.0)
+    models = []
+
+    def get_llm_router_with_tools(model_name="gpt-4o-mini"):
+        models.append(model_name)
+        return agent
+
+    monkeypatch.setattr(importlib.import_module("email_assistant.nodes.agent_node"), "get_llm_router_with_tools", get_llm_router_with_tools)
+    # Every email scores into the top tier
+    selector = TierSelector(thresholds=(0.0,))
+    set_tier_selector(selector)
+    try:
+        result = create_graph().invoke({"email_input": EMAIL})
+    finally:
+        set_tier_selector(None)
+
+    assert models == ["gpt-4o"]
+    assert result["model_tier"] == {"initial": 1, "tier": 1}
+    assert selector.stats()["gpt-4o"]["calls"] == 1
+
+
+def test_miss_discards_draft_without_running_tools(monkeypatch, policy):
+    draft = tool_call_message("write_email", {"to": "a@example.com", "subject": "Re", "content": "Hi"})
+    _, agent = patch_models(monkeypatch, "ignore", [draft])
+
+    result = create_graph().invoke({"email_input": EMAIL})
+
+    assert result["classification_decision"] == "ignore"
+    assert result["messages"] == []
+    deadline = time.time() + 2
+    while not policy.stats()["wasted_tokens"] and time.time() < deadline:
+        time.sleep(0.01)
+    stats = policy.stats()
+    assert stats["misses"] == 1 and stats["wasted_tokens"] > 0
+
+
+def test_async_miss_cancels_the_draft(monkeypatch, policy):
+    router, agent = patch_models(monkeypatch, "notify", [AIMessage(content="never used")])
+    router.delay, agent.delay = 0.01, 1.0
+
+    result = asyncio.run(create_graph().ainvoke({"email_input": EMAIL}))
+
+    assert result["classification_decision"] == "notify"
+    assert agent.cancelled
+    assert policy.stats()["misses"] == 1 and policy.stats()["wasted_tokens"] > 0
+
+
+def test_async_hit(monkeypatch, policy):
+    _, agent = patch_models(monkeypatch, "respond", [AIMessage(content="Done")])
+
+    result = asyncio.run(create_graph().ainvoke({"email_input": EMAIL}))
+
+    assert agent.calls == 1
+    assert result["messages"][-1].content == "Done"
+    assert policy.stats()["hits"] == 1
+
+
+def test_unknown_sender_does_not_speculate(monkeypatch, policy):
+    router, agent = patch_models(monkeypatch, "ignore", [])
+
+    create_graph().invoke({"email_input": dict(EMAIL, author="stranger@example.com")})
+
+    assert router.calls == 1 and agent.calls == 0
+    assert policy.stats()["speculations"] == 0
+    assert policy.likelihood("stranger@example.com") is None
@@ -0,0 +1,76 @@
+"""Tests for streaming graph output."""
+
+import asyncio
+import importlib
+
+import pytest
+from langchain_core.messages import AIMessage
+
+import main
+from email_assistant.agent import create_graph
+from email_assistant.streaming import astream_email, stream_email
+from email_assistant.tests.test_data import get_test_email
+from email_assistant.tests.utils import ScriptedChatModel, tool_call_message
+
+EMAIL = get_test_email(3)
+
+
+@pytest.fixture
+def scripted_agent(monkeypatch):
+    """Script the agent: one search_emails call, then a three-word reply."""
+    llm = ScriptedChatModel(responses=[
+        tool_call_message("search_emails", {"query": "status"}),
+        AIMessage(content="Status is green"),
+    ])
+    agent_module = importlib.import_module("email_assistant.nodes.agent_node")
+    monkeypatch.setattr(agent_module, "get_llm_router_with_tools", lambda: llm)
+    return llm
+
+
+def test_stream_email_emits_tokens_tools_and_transitions(stub_router, scripted_agent):
+    stub_router.classification = "respond"
+
+    events = list(stream_email(EMAIL, create_graph()))
+
+    kinds = [(e.kind, e.node) for e in events if e.kind != "token"]
+    assert kinds == [
+        ("node_start", "triage_router"), ("node_end", "triage_router"),
+        ("node_start", "agent"), ("node_end", "agent"),
+        ("node_start", "tools"), ("tool_start", "tools"), ("tool_end", "tools"), ("node_end", "tools"),
+        ("node_start", "agent"), ("node_end", "agent"),
+        ("done", ""),
+    ]
+    tokens = [e.data["text"] for e in events if e.kind == "token"]
+    assert tokens == ["Status ", "is ", "green"]
+    assert events[6].data["name"] == "search_emails"
+    assert events[6].data["output"].startswith("Found emails matching 'status'")
+
+    done = events[-1].data
+    assert done["state"]["messages"][-1].content == "Status is green"
+    first_token = next(e for e in events if e.kind == "token")
+    assert done["ttft_s"] == first_token.elapsed_s
+    assert 0 < done["ttft_s"] <= done["total_s"]
+
+
+def test_ignored_email_has_no_first_token(stub_router):
+    events = asyncio.run(_collect(astream_email(EMAIL, create_graph())))
+
+    assert [e.kind for e in events] == ["node_start", "node_end", "done"]
+    assert events[-1].data["ttft_s"] is None
+    assert events[-1].data["state"]["classification_decision"] == "ignore"
+
+
+def test_main_stream_flag(stub_router, scripted_agent, monkeypatch, capsys):
+    stub_router.classification = "respond"
+    monkeypatch.setattr(main, "graph", create_graph())
+
+    main.main(["--stream"])
+
+    out = capsys.readouterr().out
+    assert "[agent]" in out and "-> search_emails" in out
+    assert "Status is green" in out
+    assert "Time to first token:" in out and "Total latency:" in out
+
+
+async def _collect(events):
+    return [event async for event in events]
@@ -0,0 +1,87 @@
+"""Tests for the local OpenAI-compatible stub model server."""
+
+import random
+import urllib.error
+import urllib.request
+
+import pytest
+from langchain_openai import ChatOpenAI
+
+from email_assistant.agent import create_graph
+from email_assistant.stub_server import DecisionPolicy, StubModelServer, parse_latency
+from email_assistant.tests.test_data import get_test_email
+from email_assistant.tests.utils import extract_tool_calls
+from email_assistant.utils.cassette import get_cassette, set_cassette
+from email_assistant.utils.router import RouterSchema, configure_http_pool, tools
+
+SCRIPT = {
+    "router": [{"contains": "unsubscribe", "classification": "ignore"}],
+    "default": "respond",
+    "agent_plan": ["check_calendar_availability", "write_email"],
+}
+MESSAGES = [{"role": "system", "content": "Classify"}, {"role": "user", "content": "Lunch on Thursday?"}]
+
+
+@pytest.fixture
+def stub():
+    stub = StubModelServer(DecisionPolicy(script=SCRIPT))
+    stub.start()
+    yield stub
+    stub.stop()
+
+
+def chat_model(stub, **kwargs):
+    return ChatOpenAI(model="gpt-4o-mini", base_url=stub.url, api_key="stub", max_retries=0, **kwargs)
+
+
+def test_structured_output_follows_the_script(stub):
+    router = chat_model(stub).with_structured_output(RouterSchema)
+    assert router.invoke(MESSAGES).classification == "respond"
+    spam = [MESSAGES[0], {"role": "user", "content": "Click to unsubscribe"}]
+    assert router.invoke(spam).classification == "ignore"
+
+
+def test_tool_plan_streams_tool_calls(stub):
+    llm = chat_model(stub, streaming=True).bind_tools(tools)
+    first = llm.invoke(MESSAGES)
+    assert first.tool_calls[0]["name"] == "check_calendar_availability"
+    assert first.tool_calls[0]["args"] == {"day": "2025-05-22"}
+
+
+def test_injected_429_carries_retry_after():
+    stub = StubModelServer(rate_limit_rate=1.0, retry_after=2)
+    stub.start()
+    try:
+        request = urllib.request.Request(f"{stub.url}/chat/completions", data=b"{}", method="POST")
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request)
+        assert error.value.code == 429 and error.value.headers["Retry-After"] == "2"
+        assert stub.stats()["rate_limited"] == 1
+    finally:
+        stub.stop()
+
+
+def test_latency_distributions():
+    rng = random.Random(0)
+    assert parse_latency("fixed:0.2")(rng) == 0.2
+    assert 0.1 <= parse_latency("uniform:0.1,0.3")(rng) <= 0.3
+    assert parse_latency("lognormal:0.5,0.4")(rng) > 0
+    with pytest.raises(ValueError):
+        parse_latency("pareto:1")
+
+
+def test_graph_runs_end_to_end_against_the_stub(monkeypatch, stub):
+    previous = get_cassette()
+    set_cassette(None)
+    monkeypatch.setenv("OPENAI_BASE_URL", stub.url)
+    monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    configure_http_pool()  # rebuild the model clients on the stub's base URL
+    try:
+        state = create_graph().invoke({"email_input": get_test_email(0)})
+    finally:
+        configure_http_pool()
+        set_cassette(previous)
+
+    assert state["classification_decision"] == "respond"
+    assert {"check_calendar_availability", "write_email"} <= set(extract_tool_calls(state["messages"]))
+    assert stub.stats()["completed"] == 4  # triage, two tool calls, final reply
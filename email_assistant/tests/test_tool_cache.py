@@ -0,0 +1,151 @@
+"""Tests for per-thread memoization of read-only tools."""
+
+import asyncio
+import importlib
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+from langgraph.checkpoint.memory import MemorySaver
+
+from email_assistant import tools
+from email_assistant.agent import create_graph
+from email_assistant.tests.test_data import get_test_email
+from email_assistant.tests.utils import ScriptedChatModel, tool_call_message
+from email_assistant.utils.tool_cache import ToolResultCache, canonical_args
+from email_assistant_hitl.agent import create_graph as create_hitl_graph
+from email_assistant_hitl.utils.router import RouterSchema as HitlRouterSchema
+
+EMAIL = get_test_email(3)
+
+# search, repeat the search, reschedule, search again, finish
+REACT_SCRIPT = [
+    ("search_events", {"query": "1:1"}),
+    ("search_events", {"query": "1:1"}),
+    ("update_event", {"event_id": "evt_1", "new_date": "Thursday"}),
+    ("search_events", {"query": "1:1"}),
+]
+
+
+class RespondRouter:
+    def invoke(self, messages):
+        return HitlRouterSchema(reasoning="stub", classification="respond")
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+def scripted_responses():
+    return [tool_call_message(name, args, f"call_{i}") for i, (name, args) in enumerate(REACT_SCRIPT)] + [
+        AIMessage(content="Done")
+    ]
+
+
+def test_canonical_args_ignores_order_and_none():
+    assert canonical_args({"b": 1, "a": "x", "c": None}) == canonical_args({"a": "x", "b": 1})
+
+
+def test_cache_is_scoped_per_thread_and_invalidated():
+    cache = ToolResultCache()
+    cache.set("t1", "search_emails", {"query": "alpha"}, "result")
+
+    assert cache.get("t1", "search_emails", {"query": "alpha", "sender": None}) == "result"
+    assert cache.get("t2", "search_emails", {"query": "alpha"}) is None
+    cache.invalidate("t1")
+    assert cache.get("t1", "search_emails", {"query": "alpha"}) is None
+    assert cache.stats() == {"avoided_calls": 1, "misses": 2, "invalidations": 1, "threads": 0, "entries": 0}
+
+
+def test_lookup_that_overlapped_a_write_is_not_cached():
+    cache = ToolResultCache()
+    generation = cache.generation()  # a lookup starts...
+    cache.invalidate("t1")  # ...a write of the same batch finishes...
+    cache.set("t1", "search_emails", {"query": "alpha"}, "stale", generation)  # ...then the lookup
+
+    assert cache.get("t1", "search_emails", {"query": "alpha"}) is None
+    cache.set("t1", "search_emails", {"query": "alpha"}, "fresh", cache.generation())
+    cache.set("t2", "search_emails", {"query": "alpha"}, "other", generation)
+    assert cache.get("t1", "search_emails", {"query": "alpha"}) == "fresh"
+    assert cache.get("t2", "search_emails", {"query": "alpha"}) == "other"
+
+
+def test_cache_expires_and_bounds_threads():
+    cache = ToolResultCache(max_threads=2, ttl_seconds=0)
+    cache.set("t1", "search_emails", {}, "old")
+    assert cache.get("t1", "search_emails", {}) is None
+
+    cache.ttl_seconds = 60
+    for thread_id in ("t1", "t2", "t3"):
+        cache.set(thread_id, "search_emails", {}, thread_id)
+    assert cache.get("t1", "search_emails", {}) is None
+    assert cache.get("t3", "search_emails", {}) == "t3"
+
+
+@pytest.fixture
+def counted_search(monkeypatch):
+    """Count backend calls of the agent graph's search_events tool."""
+    calls = []
+    original = tools.search_events.func
+
+    def search_events(query, start_date=None, end_date=None):
+        calls.append(query)
+        return original(query, start_date, end_date)
+
+    monkeypatch.setattr(tools.search_events, "func", search_events)
+    monkeypatch.setattr(tools.search_events, "coroutine", None)
+    return calls
+
+
+@pytest.fixture
+def scripted_agent(monkeypatch, stub_router):
+    stub_router.classification = "respond"
+    llm = ScriptedChatModel(responses=scripted_responses())
+    monkeypatch.setattr(importlib.import_module("email_assistant.nodes.agent_node"), "get_llm_router_with_tools", lambda: llm)
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_tool_node_memoizes_until_a_write(scripted_agent, counted_search, tool_cache_store, thread_config, mode):
+    graph = create_graph()
+    payload = {"email_input": EMAIL}
+
+    result = graph.invoke(payload, thread_config) if mode == "sync" else asyncio.run(graph.ainvoke(payload, thread_config))
+
+    # The repeat is served from the cache; the search after the write is not
+    assert counted_search == ["1:1", "1:1"]
+    assert tool_cache_store.stats()["avoided_calls"] == 1
+    assert tool_cache_store.stats()["invalidations"] == 1
+    tool_messages = [m for m in result["messages"] if m.type == "tool"]
+    assert tool_messages[1].content == tool_messages[0].content
+    assert tool_messages[1].tool_call_id == "call_1"
+
+
+def test_tool_node_without_thread_id_does_not_memoize(scripted_agent, counted_search, tool_cache_store):
+    create_graph().invoke({"email_input": EMAIL})
+
+    assert counted_search == ["1:1", "1:1", "1:1"]
+    assert tool_cache_store.stats()["avoided_calls"] == 0
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_hitl_action_handler_memoizes_until_a_write(monkeypatch, tool_cache_store, mode):
+    calls = []
+
+    def search_events(query: str, start_date: str = None, end_date: str = None) -> str:
+        """Search calendar events."""
+        calls.append(query)
+        return f"events for {query}"
+
+    handler = importlib.import_module("email_assistant_hitl.nodes.action_handler_hitl")
+    monkeypatch.setitem(handler.tools_by_name, "search_events", StructuredTool.from_function(search_events))
+    monkeypatch.setattr(importlib.import_module("email_assistant_hitl.nodes.triage_router"), "get_llm_router", RespondRouter)
+    llm = ScriptedChatModel(responses=scripted_responses())
+    monkeypatch.setattr(importlib.import_module("email_assistant_hitl.nodes.agent_node_hitl"), "get_llm_with_tools_hitl", lambda: llm)
+    graph = create_hitl_graph(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": f"memo-{mode}"}}
+    payload = {"email_input": EMAIL}
+
+    result = graph.invoke(payload, config) if mode == "sync" else asyncio.run(graph.ainvoke(payload, config))
+
+    assert calls == ["1:1", "1:1"]
+    assert tool_cache_store.stats()["avoided_calls"] == 1
+    assert result["messages"][-1].content == "Done"
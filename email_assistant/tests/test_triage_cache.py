@@ -0,0 +1,91 @@
+"""Tests for the exact-duplicate triage cache."""
+
+import pytest
+
+from email_assistant import agent
+from email_assistant.tests.test_data import get_test_email
+from email_assistant.utils.triage_cache import (
+    MemoryTriageCache,
+    SQLiteTriageCache,
+    create_triage_cache,
+    triage_cache_key,
+)
+
+RESULT = {"reasoning": "newsletter", "classification": "ignore"}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return MemoryTriageCache(max_entries=2, ttl_seconds=60)
+    return SQLiteTriageCache(str(tmp_path / "triage.db"), max_entries=2, ttl_seconds=60)
+
+
+def test_key_ignores_whitespace_and_address_case():
+    email = ("News@Example.com", "me@company.com", "Weekly  digest", "Hello\n  world ")
+    same = ("news@example.com", "me@company.com", "Weekly digest", "Hello world")
+    assert triage_cache_key(email, "v1") == triage_cache_key(same, "v1")
+    assert triage_cache_key(email, "v1") != triage_cache_key(email, "v2")
+
+
+def test_hit_and_miss_counters(cache):
+    assert cache.get("a") is None
+    cache.set("a", RESULT)
+    assert cache.get("a") == RESULT
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_lru_eviction(cache):
+    cache.set("a", RESULT)
+    cache.set("b", RESULT)
+    assert cache.get("a") == RESULT  # "b" is now least recently used
+    cache.set("c", RESULT)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == RESULT
+    assert cache.get("c") == RESULT
+
+
+def test_ttl_expiry(cache):
+    cache.set("a", RESULT)
+    cache.ttl_seconds = -1
+    assert cache.get("a") is None
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "triage.db")
+    SQLiteTriageCache(path).set("a", RESULT)
+    assert SQLiteTriageCache(path).get("a") == RESULT
+
+
+def test_create_triage_cache(tmp_path):
+    assert create_triage_cache("off") is None
+    assert isinstance(create_triage_cache("memory"), MemoryTriageCache)
+    assert isinstance(create_triage_cache(f"sqlite:{tmp_path / 'c.db'}"), SQLiteTriageCache)
+    with pytest.raises(ValueError):
+        create_triage_cache("redis://localhost")
+
+
+def test_duplicate_email_skips_router(stub_router, triage_cache):
+    graph = agent.create_graph()
+    email = get_test_email(3)
+
+    first = graph.invoke({"email_input": email})
+    second = graph.invoke({"email_input": dict(email)})
+
+    assert len(stub_router.calls) == 1
+    assert first["classification_decision"] == second["classification_decision"] == "ignore"
+    assert triage_cache.stats()["hits"] == 1
+
+
+def test_profile_change_misses_cache(stub_router):
+    graph = agent.create_graph()
+    email = get_test_email(3)
+
+    graph.invoke({"email_input": email})
+    graph.invoke({"email_input": email}, config={"configurable": {"user_profile": {"background": "Other user."}}})
+
+    assert len(stub_router.calls) == 2
@@ -0,0 +1,89 @@
+"""Tests for the local triage classifier and its confidence gate."""
+
+import json
+
+import pytest
+
+from email_assistant import agent
+from email_assistant.helpers import parse_email
+from email_assistant.scripts.triage_classifier import evaluate, load_examples
+from email_assistant.tests.test_data import email_classification_pairs, get_test_email
+from email_assistant.utils.triage_classifier import (
+    ConfidenceGate,
+    TriageClassifier,
+    set_classifier_gate,
+)
+
+
+@pytest.fixture
+def model():
+    examples = [(parse_email(email), label) for email, label in email_classification_pairs]
+    return TriageClassifier.train(examples * 3)
+
+
+def test_predicts_training_labels(model):
+    for email, label in email_classification_pairs:
+        classification, confidence = model.predict(parse_email(email))
+        assert classification == label
+        assert 0.0 < confidence <= 1.0
+
+
+def test_artifact_round_trip(model, tmp_path):
+    path = tmp_path / "model.json"
+    model.save(path)
+    loaded = TriageClassifier.load(path)
+
+    assert loaded.version == model.version
+    email = parse_email(get_test_email(3))
+    assert loaded.predict(email) == pytest.approx(model.predict(email))
+
+
+def test_rejects_unknown_artifact_format(model, tmp_path):
+    path = tmp_path / "model.json"
+    model.save(path)
+    artifact = json.loads(path.read_text())
+    artifact["format_version"] = 99
+    path.write_text(json.dumps(artifact))
+
+    with pytest.raises(ValueError):
+        TriageClassifier.load(path)
+
+
+def test_gate_defers_below_threshold(model):
+    email = parse_email(get_test_email(0))
+    assert ConfidenceGate(model, threshold=0.0).classify(email) is not None
+
+    gate = ConfidenceGate(model, threshold=1.01)
+    assert gate.classify(email) is None
+    assert gate.stats()["deferred"] == 1
+
+
+def test_confident_classifier_skips_router(model, stub_router):
+    set_classifier_gate(ConfidenceGate(model, threshold=0.5))
+    try:
+        result = agent.create_graph().invoke({"email_input": get_test_email(1)})
+    finally:
+        set_classifier_gate(None)
+
+    assert result["classification_decision"] == "notify"
+    assert stub_router.calls == []
+
+
+def test_offline_evaluation_report(model):
+    report = evaluate(ConfidenceGate(model, threshold=0.5), email_classification_pairs, offline=True)
+
+    assert report["emails"] == len(email_classification_pairs)
+    assert report["local_accuracy"] == 1.0
+    assert report["llm_calls_avoided"] == 1.0
+    assert report["latency"]["p99_ms"] >= report["latency"]["p50_ms"]
+
+
+def test_load_examples_from_history(tmp_path):
+    path = tmp_path / "history.jsonl"
+    path.write_text(
+        json.dumps({"email_input": get_test_email(2), "classification_decision": "ignore"}) + "\n"
+        + json.dumps({**get_test_email(3), "classification": "respond"}) + "\n"
+    )
+    examples = load_examples(path)
+    assert [label for _, label in examples] == ["ignore", "respond"]
+    assert examples[1][0][2] == "Project Status Update"
@@ -0,0 +1,83 @@
+"""Tests for the deterministic pre-triage rule engine."""
+
+import pytest
+
+from email_assistant import agent
+from email_assistant.helpers import parse_email
+from email_assistant.tests.test_data import email_classification_pairs, get_test_email
+from email_assistant.utils.triage_rules import DEFAULT_RULES_PATH, TriageRules
+
+
+@pytest.fixture
+def rules():
+    return TriageRules.from_file(DEFAULT_RULES_PATH)
+
+
+def test_bundled_rules_agree_with_test_data(rules):
+    """Rules may only fire where they reproduce the expected classification."""
+    fired = 0
+    for email_input, expected in email_classification_pairs:
+        matched = rules.match(parse_email(email_input))
+        if matched is not None:
+            fired += 1
+            assert matched[1] == expected, f"{matched[0]} misclassified {email_input['subject']!r}"
+    assert fired >= 3
+
+
+def test_headers_are_matched_case_insensitively(rules):
+    email = ("someone@company.com", "me@company.com", "Hello", "Just checking in")
+    assert rules.match(email) is None
+    assert rules.match(email, {"Auto-Submitted": "auto-replied"}) == ("auto_submitted_header", "ignore")
+
+
+def test_noreply_senders_reach_the_model(rules):
+    """Password resets and receipts come from noreply addresses too."""
+    assert rules.match(("no-reply@accounts.example.com", "me", "Reset your password", "")) is None
+    assert rules.match(("deals@shop.example.com", "me", "Your order has shipped", "")) is None
+    assert rules.match(("marketing@shop.example.com", "me", "Spring sale", "")) == ("bulk_sender", "ignore")
+
+
+def test_mailing_list_headers_reach_the_model(rules):
+    email = ("dev-list@lists.example.com", "me", "Re: release plan", "Can you review the branch?")
+    assert rules.match(email, {"Precedence": "list", "List-Unsubscribe": "<mailto:leave@example.com>"}) is None
+
+
+def test_all_conditions_must_match():
+    rules = TriageRules([
+        {"name": "ci_failure", "classification": "notify", "when": {"author": "^ci@", "subject": "failed"}},
+    ])
+    assert rules.match(("ci@company.com", "me", "Build failed", "")) == ("ci_failure", "notify")
+    assert rules.match(("ci@company.com", "me", "Build passed", "")) is None
+
+
+def test_first_rule_in_file_order_wins():
+    rules = TriageRules([
+        {"name": "alerts", "classification": "notify", "when": {"subject": "outage"}},
+        {"name": "digest", "classification": "ignore", "when": {"email_thread": "unsubscribe"}},
+    ])
+    assert rules.match(("a", "b", "Outage report", "click to unsubscribe")) == ("alerts", "notify")
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        TriageRules([{"name": "r", "classification": "respond", "when": {"subject": "x"}}])
+    with pytest.raises(ValueError):
+        TriageRules([{"name": "r", "classification": "ignore", "when": {"cc": "x"}}])
+
+
+def test_stats_report_hits_and_saved_latency(rules):
+    rules.record_model_latency(0.5)
+    rules.match(parse_email(get_test_email(5)))
+    rules.match(parse_email(get_test_email(0)))
+
+    stats = rules.stats()
+    assert stats["evaluations"] == 2
+    assert stats["hits"]["auto_reply_subject"] == 1
+    assert 0.4 < stats["saved_seconds"] <= 0.5
+
+
+def test_rule_hit_skips_router(stub_router):
+    result = agent.create_graph().invoke({"email_input": get_test_email(5)})
+
+    assert result["classification_decision"] == "ignore"
+    assert stub_router.calls == []
@@ -1,7 +1,12 @@
 """Utility functions for testing."""
 
+import json
 from typing import List
 
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
 
 def extract_tool_calls(messages: list) -> List[str]:
     """Extract all tool names called in a message history.
@@ -110,4 +115,40 @@ def get_missing_tools(messages: list, expected_tools: List[str]) -> List[str]:
         List of tools that were expected but not called
     """
     extracted_tools = extract_tool_calls(messages)
-    return [tool for tool in expected_tools if tool.lower() not in extracted_tools]
\ No newline at end of file
+    return [tool for tool in expected_tools if tool.lower() not in extracted_tools]
+
+
+def tool_call_message(name: str, args: dict, call_id: str = "call_1") -> AIMessage:
+    """Build an AI message requesting a single tool call."""
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": call_id}])
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Offline chat model that replays scripted AI messages.
+
+    Streams text word by word and tool calls as chunks, so it exercises the
+    same callback events as a real streaming model.
+    """
+
+    responses: list
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self.responses.pop(0))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self.responses.pop(0)
+        for index, tool_call in enumerate(message.tool_calls):
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[{
+                "name": tool_call["name"],
+                "args": json.dumps(tool_call["args"]),
+                "id": tool_call["id"],
+                "index": index,
+            }]))
+        words = message.content.split(" ") if message.content else []
+        for i, word in enumerate(words):
+            text = word if i == len(words) - 1 else word + " "
+            yield ChatGenerationChunk(message=AIMessageChunk(content=text))
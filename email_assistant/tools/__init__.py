@@ -8,6 +8,12 @@ from email_assistant.tools.calendar_tools import (
     update_event,
 )
 
+# Lookups without side effects: safe to run concurrently or reuse.
+READ_ONLY_TOOLS = frozenset({"search_emails", "search_events", "check_calendar_availability"})
+
+# Tools that change mailbox or calendar state.
+MUTATING_TOOLS = frozenset({"write_email", "schedule_meeting", "update_event"})
+
 __all__ = [
     "write_email",
     "search_emails",
@@ -15,4 +21,6 @@ __all__ = [
     "check_calendar_availability",
     "search_events",
     "update_event",
-]
\ No newline at end of file
+    "READ_ONLY_TOOLS",
+    "MUTATING_TOOLS",
+]
@@ -2,13 +2,12 @@
 
 from datetime import datetime
 from dotenv import load_dotenv
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 
 load_dotenv()
 
 
-@tool
-def schedule_meeting(
+def _schedule_meeting(
     attendees: list[str],
     subject: str,
     duration_minutes: int,
@@ -32,8 +31,7 @@ def schedule_meeting(
     return f"Meeting '{subject}' scheduled on {date_str} at {start_time} for {duration_minutes} minutes with {len(attendees)} attendees"
 
 
-@tool
-def check_calendar_availability(day: str) -> str:
+def _check_calendar_availability(day: str) -> str:
     """Check available time slots for a given day.
     
     Args:
@@ -46,8 +44,7 @@ def check_calendar_availability(day: str) -> str:
     return f"Available times on {day}: 9:00 AM, 2:00 PM, 4:00 PM"
 
 
-@tool
-def search_events(query: str, start_date: str = None, end_date: str = None) -> str:
+def _search_events(query: str, start_date: str = None, end_date: str = None) -> str:
     """Search for existing calendar events (use when rescheduling or checking existing meetings).
     
     Args:
@@ -62,8 +59,7 @@ def search_events(query: str, start_date: str = None, end_date: str = None) -> s
     return f"Found events matching '{query}': Meeting with John Doe on Thursday at 2:00 PM"
 
 
-@tool
-def update_event(event_id: str, new_start_time: str = None, new_date: str = None) -> str:
+def _update_event(event_id: str, new_start_time: str = None, new_date: str = None) -> str:
     """Update an existing calendar event (use when rescheduling meetings).
     
     Args:
@@ -80,4 +76,34 @@ def update_event(event_id: str, new_start_time: str = None, new_date: str = None
         details.append(f"date to {new_date}")
     if new_start_time:
         details.append(f"time to {new_start_time}")
-    return f"Event {event_id} updated: " + ", ".join(details)
\ No newline at end of file
+    return f"Event {event_id} updated: " + ", ".join(details)
+
+
+# Native coroutines so `ainvoke` never needs a worker thread; a real backend
+# would await its calendar API client here.
+async def _aschedule_meeting(
+    attendees: list[str],
+    subject: str,
+    duration_minutes: int,
+    preferred_day: datetime,
+    start_time: int,
+) -> str:
+    return _schedule_meeting(attendees, subject, duration_minutes, preferred_day, start_time)
+
+
+async def _acheck_calendar_availability(day: str) -> str:
+    return _check_calendar_availability(day)
+
+
+async def _asearch_events(query: str, start_date: str = None, end_date: str = None) -> str:
+    return _search_events(query, start_date, end_date)
+
+
+async def _aupdate_event(event_id: str, new_start_time: str = None, new_date: str = None) -> str:
+    return _update_event(event_id, new_start_time, new_date)
+
+
+schedule_meeting = StructuredTool.from_function(func=_schedule_meeting, coroutine=_aschedule_meeting, name="schedule_meeting")
+check_calendar_availability = StructuredTool.from_function(func=_check_calendar_availability, coroutine=_acheck_calendar_availability, name="check_calendar_availability")
+search_events = StructuredTool.from_function(func=_search_events, coroutine=_asearch_events, name="search_events")
+update_event = StructuredTool.from_function(func=_update_event, coroutine=_aupdate_event, name="update_event")
@@ -1,13 +1,12 @@
 """Email-related tools."""
 
 from dotenv import load_dotenv
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 
 load_dotenv()
 
 
-@tool
-def write_email(to: str, subject: str, content: str) -> str:
+def _write_email(to: str, subject: str, content: str) -> str:
     """Compose and send email responses (use this to draft your final reply).
     
     Args:
@@ -22,8 +21,7 @@ def write_email(to: str, subject: str, content: str) -> str:
     return f"Email sent to {to} with subject '{subject}' and content: {content}"
 
 
-@tool
-def search_emails(query: str, sender: str = None, date_range: str = None) -> str:
+def _search_emails(query: str, sender: str = None, date_range: str = None) -> str:
     """Search through past emails to find information, context, or previous conversations.
     
     Args:
@@ -41,4 +39,18 @@ def search_emails(query: str, sender: str = None, date_range: str = None) -> str
     if date_range:
         filters.append(f"in {date_range}")
     filter_str = " " + " ".join(filters) if filters else ""
-    return f"Found emails matching '{query}'{filter_str}: Latest update on Project Alpha - status is on track, deployment scheduled for next week"
\ No newline at end of file
+    return f"Found emails matching '{query}'{filter_str}: Latest update on Project Alpha - status is on track, deployment scheduled for next week"
+
+
+# Native coroutines so `ainvoke` never needs a worker thread; a real backend
+# would await its mail API client here.
+async def _awrite_email(to: str, subject: str, content: str) -> str:
+    return _write_email(to, subject, content)
+
+
+async def _asearch_emails(query: str, sender: str = None, date_range: str = None) -> str:
+    return _search_emails(query, sender, date_range)
+
+
+write_email = StructuredTool.from_function(func=_write_email, coroutine=_awrite_email, name="write_email")
+search_emails = StructuredTool.from_function(func=_search_emails, coroutine=_asearch_emails, name="search_emails")
@@ -1,10 +1,90 @@
 """Utilities for the agent graph."""
 
 from email_assistant.utils.state import GraphState
-from email_assistant.utils.router import RouterSchema, get_llm_router
+from email_assistant.utils.router import (
+    RouterSchema,
+    configure_http_pool,
+    get_llm,
+    get_llm_router,
+)
+from email_assistant.utils.triage_cache import (
+    MemoryTriageCache,
+    SQLiteTriageCache,
+    get_triage_cache,
+    set_triage_cache,
+)
+from email_assistant.utils.similarity_index import (
+    SimilarityIndex,
+    get_similarity_index,
+    set_similarity_index,
+)
+from email_assistant.utils.triage_rules import TriageRules, get_triage_rules, set_triage_rules
+from email_assistant.utils.triage_classifier import (
+    ConfidenceGate,
+    TriageClassifier,
+    get_classifier_gate,
+    set_classifier_gate,
+)
+from email_assistant.utils.tool_cache import ToolResultCache, get_tool_cache, set_tool_cache
+from email_assistant.utils.context_window import ContextWindow, get_context_window, set_context_window
+from email_assistant.utils.accounting import UsageLedger, get_usage_ledger, set_usage_ledger
+from email_assistant.utils.metrics import MetricsRegistry, get_metrics, set_metrics, start_metrics_server
+from email_assistant.utils.rate_limiter import ModelRateLimiter, get_rate_limiter, set_rate_limiter
+from email_assistant.utils.model_tiers import TierSelector, get_tier_selector, set_tier_selector
+from email_assistant.utils.cassette import Cassette, get_cassette, set_cassette
+from email_assistant.utils.hedging import HedgingPolicy, get_hedging_policy, set_hedging_policy
+from email_assistant.utils.speculation import (
+    SpeculationPolicy,
+    get_speculation_policy,
+    set_speculation_policy,
+)
 
 __all__ = [
     "GraphState",
     "RouterSchema",
+    "configure_http_pool",
+    "get_llm",
     "get_llm_router",
+    "MemoryTriageCache",
+    "SQLiteTriageCache",
+    "get_triage_cache",
+    "set_triage_cache",
+    "SimilarityIndex",
+    "get_similarity_index",
+    "set_similarity_index",
+    "TriageRules",
+    "get_triage_rules",
+    "set_triage_rules",
+    "ConfidenceGate",
+    "TriageClassifier",
+    "get_classifier_gate",
+    "set_classifier_gate",
+    "ToolResultCache",
+    "get_tool_cache",
+    "set_tool_cache",
+    "ContextWindow",
+    "get_context_window",
+    "set_context_window",
+    "UsageLedger",
+    "get_usage_ledger",
+    "set_usage_ledger",
+    "MetricsRegistry",
+    "get_metrics",
+    "set_metrics",
+    "start_metrics_server",
+    "ModelRateLimiter",
+    "get_rate_limiter",
+    "set_rate_limiter",
+    "TierSelector",
+    "get_tier_selector",
+    "set_tier_selector",
+    "Cassette",
+    "get_cassette",
+    "set_cassette",
+    "HedgingPolicy",
+    "get_hedging_policy",
+    "set_hedging_policy",
+    "SpeculationPolicy",
+    "get_speculation_policy",
+    "set_speculation_policy",
 ]
@@ -0,0 +1,400 @@
+"""Token and cost accounting for model calls.
+
+``AccountingCallbackHandler`` is attached to the compiled graph and sees
+every model call made inside it. For each call it reads ``usage_metadata``,
+including cached prompt tokens (``input_token_details.cache_read``), and
+records it against the graph node (``langgraph_node``), the model and the
+run's ``thread_id``. When the triage node finishes it also records the
+thread's classification, so costs can be broken down per classification.
+Speculative drafts run inside ``triage_router`` and are attributed to it.
+
+``UsageLedger`` aggregates totals in memory and periodically appends the raw
+records to a local sink, which the ``usage-report`` command reads back.
+
+``EMAIL_ASSISTANT_ACCOUNTING`` selects ``memory`` (default, totals only),
+``jsonl:<path>``, ``sqlite:<path>`` or ``off``. Records are flushed every
+``EMAIL_ASSISTANT_ACCOUNTING_FLUSH_SECONDS`` (default 30), every
+``DEFAULT_FLUSH_RECORDS`` records and at exit.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+DEFAULT_FLUSH_SECONDS = float(os.getenv("EMAIL_ASSISTANT_ACCOUNTING_FLUSH_SECONDS", "30"))
+DEFAULT_FLUSH_RECORDS = 500
+DEFAULT_MAX_THREADS = 100000
+
+# USD per million tokens: (input, cached input, output)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+}
+
+USAGE_FIELDS = (
+    "ts", "kind", "thread_id", "node", "model",
+    "input_tokens", "cached_tokens", "output_tokens", "cost_usd", "classification",
+)
+
+
+def model_price(model: str):
+    """Return the (input, cached, output) price of a model, or None if unknown.
+
+    Dated snapshots (``gpt-4o-mini-2024-07-18``) use the price of the
+    longest matching model name.
+    """
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if (model or "").startswith(name):
+            return MODEL_PRICES[name]
+    return None
+
+
+def call_cost(model: str, input_tokens: int, cached_tokens: int, output_tokens: int) -> float:
+    """Cost of one call in USD (0.0 for models without a price)."""
+    price = model_price(model)
+    if price is None:
+        return 0.0
+    uncached = input_tokens - cached_tokens
+    return (uncached * price[0] + cached_tokens * price[1] + output_tokens * price[2]) / 1_000_000
+
+
+class JSONLUsageSink:
+    """Appends usage records to a JSON lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, records: list):
+        # One write per flush keeps lines from different processes whole
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+
+    def read(self) -> list:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+class SQLiteUsageSink:
+    """Stores usage records in a local SQLite file shared by workers on the host."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            " ts REAL, kind TEXT, thread_id TEXT, node TEXT, model TEXT, input_tokens INTEGER,"
+            " cached_tokens INTEGER, output_tokens INTEGER, cost_usd REAL, classification TEXT)"
+        )
+        self._lock = threading.Lock()
+
+    def write(self, records: list):
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT INTO usage ({', '.join(USAGE_FIELDS)}) VALUES ({', '.join('?' * len(USAGE_FIELDS))})",
+                [tuple(record.get(field) for field in USAGE_FIELDS) for record in records],
+            )
+
+    def read(self) -> list:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(USAGE_FIELDS)} FROM usage ORDER BY ts").fetchall()
+        return [dict(zip(USAGE_FIELDS, row)) for row in rows]
+
+
+def create_usage_sink(spec: str):
+    """Create a sink from a spec string.
+
+    Args:
+        spec: "jsonl:<path>" or "sqlite:<path>".
+
+    Returns:
+        The sink instance.
+    """
+    if spec.startswith("jsonl:"):
+        return JSONLUsageSink(spec[len("jsonl:"):])
+    if spec.startswith("sqlite:"):
+        return SQLiteUsageSink(spec[len("sqlite:"):])
+    raise ValueError(f"Unknown usage sink: {spec!r} (expected jsonl:<path> or sqlite:<path>)")
+
+
+def _empty_totals() -> dict:
+    return {"calls": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+
+
+def _totals():
+    return defaultdict(_empty_totals)
+
+
+def _add(totals: dict, record: dict):
+    """Add one call record to a totals dict."""
+    totals["calls"] += 1
+    for field in ("input_tokens", "cached_tokens", "output_tokens", "cost_usd"):
+        totals[field] += record[field]
+
+
+def _merge(totals: dict, other: dict):
+    """Add one totals dict to another."""
+    for field, value in other.items():
+        totals[field] += value
+
+
+def summarize(records) -> dict:
+    """Break usage records down by classification, node and model.
+
+    Args:
+        records: Call and classification records (from a sink or a ledger).
+
+    Returns:
+        Totals keyed by classification, node, model and node/model pair.
+        Calls of threads without a recorded classification are "unknown".
+    """
+    records = list(records)
+    classifications = {r["thread_id"]: r["classification"] for r in records if r["kind"] == "classification"}
+    by_classification, by_node, by_model, by_node_model = _totals(), _totals(), _totals(), _totals()
+    total = _empty_totals()
+    for record in records:
+        if record["kind"] != "call":
+            continue
+        _add(by_classification[classifications.get(record["thread_id"], "unknown")], record)
+        _add(by_node[record["node"]], record)
+        _add(by_model[record["model"]], record)
+        _add(by_node_model[f"{record['node']}/{record['model']}"], record)
+        _add(total, record)
+    return {
+        "total": total,
+        "emails": len(classifications),
+        "by_classification": dict(by_classification),
+        "by_node": dict(by_node),
+        "by_model": dict(by_model),
+        "by_node_model": dict(by_node_model),
+    }
+
+
+class UsageLedger:
+    """In-memory usage totals with periodic flushes of raw records to a sink.
+
+    Per-email and per-classification attribution needs a ``thread_id``;
+    calls of runs without one are counted as "unknown".
+    """
+
+    def __init__(
+        self,
+        sink=None,
+        flush_seconds: float = DEFAULT_FLUSH_SECONDS,
+        flush_records: int = DEFAULT_FLUSH_RECORDS,
+        max_threads: int = DEFAULT_MAX_THREADS,
+    ):
+        self.sink = sink
+        self.flush_seconds = flush_seconds
+        self.flush_records = flush_records
+        self.max_threads = max_threads
+        self._by_node_model = _totals()
+        self._by_classification = _totals()
+        self._threads = OrderedDict()  # thread_id -> [classification, totals]
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record_call(self, thread_id, node: str, model: str, usage: dict) -> dict:
+        """Record the ``usage_metadata`` of one model call.
+
+        Returns:
+            The stored record, with its cost in USD.
+        """
+        input_tokens = usage.get("input_tokens", 0)
+        cached_tokens = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+        output_tokens = usage.get("output_tokens", 0)
+        record = {
+            "ts": time.time(),
+            "kind": "call",
+            "thread_id": thread_id,
+            "node": node,
+            "model": model,
+            "input_tokens": input_tokens,
+            "cached_tokens": cached_tokens,
+            "output_tokens": output_tokens,
+            "cost_usd": call_cost(model, input_tokens, cached_tokens, output_tokens),
+        }
+        with self._lock:
+            _add(self._by_node_model[(node, model)], record)
+            if thread_id is None:
+                _add(self._by_classification["unknown"], record)
+            else:
+                classification, totals = self._thread(thread_id)
+                _add(totals, record)
+                if classification is not None:
+                    _add(self._by_classification[classification], record)
+        self._append(record)
+        return record
+
+    def record_classification(self, thread_id, classification: str):
+        """Record the triage decision of a thread; earlier calls move to it."""
+        if thread_id is None:
+            return
+        with self._lock:
+            entry = self._thread(thread_id)
+            if entry[0] is None:
+                entry[0] = classification
+                _merge(self._by_classification[classification], entry[1])
+        self._append({"ts": time.time(), "kind": "classification", "thread_id": thread_id, "classification": classification})
+
+    def _thread(self, thread_id) -> list:
+        """Per-thread entry, evicting the least recently used. Caller holds the lock."""
+        entry = self._threads.pop(thread_id, None) or [None, _empty_totals()]
+        self._threads[thread_id] = entry
+        while len(self._threads) > self.max_threads:
+            self._threads.popitem(last=False)
+        return entry
+
+    def _append(self, record: dict):
+        if self.sink is None:
+            return
+        with self._lock:
+            self._pending.append(record)
+            due = (
+                len(self._pending) >= self.flush_records
+                or time.monotonic() - self._last_flush >= self.flush_seconds
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write pending records to the sink."""
+        with self._lock:
+            records, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        if records and self.sink is not None:
+            self.sink.write(records)
+
+    def thread_usage(self, thread_id) -> dict:
+        """Return the classification and totals of one thread (email)."""
+        with self._lock:
+            classification, totals = self._threads.get(thread_id) or (None, _empty_totals())
+            return {"classification": classification, **totals}
+
+    def stats(self) -> dict:
+        """Return totals by classification, node and model since the ledger started."""
+        with self._lock:
+            pairs = {key: dict(totals) for key, totals in self._by_node_model.items()}
+            by_classification = {key: dict(totals) for key, totals in self._by_classification.items()}
+            unclassified = [dict(totals) for classification, totals in self._threads.values() if classification is None]
+        by_node, by_model, by_node_model, total = _totals(), _totals(), _totals(), _empty_totals()
+        for (node, model), totals in pairs.items():
+            _merge(by_node[node], totals)
+            _merge(by_model[model], totals)
+            _merge(by_node_model[f"{node}/{model}"], totals)
+            _merge(total, totals)
+        for totals in unclassified:
+            _merge(by_classification.setdefault("unknown", _empty_totals()), totals)
+        return {
+            "total": total,
+            "by_classification": by_classification,
+            "by_node": dict(by_node),
+            "by_model": dict(by_model),
+            "by_node_model": dict(by_node_model),
+        }
+
+
+class AccountingCallbackHandler(BaseCallbackHandler):
+    """Feeds the usage of every model call in a graph run to the process-wide ledger.
+
+    The ledger is looked up per event, so replacing it with
+    ``set_usage_ledger`` takes effect on graphs that are already built.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._calls = {}  # run_id -> (thread_id, node, model)
+        self._nodes = {}  # run_id -> thread_id, for node runs that may classify
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        metadata = metadata or {}
+        self._calls[run_id] = (
+            metadata.get("thread_id"),
+            metadata.get("langgraph_node", ""),
+            metadata.get("ls_model_name", ""),
+        )
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        thread_id, node, model = self._calls.pop(run_id, (None, "", ""))
+        ledger = get_usage_ledger()
+        if ledger is None:
+            return
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if usage:
+                    name = message.response_metadata.get("model_name") or model
+                    ledger.record_call(thread_id, node, name, usage)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._calls.pop(run_id, None)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        # Only a node's own run returns its state update
+        node = (metadata or {}).get("langgraph_node")
+        if node is not None and node == kwargs.get("name"):
+            self._nodes[run_id] = metadata.get("thread_id")
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        if run_id not in self._nodes:
+            return
+        thread_id = self._nodes.pop(run_id)
+        ledger = get_usage_ledger()
+        if ledger is not None and isinstance(outputs, dict) and outputs.get("classification_decision"):
+            ledger.record_classification(thread_id, outputs["classification_decision"])
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._nodes.pop(run_id, None)
+
+
+_usage_ledger = None
+_usage_ledger_configured = False
+_usage_ledger_lock = threading.Lock()
+
+
+def create_usage_ledger(spec: str):
+    """Create a ledger from a spec string.
+
+    Args:
+        spec: "memory", "jsonl:<path>", "sqlite:<path>" or "off".
+
+    Returns:
+        The ledger, or None when accounting is off.
+    """
+    if spec in ("", "off", "none"):
+        return None
+    if spec == "memory":
+        return UsageLedger()
+    ledger = UsageLedger(create_usage_sink(spec))
+    atexit.register(ledger.flush)
+    return ledger
+
+
+def get_usage_ledger():
+    """Get the process-wide usage ledger, created from the environment on first use."""
+    global _usage_ledger, _usage_ledger_configured
+    if not _usage_ledger_configured:
+        with _usage_ledger_lock:
+            if not _usage_ledger_configured:
+                _usage_ledger = create_usage_ledger(os.getenv("EMAIL_ASSISTANT_ACCOUNTING", "memory"))
+                _usage_ledger_configured = True
+    return _usage_ledger
+
+
+def set_usage_ledger(ledger):
+    """Replace the process-wide usage ledger (None disables accounting)."""
+    global _usage_ledger, _usage_ledger_configured
+    with _usage_ledger_lock:
+        _usage_ledger = ledger
+        _usage_ledger_configured = True
@@ -0,0 +1,106 @@
+"""Per-email budgets for the agent loop.
+
+Nothing else bounds how many ``agent`` -> ``tools`` cycles one email may
+run, so a misbehaving thread could spend tokens until LangGraph's recursion
+limit. ``EmailBudget`` caps the number of agent model calls, the tokens they
+use and the wall-clock time since the loop started. Budgets are checked
+after each model call and before the next; once one is spent the graph
+routes the email to ``budget_exhausted`` instead of running the call's tools
+or calling the model again. Calls are charged on the request actually sent,
+after it was fitted to the context window.
+
+Usage is kept in the ``budget_usage`` state key, so it is checkpointed with
+the thread and returned in the final state.
+
+Defaults come from ``EMAIL_ASSISTANT_MAX_LLM_CALLS`` (12),
+``EMAIL_ASSISTANT_MAX_TOKENS`` (60000) and
+``EMAIL_ASSISTANT_DEADLINE_SECONDS`` (120); ``0`` disables a limit. A run
+can override any of them with ``config["configurable"]["email_budget"]``.
+"""
+
+import os
+import time
+from dataclasses import dataclass, replace
+
+from email_assistant.helpers.tokens import estimate_tokens
+
+
+@dataclass(frozen=True)
+class EmailBudget:
+    """Limits for one email's agent loop (0 means unlimited)."""
+
+    max_llm_calls: int = int(os.getenv("EMAIL_ASSISTANT_MAX_LLM_CALLS", "12"))
+    max_tokens: int = int(os.getenv("EMAIL_ASSISTANT_MAX_TOKENS", "60000"))
+    deadline_seconds: float = float(os.getenv("EMAIL_ASSISTANT_DEADLINE_SECONDS", "120"))
+
+    def exhausted(self, usage: dict):
+        """Return the name of the first spent budget, or None.
+
+        Args:
+            usage: The ``budget_usage`` state value (may be None).
+
+        Returns:
+            "llm_calls", "tokens", "deadline" or None.
+        """
+        if not usage:
+            return None
+        if self.max_llm_calls and usage["llm_calls"] >= self.max_llm_calls:
+            return "llm_calls"
+        if self.max_tokens and usage["tokens"] >= self.max_tokens:
+            return "tokens"
+        if self.deadline_seconds and time.time() - usage["started_at"] >= self.deadline_seconds:
+            return "deadline"
+        return None
+
+
+DEFAULT_BUDGET = EmailBudget()
+
+
+def budget_from_config(config) -> EmailBudget:
+    """Get the budget for a run.
+
+    Args:
+        config: The runnable config. ``config["configurable"]["email_budget"]``
+            may hold an EmailBudget or a dict overriding any of its fields.
+
+    Returns:
+        The budget to enforce (the default budget if none is set).
+    """
+    overrides = ((config or {}).get("configurable") or {}).get("email_budget")
+    if not overrides:
+        return DEFAULT_BUDGET
+    if isinstance(overrides, EmailBudget):
+        return overrides
+    return replace(DEFAULT_BUDGET, **overrides)
+
+
+def call_tokens(messages: list, response) -> int:
+    """Tokens used by one model call: reported usage, else an estimate."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return usage["total_tokens"]
+    tokens = sum(estimate_tokens(str(m["content"] if isinstance(m, dict) else m.content)) for m in messages)
+    return tokens + estimate_tokens(str(response.content))
+
+
+def start_usage() -> dict:
+    """Fresh usage for an email whose agent loop starts now."""
+    return {"llm_calls": 0, "tokens": 0, "started_at": time.time(), "elapsed_s": 0.0, "exhausted": None}
+
+
+def charge(usage: dict, messages: list, response) -> dict:
+    """Return usage updated with one agent model call.
+
+    Args:
+        usage: The usage before the call (from ``start_usage`` or state).
+        messages: The request sent to the model.
+        response: The model's response.
+
+    Returns:
+        A new usage dict; state values are never mutated.
+    """
+    usage = dict(usage)
+    usage["llm_calls"] += 1
+    usage["tokens"] += call_tokens(messages, response)
+    usage["elapsed_s"] = time.time() - usage["started_at"]
+    return usage
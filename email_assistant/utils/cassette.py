@@ -0,0 +1,276 @@
+"""Record/replay of model calls for deterministic offline runs.
+
+Every runnable handed out by ``get_llm`` is wrapped in ``CassetteRunnable``.
+With a cassette active, each request is keyed by the model's signature
+(model, temperature, output schema, tool schemas, bind arguments) and the
+canonicalized messages: roles, contents and tool calls, without ids or
+metadata. A cassette is a JSONL file with one line per recorded call: the
+key hash, the serialized response and the latency observed while recording.
+
+Modes:
+    - ``replay``: serve recorded responses; a request that was never
+      recorded raises ``CassetteMiss``. No network access or API key is
+      needed.
+    - ``record``: call the model and write a fresh cassette.
+    - ``auto``: replay what was recorded and record the rest.
+
+A request recorded several times (the same question asked in several
+tests) replays its responses in recording order, then starts over.
+
+``EMAIL_ASSISTANT_CASSETTE`` is the cassette path (unset: off),
+``EMAIL_ASSISTANT_CASSETTE_MODE`` the mode (``replay``) and
+``EMAIL_ASSISTANT_CASSETTE_LATENCY`` the simulated latency on replay:
+``0`` (default), ``recorded``, or a fixed number of seconds.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel
+
+MODES = ("replay", "record", "auto")
+# Role names of dict messages, mapped to message types
+_ROLES = {"user": "human", "assistant": "ai"}
+
+
+class CassetteMiss(KeyError):
+    """A replayed request that the cassette never recorded."""
+
+
+def model_signature(model_name: str, schema=None, tools=None, temperature=None, **bind_kwargs) -> str:
+    """Canonical JSON describing a model runnable; part of every request key."""
+    return json.dumps(
+        {
+            "model": model_name,
+            "temperature": temperature,
+            "schema": schema.model_json_schema() if schema is not None else None,
+            "tools": [convert_to_openai_tool(tool) for tool in tools] if tools else None,
+            "bind": bind_kwargs,
+        },
+        sort_keys=True,
+        default=str,
+    )
+
+
+def _canonical_message(message) -> dict:
+    if isinstance(message, dict):
+        return {"type": _ROLES.get(message.get("role"), message.get("role")), "content": message.get("content")}
+    canonical = {"type": message.type, "content": message.content}
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        canonical["tool_calls"] = [{"name": call["name"], "args": call["args"]} for call in tool_calls]
+    return canonical
+
+
+def request_key(signature: str, model_input) -> str:
+    """Hash a request: the model signature and its canonicalized messages."""
+    if isinstance(model_input, str):
+        messages = [{"type": "human", "content": model_input}]
+    else:
+        messages = [_canonical_message(m) for m in model_input]
+    payload = json.dumps([signature, messages], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def encode_response(response) -> dict:
+    """Serialize a model response (message, Pydantic object or plain data)."""
+    if isinstance(response, BaseMessage):
+        return {"message": message_to_dict(response)}
+    if isinstance(response, BaseModel):
+        return {"data": response.model_dump()}
+    return {"data": response}
+
+
+def decode_response(entry: dict, schema=None):
+    """Rebuild a response written by ``encode_response``."""
+    if "message" in entry:
+        return messages_from_dict([entry["message"]])[0]
+    if schema is not None:
+        return schema.model_validate(entry["data"])
+    return entry["data"]
+
+
+class Cassette:
+    """Recorded model calls on disk, served back by request key."""
+
+    def __init__(self, path: str, mode: str = "replay", latency="0"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.counters = Counter()
+        self._entries = {}
+        self._served = Counter()
+        self._lock = threading.Lock()
+        if mode == "record":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            open(path, "w").close()
+        elif os.path.exists(path):
+            self.load()
+        elif mode == "replay":
+            raise FileNotFoundError(f"Cassette not found: {path}")
+
+    def load(self):
+        """Read every recorded call of the cassette file."""
+        with open(self.path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._entries.setdefault(record["key"], []).append(record)
+
+    def _next(self, key: str):
+        """Return the next recorded call for a key, or None."""
+        with self._lock:
+            records = self._entries.get(key)
+            if not records:
+                return None
+            record = records[self._served[key] % len(records)]
+            self._served[key] += 1
+            self.counters["replayed"] += 1
+            return record
+
+    def _replay_delay(self, record: dict) -> float:
+        if self.latency == "recorded":
+            return record.get("latency_s", 0.0)
+        return float(self.latency)
+
+    def _record(self, key: str, response, seconds: float):
+        record = {"key": key, "latency_s": round(seconds, 4), **encode_response(response)}
+        line = json.dumps(record, separators=(",", ":"), default=str)
+        with self._lock:
+            self._entries.setdefault(key, []).append(record)
+            self.counters["recorded"] += 1
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+    def _lookup(self, key: str):
+        if self.mode == "record":
+            return None
+        record = self._next(key)
+        if record is None and self.mode == "replay":
+            with self._lock:
+                self.counters["misses"] += 1
+            raise CassetteMiss(f"Request {key} is not in cassette {self.path}; record it with mode 'record' or 'auto'")
+        return record
+
+    def play(self, key: str, call, schema=None):
+        """Serve a request from the cassette, or make it with ``call()`` and record it."""
+        record = self._lookup(key)
+        if record is not None:
+            delay = self._replay_delay(record)
+            if delay > 0:
+                time.sleep(delay)
+            return decode_response(record, schema)
+        start = time.perf_counter()
+        response = call()
+        self._record(key, response, time.perf_counter() - start)
+        return response
+
+    async def aplay(self, key: str, call, schema=None):
+        """Async variant of ``play``; ``call()`` returns an awaitable."""
+        record = self._lookup(key)
+        if record is not None:
+            delay = self._replay_delay(record)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return decode_response(record, schema)
+        start = time.perf_counter()
+        response = await call()
+        self._record(key, response, time.perf_counter() - start)
+        return response
+
+    def stats(self) -> dict:
+        """Return recorded, replayed and missed calls."""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "requests": len(self._entries),
+                "recorded": self.counters["recorded"],
+                "replayed": self.counters["replayed"],
+                "misses": self.counters["misses"],
+            }
+
+
+class CassetteRunnable(Runnable):
+    """Routes ``invoke``/``ainvoke`` of a model runnable through the active cassette.
+
+    Other attributes are read from the wrapped runnable.
+    """
+
+    def __init__(self, bound, signature: str, schema=None):
+        self.bound = bound
+        self.signature = signature
+        self.schema = schema
+
+    def __getattr__(self, name):
+        if name == "bound":
+            raise AttributeError(name)
+        return getattr(self.bound, name)
+
+    def invoke(self, input, config=None, **kwargs):
+        cassette = get_cassette()
+        if cassette is None:
+            return self.bound.invoke(input, config, **kwargs)
+        return cassette.play(
+            request_key(self.signature, input), lambda: self.bound.invoke(input, config, **kwargs), self.schema
+        )
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        cassette = get_cassette()
+        if cassette is None:
+            return await self.bound.ainvoke(input, config, **kwargs)
+        return await cassette.aplay(
+            request_key(self.signature, input), lambda: self.bound.ainvoke(input, config, **kwargs), self.schema
+        )
+
+
+def offline_api_key():
+    """API key for new model clients: a placeholder when replaying without one.
+
+    Clients refuse to build without a key, but a replaying cassette never
+    sends a request.
+    """
+    key = os.getenv("OPENAI_API_KEY")
+    cassette = get_cassette()
+    if key is None and cassette is not None and cassette.mode == "replay":
+        return "cassette-replay"
+    return key
+
+
+_cassette = None
+_cassette_configured = False
+_cassette_lock = threading.Lock()
+
+
+def get_cassette():
+    """Get the process-wide cassette, created from the environment on first use."""
+    global _cassette, _cassette_configured
+    if not _cassette_configured:
+        with _cassette_lock:
+            if not _cassette_configured:
+                path = os.getenv("EMAIL_ASSISTANT_CASSETTE")
+                if path:
+                    _cassette = Cassette(
+                        path,
+                        os.getenv("EMAIL_ASSISTANT_CASSETTE_MODE", "replay"),
+                        os.getenv("EMAIL_ASSISTANT_CASSETTE_LATENCY", "0"),
+                    )
+                _cassette_configured = True
+    return _cassette
+
+
+def set_cassette(cassette):
+    """Replace the process-wide cassette (None calls the models directly)."""
+    global _cassette, _cassette_configured
+    with _cassette_lock:
+        _cassette = cassette
+        _cassette_configured = True
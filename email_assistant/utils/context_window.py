@@ -0,0 +1,151 @@
+"""Token-budgeted message window for the ReAct loop.
+
+Every agent step sends the whole conversation to the model, and the
+conversation only grows: tool observations, long email threads and feedback
+messages all stay in state. ``ContextWindow`` shrinks the prompt of a single
+request to a token budget without touching state, so checkpoints keep the
+full history.
+
+The system prompt, the original email (the first user message) and the tool
+results of the latest step are always sent verbatim. Older tool observations
+are shrunk oldest first: truncated to ``max_observation_tokens``, then elided
+to a one-line stub if the request is still over budget. Tool messages are
+never removed, because every tool call in the prompt needs its result.
+
+``EMAIL_ASSISTANT_CONTEXT_BUDGET`` sets the budget in tokens (default 8000,
+``off`` to disable) and ``EMAIL_ASSISTANT_CONTEXT_OBSERVATION_TOKENS`` the
+truncation length (default 300).
+"""
+
+import os
+import threading
+from collections import Counter
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from email_assistant.helpers.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+DEFAULT_BUDGET_TOKENS = 8000
+DEFAULT_OBSERVATION_TOKENS = int(os.getenv("EMAIL_ASSISTANT_CONTEXT_OBSERVATION_TOKENS", "300"))
+
+ELIDED_OBSERVATION = "[tool output omitted to fit the context budget]"
+
+
+def message_tokens(message) -> int:
+    """Estimate the tokens a message (object or dict) adds to a request."""
+    if isinstance(message, dict):
+        return estimate_tokens(str(message.get("content", "")))
+    tokens = estimate_tokens(str(message.content))
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        tokens += estimate_tokens(f"{tool_call['name']}{tool_call['args']}")
+    return tokens
+
+
+def _latest_step_start(messages: list) -> int:
+    """Index just past the last AI message, where the latest tool results begin."""
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], AIMessage):
+            return index + 1
+    return len(messages)
+
+
+class ContextWindow:
+    """Fits agent requests to a token budget and accounts for what it dropped."""
+
+    def __init__(self, budget_tokens: int = DEFAULT_BUDGET_TOKENS, max_observation_tokens: int = DEFAULT_OBSERVATION_TOKENS):
+        self.budget_tokens = budget_tokens
+        self.max_observation_tokens = max_observation_tokens
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def fit(self, messages: list) -> tuple:
+        """Shrink older tool observations until the request fits the budget.
+
+        Args:
+            messages: The full request, system prompt first.
+
+        Returns:
+            A tuple of (messages to send, report). The report holds the token
+            estimate before and after, and the tool_call_ids of truncated and
+            elided observations. Input messages are never mutated.
+        """
+        sizes = [message_tokens(m) for m in messages]
+        report = {"budget": self.budget_tokens, "tokens_before": sum(sizes), "truncated": [], "elided": []}
+        total = report["tokens_before"]
+
+        if total > self.budget_tokens:
+            # Only tool observations before the latest step are shrunk
+            latest = _latest_step_start(messages)
+            candidates = [i for i, m in enumerate(messages[:latest]) if isinstance(m, ToolMessage)]
+            messages = list(messages)
+
+            # First pass truncates, second pass elides what is still too large
+            max_chars = self.max_observation_tokens * CHARS_PER_TOKEN
+            for index in candidates:
+                if total <= self.budget_tokens:
+                    break
+                content = str(messages[index].content)
+                if len(content) <= max_chars:
+                    continue
+                omitted = estimate_tokens(content[max_chars:])
+                messages[index] = messages[index].model_copy(
+                    update={"content": f"{content[:max_chars]}\n[... {omitted} tokens truncated]"}
+                )
+                total += message_tokens(messages[index]) - sizes[index]
+                sizes[index] = message_tokens(messages[index])
+                report["truncated"].append(messages[index].tool_call_id)
+
+            for index in candidates:
+                if total <= self.budget_tokens:
+                    break
+                messages[index] = messages[index].model_copy(update={"content": ELIDED_OBSERVATION})
+                total += message_tokens(messages[index]) - sizes[index]
+                sizes[index] = message_tokens(messages[index])
+                report["elided"].append(messages[index].tool_call_id)
+
+        report["tokens_after"] = total
+        with self._lock:
+            self.counters["requests"] += 1
+            self.counters["tokens_saved"] += report["tokens_before"] - total
+            self.counters["truncated"] += len(report["truncated"])
+            self.counters["elided"] += len(report["elided"])
+            self.counters["over_budget"] += total > self.budget_tokens
+        return messages, report
+
+    def stats(self) -> dict:
+        """Return requests fitted, tokens saved and observations shrunk."""
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "budget": self.budget_tokens,
+            "requests": counters.get("requests", 0),
+            "tokens_saved": counters.get("tokens_saved", 0),
+            "truncated": counters.get("truncated", 0),
+            "elided": counters.get("elided", 0),
+            "over_budget": counters.get("over_budget", 0),
+        }
+
+
+_context_window = None
+_context_window_configured = False
+_context_window_lock = threading.Lock()
+
+
+def get_context_window():
+    """Get the process-wide context window, created from the environment on first use."""
+    global _context_window, _context_window_configured
+    if not _context_window_configured:
+        with _context_window_lock:
+            if not _context_window_configured:
+                spec = os.getenv("EMAIL_ASSISTANT_CONTEXT_BUDGET", str(DEFAULT_BUDGET_TOKENS))
+                _context_window = None if spec in ("", "off", "none") else ContextWindow(int(spec))
+                _context_window_configured = True
+    return _context_window
+
+
+def set_context_window(window):
+    """Replace the process-wide context window (None sends the full history)."""
+    global _context_window, _context_window_configured
+    with _context_window_lock:
+        _context_window = window
+        _context_window_configured = True
@@ -0,0 +1,296 @@
+"""Hedged model requests to cut tail latency.
+
+A few slow model responses dominate p99 triage latency. With hedging on,
+a call that has not returned by a percentile of the recent latency of the
+same call site (``router`` or ``agent``) gets a second, identical request;
+the first reply wins. Hedging only targets calls that are safe to duplicate:
+the structured router call, and agent steps whose conversation has only made
+read-only tool calls so far (tools run in the ``tools`` node on the winning
+reply, so a discarded reply never executes anything).
+
+Hedges are capped at a fraction of all calls per call site, and every
+discarded reply is charged to ``extra_tokens`` so the policy's cost is
+visible next to its latency gain.
+
+Hedging is off by default. ``EMAIL_ASSISTANT_HEDGING=on`` enables it for the
+router; ``EMAIL_ASSISTANT_HEDGE_AGENT=on`` extends it to read-only agent
+steps. ``EMAIL_ASSISTANT_HEDGE_PERCENTILE`` (0.95) and
+``EMAIL_ASSISTANT_HEDGE_MAX_RATE`` (0.05) tune when and how often to hedge.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from email_assistant.helpers.tokens import estimate_tokens
+from email_assistant.utils.metrics import get_metrics
+
+DEFAULT_PERCENTILE = float(os.getenv("EMAIL_ASSISTANT_HEDGE_PERCENTILE", "0.95"))
+DEFAULT_MAX_RATE = float(os.getenv("EMAIL_ASSISTANT_HEDGE_MAX_RATE", "0.05"))
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_WINDOW = 500
+DEFAULT_WORKERS = int(os.getenv("EMAIL_ASSISTANT_HEDGE_WORKERS", "16"))
+
+
+def hedge_tokens(messages: list, response=None) -> int:
+    """Tokens spent on a discarded request: reported usage, else an estimate.
+
+    Without a response (cancelled in flight) only the prompt is counted.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return usage["total_tokens"]
+    tokens = sum(estimate_tokens(str(m["content"] if isinstance(m, dict) else m.content)) for m in messages)
+    if response is not None:
+        tokens += estimate_tokens(str(getattr(response, "content", response)))
+    return tokens
+
+
+def _start_thread(fn) -> Future:
+    """Run ``fn()`` on a new daemon thread, in a copy of the current context."""
+    future = Future()
+    context = contextvars.copy_context()
+
+    def run():
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(context.run(fn))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="hedged-primary", daemon=True).start()
+    return future
+
+
+class HedgingPolicy:
+    """Per-call-site latency windows, hedge admission and hedge accounting."""
+
+    def __init__(
+        self,
+        percentile: float = DEFAULT_PERCENTILE,
+        max_rate: float = DEFAULT_MAX_RATE,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        window: int = DEFAULT_WINDOW,
+        agent: bool = False,
+    ):
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+        self.window = window
+        self.agent = agent
+        self._latencies = {}
+        self._counters = {}
+        self._extra_tokens = Counter()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(DEFAULT_WORKERS, thread_name_prefix="hedged-request")
+            return self._executor
+
+    def observe(self, name: str, seconds: float):
+        """Record the latency of one (unhedged) request of a call site."""
+        with self._lock:
+            self._latencies.setdefault(name, deque(maxlen=self.window)).append(seconds)
+
+    def hedge_delay(self, name: str):
+        """Return how long to wait before hedging, or None while there are too few samples."""
+        with self._lock:
+            samples = sorted(self._latencies.get(name, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(self.percentile * len(samples)))]
+
+    def _count(self, name: str, key: str):
+        with self._lock:
+            self._counters.setdefault(name, Counter())[key] += 1
+
+    def _may_hedge(self, name: str) -> bool:
+        """Whether a hedge would be admitted now, without taking it."""
+        with self._lock:
+            counters = self._counters.setdefault(name, Counter())
+            return counters["hedges"] + 1 <= self.max_rate * counters["calls"]
+
+    def _admit_hedge(self, name: str) -> bool:
+        """Take a hedge if it keeps the call site under ``max_rate``."""
+        with self._lock:
+            counters = self._counters.setdefault(name, Counter())
+            if counters["hedges"] + 1 > self.max_rate * counters["calls"]:
+                return False
+            counters["hedges"] += 1
+            return True
+
+    def _record_winner(self, name: str, winner: str):
+        self._count(name, f"{winner}_wins")
+        registry = get_metrics()
+        if registry is not None:
+            registry.inc("email_assistant_hedged_calls", call=name, winner=winner)
+
+    def _record_extra_tokens(self, name: str, tokens: int):
+        with self._lock:
+            self._extra_tokens[name] += tokens
+        registry = get_metrics()
+        if registry is not None:
+            registry.inc("email_assistant_hedge_extra_tokens", tokens, call=name)
+
+    def _timed(self, name: str, fn):
+        """Wrap ``fn`` so its latency feeds the call site's window."""
+        def run():
+            start = time.perf_counter()
+            result = fn()
+            self.observe(name, time.perf_counter() - start)
+            return result
+        return run
+
+    def call(self, name: str, fn, messages: list):
+        """Call ``fn()`` and hedge it with a second ``fn()`` if it is slow.
+
+        Args:
+            name: The call site, which has its own latency window and hedge budget.
+            fn: Sends the request; must be safe to run twice concurrently.
+            messages: The request, used to estimate the tokens of a discarded reply.
+
+        Returns:
+            The first successful reply.
+        """
+        self._count(name, "calls")
+        delay = self.hedge_delay(name)
+        if delay is None or not self._may_hedge(name):
+            # Nothing to hedge: the request runs on the caller's thread
+            return self._timed(name, fn)()
+
+        # The primary gets its own thread rather than a pool worker, so the pool
+        # only ever holds hedges and never caps how many requests are in flight
+        primary = _start_thread(self._timed(name, fn))
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._admit_hedge(name):
+            return primary.result()
+
+        # Copy the context so callbacks (tracing, accounting) see the hedge
+        hedge = self._get_executor().submit(contextvars.copy_context().run, fn)
+        pending = [primary, hedge]
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            # Prefer the primary when both finished in the same instant
+            for future in (f for f in (primary, hedge) if f in done):
+                pending.remove(future)
+                if future.exception() is None:
+                    loser = hedge if future is primary else primary
+                    self._record_winner(name, "primary" if future is primary else "hedge")
+                    loser.add_done_callback(
+                        lambda f: self._record_extra_tokens(
+                            name, 0 if f.exception() else hedge_tokens(messages, f.result())
+                        )
+                    )
+                    return future.result()
+        return primary.result()
+
+    async def acall(self, name: str, fn, messages: list):
+        """Async variant of ``call``; ``fn()`` returns an awaitable. The losing request is cancelled."""
+        self._count(name, "calls")
+        delay = self.hedge_delay(name)
+
+        async def timed():
+            start = time.perf_counter()
+            result = await fn()
+            self.observe(name, time.perf_counter() - start)
+            return result
+
+        if delay is None:
+            return await timed()
+
+        primary = asyncio.create_task(timed())
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not self._admit_hedge(name):
+            return await primary
+
+        hedge = asyncio.create_task(fn())
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in (t for t in (primary, hedge) if t in done):
+                    if task.exception() is None:
+                        loser = hedge if task is primary else primary
+                        self._record_winner(name, "primary" if task is primary else "hedge")
+                        if loser.done() and loser.exception() is None:
+                            self._record_extra_tokens(name, hedge_tokens(messages, loser.result()))
+                        elif not loser.done():
+                            # Cancelled in flight: the prompt was most likely already sent
+                            loser.cancel()
+                            self._record_extra_tokens(name, hedge_tokens(messages))
+                        return task.result()
+            return primary.result()
+        except BaseException:
+            primary.cancel()
+            hedge.cancel()
+            raise
+
+    def stats(self) -> dict:
+        """Return per call site: calls, hedges, hedge rate, winners, extra tokens and the hedge delay."""
+        with self._lock:
+            names = set(self._counters) | set(self._latencies)
+            counters = {name: Counter(self._counters.get(name, ())) for name in names}
+            extra = Counter(self._extra_tokens)
+        stats = {}
+        for name in sorted(names):
+            calls, hedges = counters[name]["calls"], counters[name]["hedges"]
+            stats[name] = {
+                "calls": calls,
+                "hedges": hedges,
+                "hedge_rate": hedges / calls if calls else 0.0,
+                "primary_wins": counters[name]["primary_wins"],
+                "hedge_wins": counters[name]["hedge_wins"],
+                "extra_tokens": extra[name],
+                "hedge_delay": self.hedge_delay(name),
+            }
+        return stats
+
+
+_hedging_policy = None
+_hedging_policy_configured = False
+_hedging_policy_lock = threading.Lock()
+
+
+def create_hedging_policy(spec: str, agent: bool = False):
+    """Create a policy from a spec string.
+
+    Args:
+        spec: "on" or "off".
+        agent: Whether read-only agent steps are hedged too.
+
+    Returns:
+        The policy, or None when hedging is off.
+    """
+    if spec in ("", "off", "none"):
+        return None
+    if spec == "on":
+        return HedgingPolicy(agent=agent)
+    raise ValueError(f"Unknown hedging policy: {spec!r}")
+
+
+def get_hedging_policy():
+    """Get the process-wide hedging policy, created from the environment on first use."""
+    global _hedging_policy, _hedging_policy_configured
+    if not _hedging_policy_configured:
+        with _hedging_policy_lock:
+            if not _hedging_policy_configured:
+                _hedging_policy = create_hedging_policy(
+                    os.getenv("EMAIL_ASSISTANT_HEDGING", "off"), os.getenv("EMAIL_ASSISTANT_HEDGE_AGENT", "off") == "on"
+                )
+                _hedging_policy_configured = True
+    return _hedging_policy
+
+
+def set_hedging_policy(policy):
+    """Replace the process-wide hedging policy (None disables hedging)."""
+    global _hedging_policy, _hedging_policy_configured
+    with _hedging_policy_lock:
+        _hedging_policy = policy
+        _hedging_policy_configured = True
@@ -0,0 +1,373 @@
+"""Hot-path latency metrics exposed in the OpenMetrics text format.
+
+``MetricsCallbackHandler`` is attached to the compiled graph and times every
+run from the callback events LangGraph already emits, so the nodes carry no
+instrumentation of their own. Latency is reported separately for:
+
+    - ``email_assistant_email_seconds``: a whole graph run (one email, or one
+      leg of it between HITL interrupts).
+    - ``email_assistant_node_seconds``: each node.
+    - ``email_assistant_model_seconds``: model calls, per node and model.
+    - ``email_assistant_tool_seconds``: tool calls.
+    - ``email_assistant_graph_overhead_seconds``: run time spent outside the
+      nodes (scheduling, state merging, checkpointing).
+    - ``email_assistant_human_wait_seconds``: time a thread waited at a HITL
+      interrupt before it was resumed.
+
+Counters cover classifications and tool calls, and gauges hold the emails and
+nodes in flight. The model rate limiter adds its admission wait, 429 count and
+current concurrency limit, and request hedging its winners and extra tokens.
+
+Both graphs record into the one process-wide registry, labelled by ``graph``.
+``start_metrics_server`` serves it over HTTP and ``start_metrics_dump`` writes
+it to a file periodically. Neither runs unless started, either in code or
+from the environment when the registry is first used:
+``EMAIL_ASSISTANT_METRICS_PORT`` serves it on that port (on
+``EMAIL_ASSISTANT_METRICS_HOST``, 127.0.0.1 by default) and
+``EMAIL_ASSISTANT_METRICS_FILE`` dumps it to that file, which is how to
+export it from ``langgraph dev``. ``EMAIL_ASSISTANT_METRICS=off`` disables
+collection.
+"""
+
+import os
+import threading
+import time
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langgraph.errors import GraphInterrupt
+
+# Upper bounds in seconds; model calls dominate, so the range reaches a minute
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DEFAULT_DUMP_SECONDS = float(os.getenv("EMAIL_ASSISTANT_METRICS_DUMP_SECONDS", "15"))
+MAX_WAITING_THREADS = 100000
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+METRICS = {
+    "email_assistant_email_seconds": ("histogram", "Duration of a graph run"),
+    "email_assistant_node_seconds": ("histogram", "Duration of a graph node"),
+    "email_assistant_model_seconds": ("histogram", "Duration of a model call"),
+    "email_assistant_tool_seconds": ("histogram", "Duration of a tool call"),
+    "email_assistant_graph_overhead_seconds": ("histogram", "Run time spent outside the nodes"),
+    "email_assistant_human_wait_seconds": ("histogram", "Time a thread waited at a HITL interrupt"),
+    "email_assistant_classifications": ("counter", "Triage decisions by classification"),
+    "email_assistant_tool_calls": ("counter", "Tool calls by tool and status"),
+    "email_assistant_emails_in_flight": ("gauge", "Graph runs in progress"),
+    "email_assistant_nodes_in_flight": ("gauge", "Node runs in progress"),
+    "email_assistant_rate_limit_wait_seconds": ("histogram", "Time a model call waited for rate-limit admission"),
+    "email_assistant_rate_limited": ("counter", "Model calls rejected with HTTP 429"),
+    "email_assistant_concurrency_limit": ("gauge", "Adaptive limit on model calls in flight"),
+    "email_assistant_hedged_calls": ("counter", "Hedged model calls by call site and winning request"),
+    "email_assistant_hedge_extra_tokens": ("counter", "Tokens spent on discarded hedged requests"),
+}
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsRegistry:
+    """Lock-protected counters, gauges and fixed-bucket histograms."""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._values = {name: {} for name in METRICS}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Increase a counter."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0) + value
+
+    def add(self, name: str, delta: float, **labels):
+        """Move a gauge up or down."""
+        self.inc(name, delta, **labels)
+
+    def set(self, name: str, value: float, **labels):
+        """Set a gauge."""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[name][key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record one histogram sample in seconds."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._values[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][index] += 1
+                    break
+            histogram[1] += value
+            histogram[2] += 1
+
+    def snapshot(self) -> dict:
+        """Return counters and gauges as values, histograms as {count, sum}."""
+        with self._lock:
+            return {
+                name: {
+                    key: {"count": value[2], "sum": value[1]} if METRICS[name][0] == "histogram" else value
+                    for key, value in series.items()
+                }
+                for name, series in self._values.items()
+                if series
+            }
+
+    def render(self) -> str:
+        """Render every metric in the OpenMetrics text format."""
+        with self._lock:
+            values = {name: {key: _copy(value) for key, value in series.items()} for name, series in self._values.items()}
+        lines = []
+        for name, (kind, description) in METRICS.items():
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"# HELP {name} {description}")
+            if kind == "histogram":
+                lines.append(f"# UNIT {name} seconds")
+            for key, value in sorted(values[name].items()):
+                if kind == "counter":
+                    lines.append(f"{name}_total{_format_labels(key)} {value}")
+                elif kind == "gauge":
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+                else:
+                    counts, total, count = value
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets, counts):
+                        cumulative += bucket_count
+                        le = f'le="{bound}"'
+                        lines.append(f"{name}_bucket{_format_labels(key, le)} {cumulative}")
+                    le = 'le="+Inf"'
+                    lines.append(f"{name}_bucket{_format_labels(key, le)} {count}")
+                    lines.append(f"{name}_count{_format_labels(key)} {count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {total}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _copy(value):
+    return [list(value[0]), value[1], value[2]] if isinstance(value, list) else value
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Times graph runs, nodes, model calls and tool calls into the registry.
+
+    Args:
+        graph: Value of the ``graph`` label on every series.
+    """
+
+    run_inline = True
+
+    def __init__(self, graph: str):
+        self.graph = graph
+        self._runs = {}  # run_id -> (kind, start, labels, parent_run_id, thread_id)
+        self._node_time = {}  # root run_id -> seconds spent in its nodes
+        self._waiting = {}  # thread_id -> monotonic time the thread was interrupted
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, kind: str, labels: dict, parent_run_id=None, thread_id=None):
+        self._runs[run_id] = (kind, time.perf_counter(), labels, parent_run_id, thread_id)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        registry = get_metrics()
+        if registry is None:
+            return
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        if parent_run_id is None:
+            thread_id = metadata.get("thread_id")
+            with self._lock:
+                self._node_time[run_id] = 0.0
+                waited_since = self._waiting.pop(thread_id, None) if thread_id is not None else None
+            if waited_since is not None:
+                registry.observe("email_assistant_human_wait_seconds", time.monotonic() - waited_since, graph=self.graph)
+            registry.add("email_assistant_emails_in_flight", 1, graph=self.graph)
+            self._start(run_id, "email", {"graph": self.graph}, thread_id=thread_id)
+        elif node is not None and node == kwargs.get("name"):
+            labels = {"graph": self.graph, "node": node}
+            registry.add("email_assistant_nodes_in_flight", 1, **labels)
+            self._start(run_id, "node", labels, parent_run_id, metadata.get("thread_id"))
+
+    def _end_chain(self, run_id, outputs=None, error=None):
+        run = self._runs.pop(run_id, None)
+        registry = get_metrics()
+        if run is None or registry is None:
+            return
+        kind, start, labels, parent_run_id, thread_id = run
+        seconds = time.perf_counter() - start
+        if kind == "node":
+            registry.add("email_assistant_nodes_in_flight", -1, **labels)
+            registry.observe("email_assistant_node_seconds", seconds, **labels)
+            with self._lock:
+                if parent_run_id in self._node_time:
+                    self._node_time[parent_run_id] += seconds
+                if isinstance(error, GraphInterrupt) and thread_id is not None:
+                    self._waiting[thread_id] = time.monotonic()
+                    while len(self._waiting) > MAX_WAITING_THREADS:
+                        self._waiting.pop(next(iter(self._waiting)))
+            if isinstance(outputs, dict) and outputs.get("classification_decision"):
+                registry.inc(
+                    "email_assistant_classifications", graph=self.graph, classification=outputs["classification_decision"]
+                )
+        else:
+            registry.add("email_assistant_emails_in_flight", -1, **labels)
+            registry.observe("email_assistant_email_seconds", seconds, **labels)
+            with self._lock:
+                node_seconds = self._node_time.pop(run_id, 0.0)
+            registry.observe("email_assistant_graph_overhead_seconds", max(seconds - node_seconds, 0.0), **labels)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end_chain(run_id, outputs=outputs)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end_chain(run_id, error=error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        metadata = metadata or {}
+        labels = {"graph": self.graph, "node": metadata.get("langgraph_node", ""), "model": metadata.get("ls_model_name", "")}
+        self._start(run_id, "model", labels)
+
+    def _end_model(self, run_id):
+        run = self._runs.pop(run_id, None)
+        registry = get_metrics()
+        if run is not None and registry is not None:
+            registry.observe("email_assistant_model_seconds", time.perf_counter() - run[1], **run[2])
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end_model(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end_model(run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id, "tool", {"graph": self.graph, "tool": kwargs.get("name") or (serialized or {}).get("name", "")})
+
+    def _end_tool(self, run_id, status: str):
+        run = self._runs.pop(run_id, None)
+        registry = get_metrics()
+        if run is not None and registry is not None:
+            registry.observe("email_assistant_tool_seconds", time.perf_counter() - run[1], **run[2])
+            registry.inc("email_assistant_tool_calls", status=status, **run[2])
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end_tool(run_id, "ok")
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end_tool(run_id, "error")
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1", registry=None) -> ThreadingHTTPServer:
+    """Serve the registry at ``http://host:port/metrics`` from a daemon thread.
+
+    Returns:
+        The server; call ``shutdown()`` to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = (registry or get_metrics() or MetricsRegistry()).render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def write_metrics(path: str, registry=None):
+    """Write the registry to a file atomically."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write((registry or get_metrics() or MetricsRegistry()).render())
+    os.replace(tmp_path, path)
+
+
+def start_metrics_dump(path: str, interval_s: float = DEFAULT_DUMP_SECONDS, registry=None) -> threading.Event:
+    """Write the registry to ``path`` every ``interval_s`` seconds from a daemon thread.
+
+    Returns:
+        An event; set it to stop dumping (``write_metrics`` writes a final dump).
+    """
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval_s):
+            write_metrics(path, registry)
+
+    threading.Thread(target=run, name="metrics-dump", daemon=True).start()
+    return stop
+
+
+def start_metrics_exporters():
+    """Start the exporters configured in the environment.
+
+    They export whichever registry is current, so ``set_metrics`` does not
+    orphan them. A port that cannot be bound is reported as a warning: a
+    busy port should not fail the graph run that happened to configure it.
+
+    Returns:
+        Tuple of (server or None, dump stop event or None).
+    """
+    server = dump = None
+    port = os.getenv("EMAIL_ASSISTANT_METRICS_PORT")
+    if port:
+        try:
+            server = start_metrics_server(int(port), os.getenv("EMAIL_ASSISTANT_METRICS_HOST", "127.0.0.1"))
+        except OSError as e:
+            warnings.warn(f"Metrics server not started on port {port}: {e}")
+    path = os.getenv("EMAIL_ASSISTANT_METRICS_FILE")
+    if path:
+        dump = start_metrics_dump(path)
+    return server, dump
+
+
+_metrics = None
+_metrics_configured = False
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """Get the process-wide metrics registry, created from the environment on first use."""
+    global _metrics, _metrics_configured
+    if not _metrics_configured:
+        with _metrics_lock:
+            if not _metrics_configured:
+                spec = os.getenv("EMAIL_ASSISTANT_METRICS", "on")
+                _metrics = None if spec in ("", "off", "none") else MetricsRegistry()
+                _metrics_configured = True
+                if _metrics is not None:
+                    start_metrics_exporters()
+    return _metrics
+
+
+def set_metrics(registry):
+    """Replace the process-wide metrics registry (None disables collection)."""
+    global _metrics, _metrics_configured
+    with _metrics_lock:
+        _metrics = registry
+        _metrics_configured = True
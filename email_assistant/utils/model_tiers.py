@@ -0,0 +1,194 @@
+"""Complexity-based model tiers for the agent loop.
+
+A one-line "can you confirm Thursday?" does not need the model a multi-party
+reschedule does. ``TierSelector`` scores each email from cheap features
+(thread length, questions asked, attendees, scheduling terms in the triage
+reasoning) and starts it one tier up for every threshold the score
+reaches. During the loop it escalates one tier for every
+``escalate_after_tool_errors`` failed tool calls.
+
+Tiering is off by default (the agent keeps its single model).
+``EMAIL_ASSISTANT_MODEL_TIERS`` selects ``default`` (gpt-4o-mini, then
+gpt-4o from a score of 2.5) or a JSON file with any of ``models``,
+``thresholds``, ``weights`` and ``escalate_after_tool_errors``.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import Counter
+from email.utils import getaddresses
+
+DEFAULT_MODELS = ("gpt-4o-mini", "gpt-4o")
+# Score at which each tier after the first starts
+DEFAULT_THRESHOLDS = (2.5,)
+DEFAULT_WEIGHTS = {
+    "thread_words": 1 / 150,
+    "questions": 0.5,
+    "attendees": 0.75,
+    "reasoning_terms": 0.5,
+}
+DEFAULT_ESCALATE_AFTER_TOOL_ERRORS = 1
+# Triage reasoning terms that point at multi-step calendar or search work
+COMPLEX_TERMS = re.compile(
+    r"\b(reschedul\w*|schedul\w*|meeting|availability|calendar|conflict\w*|multiple|several|attendees|deadline)\b",
+    re.IGNORECASE,
+)
+
+
+def email_features(email: tuple, reasoning: str = "") -> dict:
+    """Extract the complexity features of a parsed email.
+
+    Args:
+        email: The (author, to, subject, email_thread) tuple from parse_email.
+        reasoning: The triage router's reasoning, if any.
+
+    Returns:
+        Feature name to value; attendees beyond the sender and one recipient
+        are counted, so a plain one-to-one email scores zero for them.
+    """
+    author, to, subject, email_thread = email
+    addresses = {address.lower() for _, address in getaddresses([author or "", to or ""]) if address}
+    return {
+        "thread_words": len((email_thread or "").split()),
+        "questions": (email_thread or "").count("?"),
+        "attendees": max(len(addresses) - 2, 0),
+        "reasoning_terms": len(COMPLEX_TERMS.findall(reasoning or "")),
+    }
+
+
+def tool_errors(messages: list) -> int:
+    """Count the failed tool calls in a conversation.
+
+    Both graphs mark a failed call with ``status="error"``: ``ToolNode`` for
+    the agent graph, and the HITL action handler for tools it runs.
+    """
+    return sum(1 for m in messages if getattr(m, "type", None) == "tool" and getattr(m, "status", None) == "error")
+
+
+class TierSelector:
+    """Per-email model tier policy with per-tier usage, latency and escalation stats."""
+
+    def __init__(
+        self,
+        models: tuple = DEFAULT_MODELS,
+        thresholds: tuple = DEFAULT_THRESHOLDS,
+        weights: dict = None,
+        escalate_after_tool_errors: int = DEFAULT_ESCALATE_AFTER_TOOL_ERRORS,
+    ):
+        if len(thresholds) != len(models) - 1:
+            raise ValueError("Expected one threshold per model after the first")
+        self.models = tuple(models)
+        self.thresholds = tuple(thresholds)
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.escalate_after_tool_errors = escalate_after_tool_errors
+        self._counters = {model: Counter() for model in self.models}
+        self._seconds = Counter()
+        self._lock = threading.Lock()
+
+    def score(self, features: dict) -> float:
+        """Weighted sum of the features."""
+        return sum(self.weights.get(name, 0.0) * value for name, value in features.items())
+
+    def select(self, email: tuple, reasoning: str = "") -> int:
+        """Pick the starting tier of an email and count it."""
+        score = self.score(email_features(email, reasoning))
+        tier = sum(score >= threshold for threshold in self.thresholds)
+        with self._lock:
+            self._counters[self.models[tier]]["emails"] += 1
+        return tier
+
+    def escalate(self, model_tier: dict, errors: int) -> dict:
+        """Return the email's tier for its next step given the tool failures so far.
+
+        Args:
+            model_tier: {"initial": tier, "tier": tier} as kept in state.
+            errors: Failed tool calls so far in the conversation.
+
+        Returns:
+            The updated {"initial", "tier"}; tiers only move up.
+        """
+        target = model_tier["tier"]
+        if self.escalate_after_tool_errors > 0:
+            target = max(target, model_tier["initial"] + errors // self.escalate_after_tool_errors)
+        target = min(target, len(self.models) - 1)
+        if target > model_tier["tier"]:
+            with self._lock:
+                # Rates are per starting tier: did emails that started here need more?
+                if model_tier["tier"] == model_tier["initial"]:
+                    self._counters[self.models[model_tier["initial"]]]["escalated_emails"] += 1
+                self._counters[self.models[model_tier["tier"]]]["escalations"] += 1
+        return {"initial": model_tier["initial"], "tier": target}
+
+    def record_call(self, tier: int, tokens: int, seconds: float):
+        """Record one agent model call made at a tier."""
+        model = self.models[tier]
+        with self._lock:
+            self._counters[model]["calls"] += 1
+            self._counters[model]["tokens"] += tokens
+            self._seconds[model] += seconds
+
+    def stats(self) -> dict:
+        """Return per model: emails started, calls, tokens, mean latency and escalation rate."""
+        with self._lock:
+            counters = {model: Counter(c) for model, c in self._counters.items()}
+            seconds = Counter(self._seconds)
+        stats = {}
+        for model, c in counters.items():
+            stats[model] = {
+                "emails": c["emails"],
+                "calls": c["calls"],
+                "tokens": c["tokens"],
+                "mean_latency_s": seconds[model] / c["calls"] if c["calls"] else 0.0,
+                "escalations": c["escalations"],
+                "escalation_rate": c["escalated_emails"] / c["emails"] if c["emails"] else 0.0,
+            }
+        return stats
+
+
+_tier_selector = None
+_tier_selector_configured = False
+_tier_selector_lock = threading.Lock()
+
+
+def create_tier_selector(spec: str):
+    """Create a selector from a spec string.
+
+    Args:
+        spec: "off", "default" or the path of a JSON tier policy.
+
+    Returns:
+        The selector, or None when tiering is off.
+    """
+    if spec in ("", "off", "none"):
+        return None
+    if spec == "default":
+        return TierSelector()
+    with open(spec) as f:
+        policy = json.load(f)
+    return TierSelector(
+        models=tuple(policy.get("models", DEFAULT_MODELS)),
+        thresholds=tuple(policy.get("thresholds", DEFAULT_THRESHOLDS)),
+        weights=policy.get("weights"),
+        escalate_after_tool_errors=policy.get("escalate_after_tool_errors", DEFAULT_ESCALATE_AFTER_TOOL_ERRORS),
+    )
+
+
+def get_tier_selector():
+    """Get the process-wide tier selector, created from the environment on first use."""
+    global _tier_selector, _tier_selector_configured
+    if not _tier_selector_configured:
+        with _tier_selector_lock:
+            if not _tier_selector_configured:
+                _tier_selector = create_tier_selector(os.getenv("EMAIL_ASSISTANT_MODEL_TIERS", "off"))
+                _tier_selector_configured = True
+    return _tier_selector
+
+
+def set_tier_selector(selector):
+    """Replace the process-wide tier selector (None keeps the agent on its single model)."""
+    global _tier_selector, _tier_selector_configured
+    with _tier_selector_lock:
+        _tier_selector = selector
+        _tier_selector_configured = True
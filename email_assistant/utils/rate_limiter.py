@@ -0,0 +1,424 @@
+"""Client-side rate limiting and adaptive concurrency for model calls.
+
+When many emails run at once, independent per-client retries turn one 429
+into a retry storm. Every router and agent model call therefore goes through
+one ``ModelRateLimiter``, which:
+
+    - budgets requests and estimated tokens per minute with token buckets,
+      kept in memory or in a SQLite file shared by every worker on the host;
+    - caps calls in flight with an AIMD limit: it grows by about one slot per
+      window of fast successes and halves on a 429 or a slow response;
+    - owns retries: model clients are built with ``max_retries=0``, and a
+      transient failure (429, 408/409, 5xx, timeout or connection error)
+      pauses every caller until a shared backoff deadline (``Retry-After``
+      when the API sends one) instead of each call retrying on its own.
+
+With the limiter off, ``RateLimitedRunnable`` retries transient failures of
+each call itself, as the OpenAI SDK would. The choice is made per call, so
+replacing the limiter also changes the retry policy of cached clients.
+
+Time spent waiting for admission is reported to the metrics registry.
+
+``EMAIL_ASSISTANT_RATE_LIMIT`` selects ``memory`` (default), ``sqlite:<path>``
+or ``off``. Limits come from ``EMAIL_ASSISTANT_RPM`` (500),
+``EMAIL_ASSISTANT_TPM`` (200000), ``EMAIL_ASSISTANT_MAX_CONCURRENCY`` (32)
+and ``EMAIL_ASSISTANT_LATENCY_TARGET_SECONDS`` (20).
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+
+import httpx
+from langchain_core.runnables import Runnable
+from openai import APIConnectionError
+
+from email_assistant.helpers.tokens import estimate_tokens
+from email_assistant.utils.metrics import get_metrics
+
+DEFAULT_RPM = float(os.getenv("EMAIL_ASSISTANT_RPM", "500"))
+DEFAULT_TPM = float(os.getenv("EMAIL_ASSISTANT_TPM", "200000"))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("EMAIL_ASSISTANT_MAX_CONCURRENCY", "32"))
+DEFAULT_LATENCY_TARGET = float(os.getenv("EMAIL_ASSISTANT_LATENCY_TARGET_SECONDS", "20"))
+DEFAULT_MAX_RETRIES = 6
+# Retries of a call made while the limiter is off (the OpenAI SDK default)
+UNLIMITED_MAX_RETRIES = 2
+# Expected completion size added to the prompt estimate when budgeting tokens
+DEFAULT_OUTPUT_TOKENS = 256
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+
+def is_rate_limit_error(error) -> bool:
+    """Whether an exception is an HTTP 429 from the model API (or a fake of it)."""
+    return getattr(error, "status_code", None) == 429
+
+
+def is_transient_error(error) -> bool:
+    """Whether a failed call is worth retrying: the errors the OpenAI SDK retries itself.
+
+    That is HTTP 408, 409, 429 and 5xx, timeouts and connection errors
+    (``APITimeoutError`` is an ``APIConnectionError``).
+    """
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 409, 429) or status >= 500
+    return isinstance(error, (APIConnectionError, httpx.TransportError, TimeoutError, ConnectionError))
+
+
+def retry_after_seconds(error):
+    """Return the ``Retry-After`` delay of a 429 response, or None."""
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _retry_delay(error, attempt: int) -> float:
+    """Backoff before retry ``attempt``: ``Retry-After`` when sent, else jittered exponential."""
+    delay = retry_after_seconds(error)
+    if delay is None:
+        delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt) * random.uniform(0.5, 1.0)
+    return delay
+
+
+def estimate_request_tokens(model_input) -> int:
+    """Estimate the tokens a call will use: the prompt plus a typical completion."""
+    if isinstance(model_input, str):
+        text = model_input
+    else:
+        text = "".join(str(m["content"] if isinstance(m, dict) else getattr(m, "content", m)) for m in model_input)
+    return estimate_tokens(text) + DEFAULT_OUTPUT_TOKENS
+
+
+class TokenBucket:
+    """In-process bucket refilled continuously at ``per_minute`` units per minute."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self._available = per_minute
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` units now and return how long the caller must wait for them."""
+        with self._lock:
+            now = time.monotonic()
+            rate = self.per_minute / 60
+            self._available = min(self.per_minute, self._available + (now - self._updated) * rate)
+            self._updated = now
+            self._available -= amount
+            return max(0.0, -self._available / rate)
+
+
+class SQLiteTokenBucket:
+    """Token bucket whose state lives in a SQLite file shared across processes."""
+
+    def __init__(self, path: str, name: str, per_minute: float):
+        self.name = name
+        self.per_minute = per_minute
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets (name TEXT PRIMARY KEY, available REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` units now and return how long the caller must wait for them."""
+        rate = self.per_minute / 60
+        with self._lock:
+            # BEGIN IMMEDIATE serializes the read-modify-write across processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT available, updated FROM rate_buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                available, updated = row if row is not None else (self.per_minute, now)
+                available = min(self.per_minute, available + (now - updated) * rate) - amount
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (name, available, updated) VALUES (?, ?, ?)",
+                    (self.name, available, now),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return max(0.0, -available / rate)
+
+
+class ModelRateLimiter:
+    """Admission control for model calls: token buckets, AIMD concurrency and shared backoff."""
+
+    def __init__(
+        self,
+        requests_bucket=None,
+        tokens_bucket=None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        latency_target: float = DEFAULT_LATENCY_TARGET,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        decrease_factor: float = 0.5,
+    ):
+        self.requests_bucket = requests_bucket or TokenBucket(DEFAULT_RPM)
+        self.tokens_bucket = tokens_bucket or TokenBucket(DEFAULT_TPM)
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.max_retries = max_retries
+        self.decrease_factor = decrease_factor
+        self.limit = float(max_concurrency)
+        self.calls = 0
+        self.throttled = 0
+        self.retried = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._in_flight = 0
+        self._backoff_until = 0.0
+        self._lock = threading.Lock()
+        self._slot_free = threading.Condition(self._lock)
+        self._async_waiters = []
+
+    # Admission
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserve budget for one call and return the delay before it may start."""
+        delay = max(self.requests_bucket.reserve(1), self.tokens_bucket.reserve(tokens))
+        with self._lock:
+            return max(delay, self._backoff_until - time.monotonic())
+
+    def _try_take_slot(self) -> bool:
+        """Take a concurrency slot if one is free. Caller holds the lock."""
+        if self._in_flight < max(1, int(self.limit)):
+            self._in_flight += 1
+            return True
+        return False
+
+    def _acquire_slot(self):
+        with self._lock:
+            while not self._try_take_slot():
+                self._slot_free.wait()
+
+    async def _aacquire_slot(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._try_take_slot():
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def _release_slot(self):
+        with self._lock:
+            self._in_flight -= 1
+            waiters, self._async_waiters = self._async_waiters, []
+            self._slot_free.notify_all()
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+    def _record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+        registry = get_metrics()
+        if registry is not None:
+            registry.observe("email_assistant_rate_limit_wait_seconds", seconds)
+
+    # Feedback
+
+    def _on_success(self, latency: float):
+        with self._lock:
+            self.calls += 1
+            if latency > self.latency_target:
+                self.limit = max(1.0, self.limit * self.decrease_factor)
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            limit = self.limit
+        self._report_limit(limit)
+
+    def _on_transient_error(self, error, attempt: int) -> float:
+        """Shrink the limit and push back the shared backoff deadline; return the delay.
+
+        Overload shows up as 5xx and timeouts as often as 429s, so every
+        transient failure backs off every caller, not only the one that failed.
+        """
+        delay = _retry_delay(error, attempt)
+        rate_limited = is_rate_limit_error(error)
+        with self._lock:
+            if rate_limited:
+                self.throttled += 1
+            else:
+                self.retried += 1
+            self.limit = max(1.0, self.limit * self.decrease_factor)
+            self._backoff_until = max(self._backoff_until, time.monotonic() + delay)
+            limit = self.limit
+        registry = get_metrics()
+        if registry is not None and rate_limited:
+            registry.inc("email_assistant_rate_limited")
+        self._report_limit(limit)
+        return delay
+
+    def _report_limit(self, limit: float):
+        registry = get_metrics()
+        if registry is not None:
+            registry.set("email_assistant_concurrency_limit", limit)
+
+    # Calls
+
+    def call(self, fn, tokens: int):
+        """Run ``fn()`` once admitted, retrying transient failures under the shared backoff."""
+        for attempt in range(self.max_retries + 1):
+            start = time.monotonic()
+            delay = self._reserve(tokens)
+            if delay > 0:
+                time.sleep(delay)
+            self._acquire_slot()
+            self._record_wait(time.monotonic() - start)
+            started = time.monotonic()
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_transient_error(e) or attempt == self.max_retries:
+                    raise
+                self._on_transient_error(e, attempt)
+                continue
+            else:
+                self._on_success(time.monotonic() - started)
+                return result
+            finally:
+                self._release_slot()
+
+    async def acall(self, fn, tokens: int):
+        """Async variant of ``call``; ``fn()`` returns an awaitable."""
+        for attempt in range(self.max_retries + 1):
+            start = time.monotonic()
+            delay = self._reserve(tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._aacquire_slot()
+            self._record_wait(time.monotonic() - start)
+            started = time.monotonic()
+            try:
+                result = await fn()
+            except Exception as e:
+                if not is_transient_error(e) or attempt == self.max_retries:
+                    raise
+                self._on_transient_error(e, attempt)
+                continue
+            else:
+                self._on_success(time.monotonic() - started)
+                return result
+            finally:
+                self._release_slot()
+
+    def stats(self) -> dict:
+        """Return the current limit, throttled (429) and other retried calls, and admission wait times."""
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "retried": self.retried,
+                "wait_seconds": self.wait_seconds,
+                "max_wait_seconds": self.max_wait_seconds,
+            }
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class RateLimitedRunnable(Runnable):
+    """Routes ``invoke``/``ainvoke`` of a model runnable through the process-wide limiter.
+
+    Without a limiter the call retries its own transient failures, up to
+    ``UNLIMITED_MAX_RETRIES`` times. Other attributes are read from the
+    wrapped runnable.
+    """
+
+    def __init__(self, bound):
+        self.bound = bound
+
+    def __getattr__(self, name):
+        if name == "bound":
+            raise AttributeError(name)
+        return getattr(self.bound, name)
+
+    def invoke(self, input, config=None, **kwargs):
+        limiter = get_rate_limiter()
+        if limiter is not None:
+            return limiter.call(lambda: self.bound.invoke(input, config, **kwargs), estimate_request_tokens(input))
+        for attempt in range(UNLIMITED_MAX_RETRIES + 1):
+            try:
+                return self.bound.invoke(input, config, **kwargs)
+            except Exception as e:
+                if not is_transient_error(e) or attempt == UNLIMITED_MAX_RETRIES:
+                    raise
+                time.sleep(_retry_delay(e, attempt))
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        limiter = get_rate_limiter()
+        if limiter is not None:
+            return await limiter.acall(
+                lambda: self.bound.ainvoke(input, config, **kwargs), estimate_request_tokens(input)
+            )
+        for attempt in range(UNLIMITED_MAX_RETRIES + 1):
+            try:
+                return await self.bound.ainvoke(input, config, **kwargs)
+            except Exception as e:
+                if not is_transient_error(e) or attempt == UNLIMITED_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(_retry_delay(e, attempt))
+
+
+_rate_limiter = None
+_rate_limiter_configured = False
+_rate_limiter_lock = threading.Lock()
+
+
+def create_rate_limiter(spec: str):
+    """Create a limiter from a spec string.
+
+    Args:
+        spec: "memory", "sqlite:<path>" (buckets shared by every worker on
+            the host) or "off".
+
+    Returns:
+        The limiter, or None when rate limiting is off.
+    """
+    if spec in ("", "off", "none"):
+        return None
+    if spec == "memory":
+        return ModelRateLimiter()
+    if spec.startswith("sqlite:"):
+        path = spec[len("sqlite:"):]
+        return ModelRateLimiter(
+            SQLiteTokenBucket(path, "requests", DEFAULT_RPM), SQLiteTokenBucket(path, "tokens", DEFAULT_TPM)
+        )
+    raise ValueError(f"Unknown rate limiter: {spec!r}")
+
+
+def get_rate_limiter():
+    """Get the process-wide rate limiter, created from the environment on first use."""
+    global _rate_limiter, _rate_limiter_configured
+    if not _rate_limiter_configured:
+        with _rate_limiter_lock:
+            if not _rate_limiter_configured:
+                _rate_limiter = create_rate_limiter(os.getenv("EMAIL_ASSISTANT_RATE_LIMIT", "memory"))
+                _rate_limiter_configured = True
+    return _rate_limiter
+
+
+def set_rate_limiter(limiter):
+    """Replace the process-wide rate limiter (None sends calls straight through)."""
+    global _rate_limiter, _rate_limiter_configured
+    with _rate_limiter_lock:
+        _rate_limiter = limiter
+        _rate_limiter_configured = True
@@ -1,8 +1,14 @@
 """Router schema and LLM initialization for email triage."""
+import os
+import threading
+
+import httpx
 from langchain_openai import ChatOpenAI
 from typing import Literal
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+from email_assistant.utils.rate_limiter import RateLimitedRunnable
+from email_assistant.utils.cassette import CassetteRunnable, model_signature, offline_api_key
 from email_assistant.tools import (
     write_email,
     schedule_meeting,
@@ -26,6 +32,21 @@ class RouterSchema(BaseModel):
         "'notify' for important information that doesn't need a response, "
         "'respond' for emails that need a reply",
     )
+
+
+class BatchRouterItem(RouterSchema):
+    """Routing decision for one email of a batch."""
+
+    index: int = Field(description="The index of the email this decision is for.")
+
+
+class BatchRouterSchema(BaseModel):
+    """Analyze each unread email of the batch and route it according to its content."""
+
+    results: list[BatchRouterItem] = Field(
+        description="Exactly one decision per email, in any order, identified by index."
+    )
+
     
 tools = [
     write_email,
@@ -36,6 +57,104 @@ tools = [
     update_event,
 ]
 
+# Model used for triage classification
+ROUTER_MODEL = "gpt-4o-mini"
+
+# Model of the agent loop when model tiers are off
+AGENT_MODEL = "gpt-4o-mini"
+
+# Limits of the keep-alive HTTP pool shared by every model client
+pool_limits = {
+    "max_connections": int(os.getenv("EMAIL_ASSISTANT_MAX_CONNECTIONS", "100")),
+    "max_keepalive_connections": int(os.getenv("EMAIL_ASSISTANT_MAX_KEEPALIVE_CONNECTIONS", "20")),
+    "keepalive_expiry": float(os.getenv("EMAIL_ASSISTANT_KEEPALIVE_EXPIRY", "30")),
+}
+
+# (model, schema, tool names, temperature, bind kwargs) -> bound runnable
+_llm_registry = {}
+_registry_lock = threading.Lock()
+_http_clients = None
+
+
+def configure_http_pool(**limits):
+    """Update the shared HTTP pool limits.
+
+    Clients handed out before the call keep their old pool; the registry is
+    cleared so later lookups build clients on a pool with the new limits.
+
+    Args:
+        **limits: Any of max_connections, max_keepalive_connections, keepalive_expiry.
+    """
+    global _http_clients
+    unknown = set(limits) - set(pool_limits)
+    if unknown:
+        raise ValueError(f"Unknown pool limits: {sorted(unknown)}")
+    with _registry_lock:
+        pool_limits.update(limits)
+        _http_clients = None
+        _llm_registry.clear()
+
+
+def _get_http_clients():
+    """Get the shared (sync, async) httpx clients. Caller holds the registry lock."""
+    global _http_clients
+    if _http_clients is None:
+        limits = httpx.Limits(**pool_limits)
+        _http_clients = (httpx.Client(limits=limits), httpx.AsyncClient(limits=limits))
+    return _http_clients
+
+
+def get_llm(model_name: str = "gpt-4o-mini", schema=None, tools=None, temperature=None, **bind_kwargs):
+    """Get a long-lived model runnable from the process-wide registry.
+
+    Runnables are built once per (model, schema, tool set, temperature) and
+    share one keep-alive HTTP connection pool, so repeated node invocations
+    skip client construction and schema conversion and reuse connections.
+    Calls go through the process-wide rate limiter, which also owns retries,
+    and are recorded or replayed when a cassette is active.
+    Safe to call from multiple threads.
+
+    Args:
+        model_name: Which OpenAI model to use.
+        schema: Optional Pydantic class for structured output.
+        tools: Optional list of tools to bind (keyed by tool name).
+        temperature: Optional sampling temperature.
+        **bind_kwargs: Extra arguments for bind_tools (e.g. tool_choice).
+
+    Returns:
+        The shared runnable for that configuration.
+    """
+    tool_names = tuple(tool.name for tool in tools) if tools else None
+    key = (model_name, schema, tool_names, temperature, tuple(sorted(bind_kwargs.items())))
+
+    llm = _llm_registry.get(key)
+    if llm is None:
+        with _registry_lock:
+            llm = _llm_registry.get(key)
+            if llm is None:
+                http_client, http_async_client = _get_http_clients()
+                llm = ChatOpenAI(
+                    model=model_name,
+                    temperature=temperature,
+                    api_key=offline_api_key(),
+                    http_client=http_client,
+                    http_async_client=http_async_client,
+                    # RateLimitedRunnable retries transient failures, per call
+                    max_retries=0,
+                )
+                if schema is not None:
+                    llm = llm.with_structured_output(schema)
+                elif tools:
+                    llm = llm.bind_tools(tools, **bind_kwargs)
+                llm = CassetteRunnable(
+                    RateLimitedRunnable(llm),
+                    model_signature(model_name, schema, tools, temperature, **bind_kwargs),
+                    schema,
+                )
+                _llm_registry[key] = llm
+    return llm
+
+
 def create_router(model_cls, model_name: str = "gpt-4o-mini"):
     """
     Wraps a ChatOpenAI model with structured output using the given Pydantic schema.
@@ -45,19 +164,19 @@ def create_router(model_cls, model_name: str = "gpt-4o-mini"):
         model_name: Which OpenAI model to use (default: gpt-4o-mini)
         
     Returns:
-        A ChatOpenAI instance that enforces the structured output.
+        A shared ChatOpenAI runnable that enforces the structured output.
     """
-    llm = ChatOpenAI(model=model_name)
-    return llm.with_structured_output(model_cls)
+    return get_llm(model_name, schema=model_cls)
 
 
 def get_llm_router():
     """Get the router LLM instance."""
-    return create_router(RouterSchema)
-
-def get_llm_router_with_tools(model_name: str = "gpt-4o-mini"):
-    """Get the router LLM instance with tools."""
-    llm = ChatOpenAI(model=model_name)
-    return llm.bind_tools(tools)
+    return create_router(RouterSchema, ROUTER_MODEL)
 
+def get_llm_batch_router():
+    """Get the router LLM instance that classifies several emails per call."""
+    return create_router(BatchRouterSchema, ROUTER_MODEL)
 
+def get_llm_router_with_tools(model_name: str = AGENT_MODEL):
+    """Get the router LLM instance with tools."""
+    return get_llm(model_name, tools=tools)
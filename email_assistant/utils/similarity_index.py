@@ -0,0 +1,282 @@
+"""Near-duplicate triage reuse with a local SimHash index.
+
+Many automated emails differ only by a timestamp, an order number or a
+recipient name, which defeats exact hashing. Each email is fingerprinted with
+a 64-bit SimHash over word n-grams of its subject and thread (digits are
+masked), computed locally without any embedding service. A new email whose
+fingerprint is within ``max_distance`` bits of a previously classified one,
+under the same prompt version, reuses that classification.
+
+Lookups do not scan the index. Fingerprints are split into ``max_distance + 1``
+bands (7 bands of 9 or 10 bits for the default distance of 6); two fingerprints within
+``max_distance`` bits agree exactly on at least one band, so only the entries
+sharing a band with the new email are compared.
+
+A sampled fraction of would-be reuses is still sent to the model and compared,
+which yields the disagreement rate next to the reuse rate.
+
+The index is off by default. ``EMAIL_ASSISTANT_SIMILARITY_INDEX`` enables it
+with ``memory`` or a file path (persisted as JSON).
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from collections import Counter, OrderedDict
+
+DEFAULT_MAX_DISTANCE = int(os.getenv("EMAIL_ASSISTANT_SIMILARITY_MAX_DISTANCE", "6"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("EMAIL_ASSISTANT_SIMILARITY_MAX_ENTRIES", "50000"))
+DEFAULT_AUDIT_RATE = float(os.getenv("EMAIL_ASSISTANT_SIMILARITY_AUDIT_RATE", "0.05"))
+
+# Only these decisions are reused; "respond" emails always reach the model
+DEFAULT_REUSE_CLASSIFICATIONS = ("ignore", "notify")
+
+_token = re.compile(r"[a-z]+|\d+")
+
+
+def _features(text: str, prefix: str) -> list:
+    """Word unigrams and bigrams with digit runs masked."""
+    words = ["#" if w.isdigit() else w for w in _token.findall((text or "").lower())]
+    return [prefix + w for w in words] + [f"{prefix}{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def simhash(subject: str, email_thread: str) -> int:
+    """Compute the 64-bit SimHash fingerprint of an email.
+
+    Args:
+        subject: Email subject line (weighted twice).
+        email_thread: Email content.
+
+    Returns:
+        The fingerprint as an int.
+    """
+    counts = Counter(_features(email_thread, "b:"))
+    for feature in _features(subject, "s:"):
+        counts[feature] += 2
+
+    weights = [0] * 64
+    for feature, weight in counts.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += weight if (h >> bit) & 1 else -weight
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def band_layout(max_distance: int) -> list:
+    """Split 64 bits into ``max_distance + 1`` near-equal bands.
+
+    Returns:
+        List of (shift, mask) pairs, one per band.
+    """
+    count = min(max(max_distance, 0) + 1, 64)
+    bounds = [64 * i // count for i in range(count + 1)]
+    return [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(bounds, bounds[1:])]
+
+
+class SimilarityIndex:
+    """Memory-bounded SimHash index of triage decisions.
+
+    Entries are bucketed by prompt version and SimHash band, and evicted
+    oldest-first once ``max_entries`` is reached. When ``path`` is set the index is loaded from
+    it and written back every ``save_every`` additions.
+    """
+
+    def __init__(
+        self,
+        max_distance: int = DEFAULT_MAX_DISTANCE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        audit_rate: float = DEFAULT_AUDIT_RATE,
+        reuse_classifications=DEFAULT_REUSE_CLASSIFICATIONS,
+        path: str = None,
+        save_every: int = 100,
+        seed: int = None,
+    ):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.audit_rate = audit_rate
+        self.reuse_classifications = tuple(reuse_classifications)
+        self.path = path
+        self.save_every = save_every
+        self.counters = Counter()
+        self._entries = OrderedDict()  # (prompt_version, fingerprint) -> result dict
+        self._bands = band_layout(max_distance)
+        self._buckets = {}  # prompt_version -> {(band, value): {fingerprint, ...}}
+        self._unsaved = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, email: tuple, prompt_version: str):
+        """Find a previously classified near-duplicate.
+
+        Args:
+            email: The (author, to, subject, email_thread) tuple from parse_email.
+            prompt_version: Only entries classified with this version match.
+
+        Returns:
+            Tuple of (result, audit). ``result`` is the neighbour's result dict
+            or None. When ``audit`` is True the caller must still classify the
+            email and report the outcome with ``record_audit``.
+        """
+        fingerprint = simhash(email[2], email[3])
+        with self._lock:
+            self.counters["lookups"] += 1
+            best = self._nearest(prompt_version, fingerprint)
+            if best is None:
+                return None, False
+            self.counters["matches"] += 1
+            if self._random.random() < self.audit_rate:
+                self.counters["audits"] += 1
+                return best, True
+            self.counters["reuses"] += 1
+            return best, False
+
+    def _band_keys(self, fingerprint: int):
+        return [(band, (fingerprint >> shift) & mask) for band, (shift, mask) in enumerate(self._bands)]
+
+    def _nearest(self, prompt_version: str, fingerprint: int):
+        """Result of the closest entry within ``max_distance`` bits, or None. Call with the lock held."""
+        buckets = self._buckets.get(prompt_version)
+        if not buckets:
+            return None
+        if (prompt_version, fingerprint) in self._entries:
+            return self._entries[(prompt_version, fingerprint)]
+        best, best_distance = None, self.max_distance + 1
+        seen = set()
+        for key in self._band_keys(fingerprint):
+            for candidate in buckets.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = (candidate ^ fingerprint).bit_count()
+                if distance < best_distance:
+                    best, best_distance = candidate, distance
+        return None if best is None else self._entries[(prompt_version, best)]
+
+    def _insert(self, key: tuple, result: dict):
+        """Add or refresh an entry and its band buckets. Call with the lock held."""
+        if key not in self._entries:
+            buckets = self._buckets.setdefault(key[0], {})
+            for band_key in self._band_keys(key[1]):
+                buckets.setdefault(band_key, set()).add(key[1])
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            (version, fingerprint), _ = self._entries.popitem(last=False)
+            buckets = self._buckets[version]
+            for band_key in self._band_keys(fingerprint):
+                bucket = buckets[band_key]
+                bucket.discard(fingerprint)
+                if not bucket:
+                    del buckets[band_key]
+            if not buckets:
+                del self._buckets[version]
+
+    def record_audit(self, reused: dict, actual: dict):
+        """Record whether an audited reuse agreed with the model."""
+        if reused["classification"] != actual["classification"]:
+            with self._lock:
+                self.counters["disagreements"] += 1
+
+    def add(self, email: tuple, prompt_version: str, result: dict):
+        """Index a classified email if its decision may be reused."""
+        if result["classification"] not in self.reuse_classifications:
+            return
+        key = (prompt_version, simhash(email[2], email[3]))
+        with self._lock:
+            self._insert(key, result)
+            self._unsaved += 1
+            should_save = self.path and self._unsaved >= self.save_every
+        if should_save:
+            self.save()
+
+    def save(self, path: str = None):
+        """Write the index to disk atomically (JSON)."""
+        path = path or self.path
+        with self._lock:
+            entries = [[version, f"{fp:016x}", result] for (version, fp), result in self._entries.items()]
+            self._unsaved = 0
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"format": 1, "entries": entries}, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str):
+        """Load entries written by ``save``, keeping at most ``max_entries``."""
+        with open(path) as f:
+            data = json.load(f)
+        with self._lock:
+            for version, fp, result in data["entries"][-self.max_entries:]:
+                self._insert((version, int(fp, 16)), result)
+
+    def stats(self) -> dict:
+        """Return reuse and audit disagreement rates."""
+        with self._lock:
+            c = dict(self.counters)
+            size = len(self._entries)
+        lookups, audits = c.get("lookups", 0), c.get("audits", 0)
+        return {
+            "lookups": lookups,
+            "matches": c.get("matches", 0),
+            "reuses": c.get("reuses", 0),
+            "audits": audits,
+            "disagreements": c.get("disagreements", 0),
+            "reuse_rate": c.get("reuses", 0) / lookups if lookups else 0.0,
+            "disagreement_rate": c.get("disagreements", 0) / audits if audits else 0.0,
+            "size": size,
+        }
+
+
+_similarity_index = None
+_similarity_index_configured = False
+_similarity_index_lock = threading.Lock()
+
+
+def create_similarity_index(spec: str):
+    """Create an index from a spec string.
+
+    Args:
+        spec: "off", "memory" or a file path to persist to.
+
+    Returns:
+        The index, or None when disabled.
+    """
+    if spec in ("", "off", "none"):
+        return None
+    if spec == "memory":
+        return SimilarityIndex()
+    index = SimilarityIndex(path=spec)
+    atexit.register(index.save)
+    return index
+
+
+def get_similarity_index():
+    """Get the process-wide similarity index, created from the environment on first use."""
+    global _similarity_index, _similarity_index_configured
+    if not _similarity_index_configured:
+        with _similarity_index_lock:
+            if not _similarity_index_configured:
+                _similarity_index = create_similarity_index(os.getenv("EMAIL_ASSISTANT_SIMILARITY_INDEX", "off"))
+                _similarity_index_configured = True
+    return _similarity_index
+
+
+def set_similarity_index(index):
+    """Replace the process-wide similarity index (None disables it)."""
+    global _similarity_index, _similarity_index_configured
+    with _similarity_index_lock:
+        _similarity_index = index
+        _similarity_index_configured = True
@@ -0,0 +1,172 @@
+"""Per-sender policy for speculative response drafting.
+
+When a sender's past emails were mostly classified ``respond``, the first
+agent step can start at the same time as triage instead of after it. The
+policy keeps per-sender classification counts and only speculates when the
+smoothed ``respond`` likelihood reaches the threshold. It also accounts for
+the outcome of every speculation: wall-clock time saved on hits versus
+tokens spent on discarded drafts.
+
+Speculation is off by default. ``EMAIL_ASSISTANT_SPECULATIVE`` enables it with
+``memory`` or a file path (sender history persisted as JSON), and
+``EMAIL_ASSISTANT_SPECULATIVE_THRESHOLD`` sets the likelihood (default 0.8).
+"""
+
+import atexit
+import json
+import os
+import threading
+from collections import Counter, OrderedDict
+from email.utils import parseaddr
+
+DEFAULT_THRESHOLD = float(os.getenv("EMAIL_ASSISTANT_SPECULATIVE_THRESHOLD", "0.8"))
+DEFAULT_MIN_OBSERVATIONS = int(os.getenv("EMAIL_ASSISTANT_SPECULATIVE_MIN_OBSERVATIONS", "3"))
+DEFAULT_MAX_SENDERS = 100000
+
+
+def sender_key(author: str) -> str:
+    """Normalize a From header to the bare, lowercased address."""
+    address = parseaddr(author or "")[1]
+    return (address or author or "").strip().lower()
+
+
+class SpeculationPolicy:
+    """Per-sender respond likelihoods and speculation outcome accounting."""
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        min_observations: int = DEFAULT_MIN_OBSERVATIONS,
+        max_senders: int = DEFAULT_MAX_SENDERS,
+        path: str = None,
+    ):
+        self.threshold = threshold
+        self.min_observations = min_observations
+        self.max_senders = max_senders
+        self.path = path
+        self.counters = Counter()
+        self.saved_seconds = 0.0
+        self.wasted_tokens = 0
+        self._senders = OrderedDict()  # sender -> [respond count, total count]
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def likelihood(self, author: str):
+        """Return the smoothed probability that the sender's email needs a response.
+
+        Returns:
+            The likelihood, or None with fewer than ``min_observations`` emails.
+        """
+        with self._lock:
+            respond, total = self._senders.get(sender_key(author), (0, 0))
+        if total < self.min_observations:
+            return None
+        return (respond + 1) / (total + 2)
+
+    def should_speculate(self, author: str) -> bool:
+        """Whether to start drafting before triage finishes."""
+        likelihood = self.likelihood(author)
+        return likelihood is not None and likelihood >= self.threshold
+
+    def observe(self, author: str, classification: str):
+        """Record a triage decision in the sender's history."""
+        key = sender_key(author)
+        with self._lock:
+            respond, total = self._senders.pop(key, (0, 0))
+            self._senders[key] = [respond + (classification == "respond"), total + 1]
+            while len(self._senders) > self.max_senders:
+                self._senders.popitem(last=False)
+
+    def record_hit(self, saved_seconds: float):
+        """Record a speculation that triage confirmed."""
+        with self._lock:
+            self.counters["hits"] += 1
+            self.saved_seconds += saved_seconds
+
+    def record_miss(self):
+        """Record a speculation discarded because triage did not say respond."""
+        with self._lock:
+            self.counters["misses"] += 1
+
+    def record_wasted_tokens(self, tokens: int):
+        """Add tokens spent on a discarded draft (may arrive after the miss)."""
+        with self._lock:
+            self.wasted_tokens += tokens
+
+    def save(self, path: str = None):
+        """Write the sender history to disk atomically (JSON)."""
+        path = path or self.path
+        with self._lock:
+            senders = [[key, respond, total] for key, (respond, total) in self._senders.items()]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"format": 1, "senders": senders}, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str):
+        """Load a sender history written by ``save``."""
+        with open(path) as f:
+            data = json.load(f)
+        with self._lock:
+            for key, respond, total in data["senders"][-self.max_senders:]:
+                self._senders[key] = [respond, total]
+
+    def stats(self) -> dict:
+        """Return hit rate, wall-clock time saved and tokens wasted."""
+        with self._lock:
+            hits, misses = self.counters["hits"], self.counters["misses"]
+            saved, wasted, senders = self.saved_seconds, self.wasted_tokens, len(self._senders)
+        speculations = hits + misses
+        return {
+            "threshold": self.threshold,
+            "senders": senders,
+            "speculations": speculations,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / speculations if speculations else 0.0,
+            "saved_seconds": saved,
+            "wasted_tokens": wasted,
+        }
+
+
+_speculation_policy = None
+_speculation_policy_configured = False
+_speculation_policy_lock = threading.Lock()
+
+
+def create_speculation_policy(spec: str):
+    """Create a policy from a spec string.
+
+    Args:
+        spec: "off", "memory" or a file path to persist sender history to.
+
+    Returns:
+        The policy, or None when speculation is disabled.
+    """
+    if spec in ("", "off", "none"):
+        return None
+    if spec == "memory":
+        return SpeculationPolicy()
+    policy = SpeculationPolicy(path=spec)
+    atexit.register(policy.save)
+    return policy
+
+
+def get_speculation_policy():
+    """Get the process-wide speculation policy, created from the environment on first use."""
+    global _speculation_policy, _speculation_policy_configured
+    if not _speculation_policy_configured:
+        with _speculation_policy_lock:
+            if not _speculation_policy_configured:
+                _speculation_policy = create_speculation_policy(os.getenv("EMAIL_ASSISTANT_SPECULATIVE", "off"))
+                _speculation_policy_configured = True
+    return _speculation_policy
+
+
+def set_speculation_policy(policy):
+    """Replace the process-wide speculation policy (None disables speculation)."""
+    global _speculation_policy, _speculation_policy_configured
+    with _speculation_policy_lock:
+        _speculation_policy = policy
+        _speculation_policy_configured = True
@@ -8,6 +8,12 @@ class GraphState(MessagesState):
     Attributes:
     email_input: email input
     classification_decision: classification decision
+    budget_usage: model calls, tokens and time spent by the agent loop (see utils.budget)
+    triage_reasoning: the router's reasoning for a respond decision
+    model_tier: the email's starting and current agent model tier (see utils.model_tiers)
     """
     email_input: dict
-    classification_decision: Literal["ignore", "respond", "notify"]
\ No newline at end of file
+    classification_decision: Literal["ignore", "respond", "notify"]
+    budget_usage: dict
+    triage_reasoning: str
+    model_tier: dict
@@ -0,0 +1,31 @@
+"""Small statistics helpers for reports and benchmarks."""
+
+
+def percentile(values, q: float) -> float:
+    """Return the q-th percentile (0-100) using linear interpolation.
+
+    Args:
+        values: Numbers to summarize.
+        q: Percentile between 0 and 100.
+
+    Returns:
+        The percentile, or 0.0 for an empty input.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(seconds) -> dict:
+    """Summarize latencies in seconds as p50/p90/p99/max milliseconds."""
+    ms = [s * 1000 for s in seconds]
+    return {
+        "p50_ms": percentile(ms, 50),
+        "p90_ms": percentile(ms, 90),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": max(ms, default=0.0),
+    }
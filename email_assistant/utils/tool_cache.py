@@ -0,0 +1,137 @@
+"""Per-thread memoization of read-only tool results.
+
+Within a ReAct loop the model often repeats a lookup such as
+``search_emails(query=...)`` with identical arguments. Results of read-only
+tools are cached under (thread_id, tool name, canonicalized args) and reused
+for the rest of the thread. Any mutating tool run in the thread
+(``write_email``, ``schedule_meeting``, ``update_event``) drops every entry of
+that thread, so a lookup never returns data older than the last write.
+Lookups may run alongside a write of the same message, so each result is
+stored with the invalidation generation taken before it ran, and is dropped
+if the thread was invalidated since.
+
+``EMAIL_ASSISTANT_TOOL_CACHE`` selects ``memory`` (default) or ``off``.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_THREADS = int(os.getenv("EMAIL_ASSISTANT_TOOL_CACHE_THREADS", "10000"))
+DEFAULT_TTL_SECONDS = float(os.getenv("EMAIL_ASSISTANT_TOOL_CACHE_TTL", "300"))
+
+
+def canonical_args(args: dict) -> str:
+    """Serialize tool arguments so equivalent calls compare equal.
+
+    Keys are sorted and None values dropped, since an omitted optional
+    argument and an explicit None mean the same call.
+    """
+    return json.dumps({k: v for k, v in args.items() if v is not None}, sort_keys=True, default=str)
+
+
+class ToolResultCache:
+    """Thread-scoped LRU + TTL cache of tool results with hit accounting."""
+
+    def __init__(self, max_threads: int = DEFAULT_MAX_THREADS, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self.avoided_calls = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._threads = OrderedDict()  # thread_id -> {(tool, args): (stored_at, result)}
+        self._invalidated = OrderedDict()  # thread_id -> generation of its last invalidation
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def generation(self) -> int:
+        """Return the invalidation generation; take it before running a call whose result ``set`` stores."""
+        with self._lock:
+            return self._generation
+
+    def get(self, thread_id: str, tool_name: str, args: dict):
+        """Return the cached result of a call, or None on a miss."""
+        key = (tool_name, canonical_args(args))
+        with self._lock:
+            entries = self._threads.get(thread_id)
+            entry = entries.get(key) if entries else None
+            if entry is not None and time.time() - entry[0] > self.ttl_seconds:
+                del entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._threads.move_to_end(thread_id)
+            self.avoided_calls += 1
+            return entry[1]
+
+    def set(self, thread_id: str, tool_name: str, args: dict, result, generation: int = None):
+        """Store a call result, evicting the least recently used threads.
+
+        With ``generation`` (from ``generation()`` before the call ran), the
+        result is dropped when the thread was invalidated while it ran.
+        """
+        with self._lock:
+            if generation is not None and self._invalidated.get(thread_id, -1) > generation:
+                return
+            entries = self._threads.setdefault(thread_id, {})
+            entries[(tool_name, canonical_args(args))] = (time.time(), result)
+            self._threads.move_to_end(thread_id)
+            while len(self._threads) > self.max_threads:
+                self._threads.popitem(last=False)
+
+    def invalidate(self, thread_id: str):
+        """Drop every cached result of a thread (after a mutating tool)."""
+        with self._lock:
+            self._generation += 1
+            self._invalidated[thread_id] = self._generation
+            self._invalidated.move_to_end(thread_id)
+            while len(self._invalidated) > self.max_threads:
+                self._invalidated.popitem(last=False)
+            if self._threads.pop(thread_id, None):
+                self.invalidations += 1
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._threads.clear()
+            self.avoided_calls = self.misses = self.invalidations = 0
+
+    def stats(self) -> dict:
+        """Return avoided backend calls, misses and invalidations."""
+        with self._lock:
+            entries = sum(len(e) for e in self._threads.values())
+            return {
+                "avoided_calls": self.avoided_calls,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "threads": len(self._threads),
+                "entries": entries,
+            }
+
+
+_tool_cache = None
+_tool_cache_configured = False
+_tool_cache_lock = threading.Lock()
+
+
+def get_tool_cache():
+    """Get the process-wide tool result cache, created from the environment on first use."""
+    global _tool_cache, _tool_cache_configured
+    if not _tool_cache_configured:
+        with _tool_cache_lock:
+            if not _tool_cache_configured:
+                spec = os.getenv("EMAIL_ASSISTANT_TOOL_CACHE", "memory")
+                _tool_cache = None if spec in ("", "off", "none") else ToolResultCache()
+                _tool_cache_configured = True
+    return _tool_cache
+
+
+def set_tool_cache(cache):
+    """Replace the process-wide tool result cache (None disables memoization)."""
+    global _tool_cache, _tool_cache_configured
+    with _tool_cache_lock:
+        _tool_cache = cache
+        _tool_cache_configured = True
@@ -0,0 +1,227 @@
+"""Content-addressed cache for triage decisions.
+
+Identical emails (alerts, newsletters, auto-replies) are classified once per
+prompt version. Keys hash the normalized ``parse_email`` output together with
+the rendered triage prompts and model, so editing a profile or the templates
+never serves a stale decision. Entries are bounded by an LRU size and a TTL.
+
+Backends:
+    - MemoryTriageCache: per-process, lock-protected OrderedDict.
+    - SQLiteTriageCache: a local SQLite file shared by every worker on the host.
+
+The active backend is chosen with ``EMAIL_ASSISTANT_TRIAGE_CACHE``:
+``memory`` (default), ``sqlite:<path>`` or ``off``.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("EMAIL_ASSISTANT_TRIAGE_CACHE_SIZE", "10000"))
+DEFAULT_TTL_SECONDS = float(os.getenv("EMAIL_ASSISTANT_TRIAGE_CACHE_TTL", "86400"))
+
+_whitespace = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    """Collapse runs of whitespace so re-wrapped copies hash the same."""
+    return _whitespace.sub(" ", text or "").strip()
+
+
+def triage_cache_key(email: tuple, prompt_version: str) -> str:
+    """Build the cache key for a parsed email.
+
+    Args:
+        email: The (author, to, subject, email_thread) tuple from parse_email.
+        prompt_version: Identifies the prompts and model used to classify.
+
+    Returns:
+        A hex sha256 digest.
+    """
+    author, to, subject, email_thread = email
+    payload = json.dumps(
+        [
+            prompt_version,
+            _normalize(author).lower(),
+            _normalize(to).lower(),
+            _normalize(subject),
+            _normalize(email_thread),
+        ]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def triage_prompt_version(*parts: str) -> str:
+    """Hash the rendered prompts and model name into a short version string."""
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class MemoryTriageCache:
+    """In-process LRU + TTL cache of triage results."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return the stored result dict for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: dict):
+        """Store a result dict, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            size = len(self._entries)
+        return _stats(self.hits, self.misses, size)
+
+
+class SQLiteTriageCache:
+    """LRU + TTL cache of triage results in a local SQLite file.
+
+    The file can be shared by several worker processes; SQLite serializes
+    writers and WAL mode keeps readers from blocking. Hit/miss counters are
+    per process.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS triage_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS triage_cache_lru ON triage_cache (last_used)")
+
+    def get(self, key: str):
+        """Return the stored result dict for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM triage_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM triage_cache WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE triage_cache SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value: dict):
+        """Store a result dict, evicting the least recently used entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO triage_cache (key, value, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM triage_cache WHERE key IN ("
+                " SELECT key FROM triage_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM triage_cache")
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM triage_cache").fetchone()[0]
+        return _stats(self.hits, self.misses, size)
+
+
+def _stats(hits: int, misses: int, size: int) -> dict:
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "size": size,
+    }
+
+
+def create_triage_cache(spec: str):
+    """Create a cache backend from a spec string.
+
+    Args:
+        spec: "memory", "sqlite:<path>" or "off".
+
+    Returns:
+        The cache instance, or None when caching is off.
+    """
+    if spec in ("", "off", "none"):
+        return None
+    if spec == "memory":
+        return MemoryTriageCache()
+    if spec.startswith("sqlite:"):
+        return SQLiteTriageCache(spec.removeprefix("sqlite:"))
+    raise ValueError(f"Invalid triage cache spec: {spec}")
+
+
+_triage_cache = None
+_triage_cache_configured = False
+_triage_cache_lock = threading.Lock()
+
+
+def get_triage_cache():
+    """Get the process-wide triage cache, created from the environment on first use."""
+    global _triage_cache, _triage_cache_configured
+    if not _triage_cache_configured:
+        with _triage_cache_lock:
+            if not _triage_cache_configured:
+                _triage_cache = create_triage_cache(os.getenv("EMAIL_ASSISTANT_TRIAGE_CACHE", "memory"))
+                _triage_cache_configured = True
+    return _triage_cache
+
+
+def set_triage_cache(cache):
+    """Replace the process-wide triage cache (None disables caching)."""
+    global _triage_cache, _triage_cache_configured
+    with _triage_cache_lock:
+        _triage_cache = cache
+        _triage_cache_configured = True
@@ -0,0 +1,210 @@
+"""Local triage classifier with a confidence gate in front of the router model.
+
+A multinomial naive Bayes model over hashed word features, trained from past
+``classification_decision`` outcomes. It runs on CPU in microseconds and only
+answers when its posterior probability reaches the threshold; otherwise
+triage defers to the router model.
+
+The model is stored as a versioned JSON artifact (see ``save``). Enable it
+with ``EMAIL_ASSISTANT_TRIAGE_CLASSIFIER=<path>`` and tune the gate with
+``EMAIL_ASSISTANT_TRIAGE_CLASSIFIER_THRESHOLD`` (default 0.9).
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+
+FORMAT_VERSION = 1
+DEFAULT_N_FEATURES = 2**18
+DEFAULT_THRESHOLD = float(os.getenv("EMAIL_ASSISTANT_TRIAGE_CLASSIFIER_THRESHOLD", "0.9"))
+CLASSES = ("ignore", "notify", "respond")
+
+_token = re.compile(r"[a-z]+|\d+")
+
+
+def email_features(email: tuple, n_features: int = DEFAULT_N_FEATURES) -> Counter:
+    """Hash an email into sparse bag-of-words feature counts.
+
+    Args:
+        email: The (author, to, subject, email_thread) tuple from parse_email.
+        n_features: Size of the hashed feature space.
+
+    Returns:
+        Counter mapping feature bucket to count.
+    """
+    author, _, subject, email_thread = email
+    counts = Counter()
+    for prefix, text in (("a:", author), ("s:", subject), ("b:", email_thread)):
+        words = ["#" if w.isdigit() else w for w in _token.findall((text or "").lower())]
+        for feature in [prefix + w for w in words] + [f"{prefix}{a} {b}" for a, b in zip(words, words[1:])]:
+            counts[zlib.crc32(feature.encode("utf-8")) % n_features] += 1
+    return counts
+
+
+class TriageClassifier:
+    """Multinomial naive Bayes over hashed email features."""
+
+    def __init__(self, class_log_prior: dict, feature_log_prob: dict, unseen_log_prob: dict,
+                 n_features: int = DEFAULT_N_FEATURES, version: str = None, metadata: dict = None):
+        self.class_log_prior = class_log_prior
+        self.feature_log_prob = feature_log_prob
+        self.unseen_log_prob = unseen_log_prob
+        self.n_features = n_features
+        self.version = version
+        self.metadata = metadata or {}
+
+    @classmethod
+    def train(cls, examples, n_features: int = DEFAULT_N_FEATURES, alpha: float = 1.0) -> "TriageClassifier":
+        """Fit the model.
+
+        Args:
+            examples: Iterable of (email tuple, classification) pairs.
+            n_features: Size of the hashed feature space.
+            alpha: Additive (Laplace) smoothing.
+
+        Returns:
+            The trained classifier.
+        """
+        doc_counts = Counter()
+        feature_counts = {c: Counter() for c in CLASSES}
+        for email, classification in examples:
+            doc_counts[classification] += 1
+            feature_counts[classification].update(email_features(email, n_features))
+
+        total_docs = sum(doc_counts.values())
+        if not total_docs:
+            raise ValueError("No training examples")
+
+        class_log_prior, feature_log_prob, unseen_log_prob = {}, {}, {}
+        for c in CLASSES:
+            # Unseen classes keep a tiny prior so they are never predicted confidently
+            class_log_prior[c] = math.log((doc_counts[c] + 1e-3) / (total_docs + 3e-3))
+            denominator = sum(feature_counts[c].values()) + alpha * n_features
+            feature_log_prob[c] = {
+                bucket: math.log((count + alpha) / denominator) for bucket, count in feature_counts[c].items()
+            }
+            unseen_log_prob[c] = math.log(alpha / denominator)
+
+        metadata = {"examples": total_docs, "class_counts": dict(doc_counts), "alpha": alpha}
+        model = cls(class_log_prior, feature_log_prob, unseen_log_prob, n_features, metadata=metadata)
+        model.version = model._content_hash()
+        return model
+
+    def predict(self, email: tuple):
+        """Classify an email.
+
+        Args:
+            email: The (author, to, subject, email_thread) tuple from parse_email.
+
+        Returns:
+            Tuple of (classification, posterior probability).
+        """
+        features = email_features(email, self.n_features)
+        scores = {}
+        for c in CLASSES:
+            log_prob, unseen = self.feature_log_prob[c], self.unseen_log_prob[c]
+            scores[c] = self.class_log_prior[c] + sum(
+                count * log_prob.get(bucket, unseen) for bucket, count in features.items()
+            )
+        best = max(scores, key=scores.get)
+        normalizer = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / normalizer
+
+    def _content_hash(self) -> str:
+        payload = json.dumps([self.class_log_prior, self.feature_log_prob, self.n_features], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+    def save(self, path):
+        """Write the model as a versioned JSON artifact."""
+        artifact = {
+            "format_version": FORMAT_VERSION,
+            "model_version": self.version,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "n_features": self.n_features,
+            "classes": list(CLASSES),
+            "class_log_prior": self.class_log_prior,
+            "unseen_log_prob": self.unseen_log_prob,
+            # Buckets as compact [index, log prob] pairs
+            "feature_log_prob": {c: [[b, p] for b, p in probs.items()] for c, probs in self.feature_log_prob.items()},
+            "metadata": self.metadata,
+        }
+        with open(path, "w") as f:
+            json.dump(artifact, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path) -> "TriageClassifier":
+        """Load a model written by ``save``."""
+        with open(path) as f:
+            artifact = json.load(f)
+        if artifact.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported classifier format: {artifact.get('format_version')}")
+        return cls(
+            artifact["class_log_prior"],
+            {c: dict(pairs) for c, pairs in artifact["feature_log_prob"].items()},
+            artifact["unseen_log_prob"],
+            artifact["n_features"],
+            version=artifact["model_version"],
+            metadata=artifact.get("metadata"),
+        )
+
+
+class ConfidenceGate:
+    """Answers triage with a classifier when it is confident enough."""
+
+    def __init__(self, classifier: TriageClassifier, threshold: float = DEFAULT_THRESHOLD):
+        self.classifier = classifier
+        self.threshold = threshold
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def classify(self, email: tuple):
+        """Return (classification, confidence) when confident, else None."""
+        classification, confidence = self.classifier.predict(email)
+        answered = confidence >= self.threshold
+        with self._lock:
+            self.counters["answered" if answered else "deferred"] += 1
+        return (classification, confidence) if answered else None
+
+    def stats(self) -> dict:
+        """Return how many emails were answered locally versus deferred."""
+        with self._lock:
+            answered, deferred = self.counters["answered"], self.counters["deferred"]
+        total = answered + deferred
+        return {
+            "model_version": self.classifier.version,
+            "threshold": self.threshold,
+            "answered": answered,
+            "deferred": deferred,
+            "llm_calls_avoided": answered / total if total else 0.0,
+        }
+
+
+_classifier_gate = None
+_classifier_gate_configured = False
+_classifier_gate_lock = threading.Lock()
+
+
+def get_classifier_gate():
+    """Get the process-wide confidence gate, loaded from the environment on first use."""
+    global _classifier_gate, _classifier_gate_configured
+    if not _classifier_gate_configured:
+        with _classifier_gate_lock:
+            if not _classifier_gate_configured:
+                path = os.getenv("EMAIL_ASSISTANT_TRIAGE_CLASSIFIER", "")
+                _classifier_gate = ConfidenceGate(TriageClassifier.load(path)) if path else None
+                _classifier_gate_configured = True
+    return _classifier_gate
+
+
+def set_classifier_gate(gate):
+    """Replace the process-wide confidence gate (None disables it)."""
+    global _classifier_gate, _classifier_gate_configured
+    with _classifier_gate_lock:
+        _classifier_gate = gate
+        _classifier_gate_configured = True
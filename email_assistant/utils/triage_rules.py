@@ -0,0 +1,148 @@
+"""Deterministic pre-triage rules that short-circuit obvious emails.
+
+Rules are loaded from a JSON file and compiled once. Each rule maps a set of
+field regexes (all must match) to an ``ignore`` or ``notify`` decision:
+
+    {"rules": [
+        {"name": "auto_reply_subject", "classification": "ignore",
+         "when": {"subject": "^auto-reply"}},
+        {"name": "bulk_sender", "classification": "ignore",
+         "when": {"author": "newsletter@", "headers.precedence": "^bulk$"}}
+    ]}
+
+Fields are ``author``, ``to``, ``subject``, ``email_thread`` and
+``headers.<name>`` (from ``email_input["headers"]``, case-insensitive).
+Patterns are case-insensitive searches. All patterns on a field are also
+combined into one regex, so an email that no rule can match costs a single
+pass per field. Rules are checked in file order and the first that fires wins.
+
+``EMAIL_ASSISTANT_TRIAGE_RULES`` points at the rules file, or disables the
+engine with ``off``. The bundled ``triage_rules.json`` is used by default.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("triage_rules.json")
+
+# Assumed model latency until a real router call has been timed
+DEFAULT_MODEL_LATENCY_S = 1.0
+
+_FIELDS = ("author", "to", "subject", "email_thread")
+
+
+class TriageRules:
+    """A compiled set of triage rules with hit and latency accounting."""
+
+    def __init__(self, rules: list):
+        self.rules = []
+        by_field = {}
+        for rule in rules:
+            if rule["classification"] not in ("ignore", "notify"):
+                raise ValueError(f"Rule {rule['name']!r}: classification must be 'ignore' or 'notify'")
+            conditions = []
+            for field, pattern in rule["when"].items():
+                field = field.lower()
+                if field not in _FIELDS and not field.startswith("headers."):
+                    raise ValueError(f"Rule {rule['name']!r}: unknown field {field!r}")
+                conditions.append((field, re.compile(pattern, re.IGNORECASE)))
+                by_field.setdefault(field, []).append(f"(?:{pattern})")
+            self.rules.append((rule["name"], rule["classification"], conditions))
+
+        # One alternation per field: a miss here means no rule can fire
+        self._prefilter = {
+            field: re.compile("|".join(patterns), re.IGNORECASE) for field, patterns in by_field.items()
+        }
+        self.hits = Counter()
+        self.evaluations = 0
+        self.eval_seconds = 0.0
+        self.saved_seconds = 0.0
+        self.model_latency_s = DEFAULT_MODEL_LATENCY_S
+        self._model_calls = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path) -> "TriageRules":
+        """Load and compile rules from a JSON file."""
+        with open(path) as f:
+            return cls(json.load(f)["rules"])
+
+    def match(self, email: tuple, headers: dict = None):
+        """Return the first rule that fires for an email.
+
+        Args:
+            email: The (author, to, subject, email_thread) tuple from parse_email.
+            headers: Optional raw email headers.
+
+        Returns:
+            Tuple of (rule name, classification), or None when no rule fires.
+        """
+        start = time.perf_counter()
+        values = dict(zip(_FIELDS, email))
+        for name, value in (headers or {}).items():
+            values[f"headers.{name.lower()}"] = str(value)
+
+        matched = None
+        if any(regex.search(values.get(field) or "") for field, regex in self._prefilter.items()):
+            for name, classification, conditions in self.rules:
+                if all(regex.search(values.get(field) or "") for field, regex in conditions):
+                    matched = (name, classification)
+                    break
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.evaluations += 1
+            self.eval_seconds += elapsed
+            if matched is not None:
+                self.hits[matched[0]] += 1
+                self.saved_seconds += max(self.model_latency_s - elapsed, 0.0)
+        return matched
+
+    def record_model_latency(self, seconds: float):
+        """Feed a timed router call into the running average used for savings."""
+        with self._lock:
+            self._model_calls += 1
+            self.model_latency_s += (seconds - self.model_latency_s) / self._model_calls
+
+    def stats(self) -> dict:
+        """Return per-rule hit counts and the latency saved."""
+        with self._lock:
+            fired = sum(self.hits.values())
+            return {
+                "evaluations": self.evaluations,
+                "fired": fired,
+                "hits": {name: self.hits[name] for name, _, _ in self.rules},
+                "avg_eval_ms": self.eval_seconds / self.evaluations * 1000 if self.evaluations else 0.0,
+                "model_latency_s": self.model_latency_s,
+                "saved_seconds": self.saved_seconds,
+            }
+
+
+_triage_rules = None
+_triage_rules_configured = False
+_triage_rules_lock = threading.Lock()
+
+
+def get_triage_rules():
+    """Get the process-wide rule engine, compiled from the rules file on first use."""
+    global _triage_rules, _triage_rules_configured
+    if not _triage_rules_configured:
+        with _triage_rules_lock:
+            if not _triage_rules_configured:
+                path = os.getenv("EMAIL_ASSISTANT_TRIAGE_RULES", str(DEFAULT_RULES_PATH))
+                _triage_rules = None if path in ("", "off", "none") else TriageRules.from_file(path)
+                _triage_rules_configured = True
+    return _triage_rules
+
+
+def set_triage_rules(rules):
+    """Replace the process-wide rule engine (None disables it)."""
+    global _triage_rules, _triage_rules_configured
+    with _triage_rules_lock:
+        _triage_rules = rules
+        _triage_rules_configured = True
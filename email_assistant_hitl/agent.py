@@ -1,14 +1,20 @@
 """HITL-enabled agent graph construction with conditional edges."""
 
+import threading
 from typing import Literal
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
 
 from email_assistant_hitl.utils import GraphState
-from email_assistant_hitl.nodes.triage_router import triage_router
-from email_assistant_hitl.nodes.notify_handler_hitl import notify_handler_hitl
-from email_assistant_hitl.nodes.agent_node_hitl import agent_node_hitl
-from email_assistant_hitl.nodes.action_handler_hitl import action_handler_hitl
+from email_assistant_hitl.nodes.triage_router import triage_router, atriage_router
+from email_assistant_hitl.nodes.notify_handler_hitl import notify_handler_hitl, anotify_handler_hitl
+from email_assistant_hitl.nodes.agent_node_hitl import agent_node_hitl, aagent_node_hitl
+from email_assistant_hitl.nodes.action_handler_hitl import action_handler_hitl, aaction_handler_hitl
+from email_assistant_hitl.nodes.budget_node import budget_exhausted
+from email_assistant_hitl.utils.budget import budget_from_config
+from email_assistant.utils.accounting import AccountingCallbackHandler
+from email_assistant.utils.metrics import MetricsCallbackHandler
 
 
 def should_respond(state: GraphState) -> Literal["agent_node_hitl", "notify_handler_hitl", "__end__"]:
@@ -49,11 +55,17 @@ def should_continue_after_review(state: GraphState) -> Literal["agent_node_hitl"
         return "__end__"
 
 
-def should_continue_drafting(state: GraphState) -> Literal["action_handler_hitl", "__end__"]:
+def should_continue_drafting(
+    state: GraphState, config: RunnableConfig = None
+) -> Literal["action_handler_hitl", "budget_exhausted", "__end__"]:
     """Determine if we should review the drafted action or end.
     
+    The tool calls of a model call that spent the email's budget are
+    neither reviewed nor run.
+
     Args:
         state: The current graph state.
+        config: The run config; may carry an ``email_budget`` override.
         
     Returns:
         The next node to route to.
@@ -62,19 +74,26 @@ def should_continue_drafting(state: GraphState) -> Literal["action_handler_hitl"
     last_message = messages[-1]
     
     if last_message.tool_calls:
+        if budget_from_config(config).exhausted(state.get("budget_usage")):
+            return "budget_exhausted"
         return "action_handler_hitl"
     
     # If no tool calls, the agent is done (sent a text response)
     return "__end__"
 
 
-def should_continue_after_action_review(state: GraphState) -> Literal["agent_node_hitl", "__end__"]:
+def should_continue_after_action_review(
+    state: GraphState, config: RunnableConfig = None
+) -> Literal["agent_node_hitl", "budget_exhausted", "__end__"]:
     """Route after action review based on user response.
     
-    If user ignored, workflow ends. Otherwise loop back to draft more actions.
+    If user ignored, workflow ends. If the email's call, token or time budget
+    is spent, it stops at budget_exhausted. Otherwise loop back to draft more actions.
     """
     if state.get("workflow_should_end"):
         return "__end__"
+    elif budget_from_config(config).exhausted(state.get("budget_usage")):
+        return "budget_exhausted"
     else:
         return "agent_node_hitl"
 
@@ -83,7 +102,13 @@ def create_graph(checkpointer=None):
     """Create and compile the HITL-enabled agent graph.
     
     Uses conditional edges throughout for clear routing logic.
-    Node names describe their purpose clearly.
+    Node names describe their purpose clearly. Building the graph never
+    renders the diagram; use the ``render-graph`` command for that. Token
+    usage of every model call is fed to the usage ledger, and latencies
+    (including time waiting at interrupts) to the metrics registry.
+
+    Args:
+        checkpointer: Optional checkpointer used to persist interrupts.
 
     Returns:
         A compiled LangGraph graph with HITL capabilities.
@@ -92,10 +117,13 @@ def create_graph(checkpointer=None):
     workflow = StateGraph(GraphState)
     
     # Add all nodes with descriptive names
-    workflow.add_node("triage_router", triage_router)
-    workflow.add_node("notify_handler_hitl", notify_handler_hitl)
-    workflow.add_node("agent_node_hitl", agent_node_hitl)
-    workflow.add_node("action_handler_hitl", action_handler_hitl)
+    # Every node has a sync and an async implementation, so invoke/stream
+    # and ainvoke/astream both run natively
+    workflow.add_node("triage_router", RunnableLambda(triage_router, afunc=atriage_router))
+    workflow.add_node("notify_handler_hitl", RunnableLambda(notify_handler_hitl, afunc=anotify_handler_hitl))
+    workflow.add_node("agent_node_hitl", RunnableLambda(agent_node_hitl, afunc=aagent_node_hitl))
+    workflow.add_node("action_handler_hitl", RunnableLambda(action_handler_hitl, afunc=aaction_handler_hitl))
+    workflow.add_node("budget_exhausted", budget_exhausted)
     
     # Start by classifying the email
     workflow.add_edge(START, "triage_router")
@@ -127,6 +155,7 @@ def create_graph(checkpointer=None):
         should_continue_drafting,
         {
             "action_handler_hitl": "action_handler_hitl",
+            "budget_exhausted": "budget_exhausted",
             "__end__": END,
         },
     )
@@ -137,16 +166,47 @@ def create_graph(checkpointer=None):
         should_continue_after_action_review,
         {
             "agent_node_hitl": "agent_node_hitl",
+            "budget_exhausted": "budget_exhausted",
             "__end__": END,
         },
     )
+    workflow.add_edge("budget_exhausted", END)
     
     graph = workflow.compile(checkpointer=checkpointer)
-    graph.get_graph().draw_mermaid_png(output_file_path="email_assistant_hitl/graph.png")
-    
+    # Set the handlers on the graph's own config so it stays a CompiledStateGraph
+    graph.config = {
+        **(graph.config or {}),
+        "callbacks": [AccountingCallbackHandler(), MetricsCallbackHandler("agent_hitl")],
+    }
     return graph
 
 
-# Create the HITL graph instance
-checkpointer = MemorySaver()
-graph = create_graph(checkpointer=checkpointer)
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_compiled_graph():
+    """Get the process-wide HITL graph instance, building it on first use.
+
+    The instance owns a ``MemorySaver`` checkpointer, so it must be shared
+    by every caller that resumes the same thread.
+
+    Returns:
+        The memoized compiled LangGraph graph.
+    """
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = create_graph(checkpointer=MemorySaver())
+    return _graph
+
+
+def __getattr__(name):
+    # Keep `from email_assistant_hitl.agent import graph` working without
+    # building the graph when the module is imported.
+    if name == "graph":
+        return get_compiled_graph()
+    if name == "checkpointer":
+        return get_compiled_graph().checkpointer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,9 +3,11 @@
 from email_assistant_hitl.helpers.email_parser import parse_email
 from email_assistant_hitl.helpers.email_formatter import format_email_markdown
 from email_assistant_hitl.helpers.hitl_helpers import format_tool_call_for_display
+from email_assistant_hitl.helpers.tokens import estimate_tokens
 
 __all__ = [
     "parse_email",
     "format_email_markdown",
     "format_tool_call_for_display",
+    "estimate_tokens",
 ]
@@ -1,13 +1,19 @@
 """Graph nodes for email assistant HITL."""
 
-from email_assistant_hitl.nodes.triage_router import triage_router
-from email_assistant_hitl.nodes.notify_handler_hitl import notify_handler_hitl
-from email_assistant_hitl.nodes.agent_node_hitl import agent_node_hitl
-from email_assistant_hitl.nodes.action_handler_hitl import action_handler_hitl
+from email_assistant_hitl.nodes.triage_router import triage_router, atriage_router
+from email_assistant_hitl.nodes.notify_handler_hitl import notify_handler_hitl, anotify_handler_hitl
+from email_assistant_hitl.nodes.agent_node_hitl import agent_node_hitl, aagent_node_hitl
+from email_assistant_hitl.nodes.action_handler_hitl import action_handler_hitl, aaction_handler_hitl
+from email_assistant_hitl.nodes.budget_node import budget_exhausted
 
 __all__ = [
     "triage_router",
+    "atriage_router",
     "notify_handler_hitl",
+    "anotify_handler_hitl",
     "agent_node_hitl",
+    "aagent_node_hitl",
     "action_handler_hitl",
+    "aaction_handler_hitl",
+    "budget_exhausted",
 ]
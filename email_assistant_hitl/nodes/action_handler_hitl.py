@@ -1,7 +1,16 @@
 """Tool call interrupt handler for HITL."""
 
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.types import interrupt
 from email_assistant_hitl.utils.state import GraphState
+from email_assistant.utils.tool_cache import get_tool_cache
 from email_assistant_hitl.helpers import parse_email, format_email_markdown
 from email_assistant_hitl.helpers.hitl_helpers import format_tool_call_for_display
 from email_assistant_hitl.tools import (
@@ -12,8 +21,13 @@ from email_assistant_hitl.tools import (
     search_events,
     update_event,
     Question,
+    READ_ONLY_TOOLS,
+    MUTATING_TOOLS,
 )
 
+# Worker threads for running read-only lookups concurrently (sync graph)
+DEFAULT_TOOL_WORKERS = int(os.getenv("EMAIL_ASSISTANT_TOOL_WORKERS", "8"))
+
 
 # Create a tools dictionary for easy lookup
 tools_by_name = {
@@ -27,7 +41,7 @@ tools_by_name = {
 }
 
 
-def action_handler_hitl(state: GraphState) -> GraphState:
+def action_handler_hitl(state: GraphState, config: RunnableConfig = None) -> GraphState:
     """Handle interrupts for tool calls that require human review.
     
     This node examines tool calls from the agent and:
@@ -35,33 +49,184 @@ def action_handler_hitl(state: GraphState) -> GraphState:
     2. Creates interrupts for high-risk tools (write_email, schedule_meeting, Question)
     3. Processes user responses (accept, edit, ignore, or respond with feedback)
     
+    Read-only lookups repeated within a thread are served from the
+    per-thread tool cache.
+
     Args:
         state: The current graph state containing messages with tool calls.
+        config: The run config; its ``thread_id`` scopes the tool cache.
         
     Returns:
         Updated state with tool results and optional workflow_should_end flag.
     """
+    thread_id = _thread_id(config)
+    steps = _review_tool_calls(state)
+    try:
+        calls = next(steps)
+        while True:
+            calls = steps.send(_run_tools(calls, thread_id))
+    except StopIteration as done:
+        return done.value
+
+
+async def aaction_handler_hitl(state: GraphState, config: RunnableConfig = None) -> GraphState:
+    """Async variant of ``action_handler_hitl``; tools run with ``ainvoke``."""
+    thread_id = _thread_id(config)
+    steps = _review_tool_calls(state)
+    try:
+        calls = next(steps)
+        while True:
+            calls = steps.send(await _arun_tools(calls, thread_id))
+    except StopIteration as done:
+        return done.value
+
+
+def _thread_id(config: RunnableConfig):
+    return ((config or {}).get("configurable") or {}).get("thread_id")
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(DEFAULT_TOOL_WORKERS, thread_name_prefix="hitl-tools")
+    return _executor
+
+
+class ToolFailure(str):
+    """Content of a tool call that failed; reported to the agent with ``status="error"``."""
+
+
+def _invoke(tool, args):
+    try:
+        return tool.invoke(args)
+    except Exception as e:
+        return ToolFailure(f"Error: {e!r}\n Please fix your mistakes.")
+
+
+async def _ainvoke(tool, args):
+    try:
+        return await tool.ainvoke(args)
+    except Exception as e:
+        return ToolFailure(f"Error: {e!r}\n Please fix your mistakes.")
+
+
+def _tool_result(observation, tool_call_id: str):
+    """The tool message of an observation; failures carry ``status="error"`` so model tiers can escalate."""
+    if isinstance(observation, ToolFailure):
+        return ToolMessage(content=str(observation), tool_call_id=tool_call_id, status="error")
+    return {"role": "tool", "content": observation, "tool_call_id": tool_call_id}
+
+
+def _split_cached(calls: list, thread_id):
+    """Serve read-only calls from the tool cache.
+
+    Returns:
+        Tuple of (cache or None, results with None for pending calls,
+        indexes of the calls that must run).
+    """
+    cache = get_tool_cache() if thread_id is not None else None
+    results, pending = [None] * len(calls), []
+    for i, (tool, args) in enumerate(calls):
+        if cache is not None and tool.name in MUTATING_TOOLS:
+            cache.invalidate(thread_id)
+        elif cache is not None and tool.name in READ_ONLY_TOOLS:
+            results[i] = cache.get(thread_id, tool.name, args)
+        if results[i] is None:
+            pending.append(i)
+    return cache, results, pending
+
+
+def _store_results(cache, thread_id, calls: list, results: list, pending: list):
+    for i in pending:
+        tool, args = calls[i]
+        if tool.name in MUTATING_TOOLS:
+            cache.invalidate(thread_id)
+        elif tool.name in READ_ONLY_TOOLS and not isinstance(results[i], ToolFailure):
+            cache.set(thread_id, tool.name, args, results[i])
+
+
+def _run_tools(calls: list, thread_id=None) -> list:
+    """Run (tool, args) pairs, concurrently when there are several; results keep call order."""
+    cache, results, pending = _split_cached(calls, thread_id)
+    if len(pending) == 1:
+        tool, args = calls[pending[0]]
+        results[pending[0]] = _invoke(tool, args)
+    elif pending:
+        # Copy the context so callbacks (tracing, accounting) see each call
+        executor = _get_executor()
+        futures = {
+            i: executor.submit(contextvars.copy_context().run, _invoke, calls[i][0], calls[i][1]) for i in pending
+        }
+        for i, future in futures.items():
+            results[i] = future.result()
+    if cache is not None:
+        _store_results(cache, thread_id, calls, results, pending)
+    return results
+
+
+async def _arun_tools(calls: list, thread_id=None) -> list:
+    """Async variant of ``_run_tools``."""
+    cache, results, pending = _split_cached(calls, thread_id)
+    observations = await asyncio.gather(*(_ainvoke(calls[i][0], calls[i][1]) for i in pending))
+    for i, observation in zip(pending, observations):
+        results[i] = observation
+    if cache is not None:
+        _store_results(cache, thread_id, calls, results, pending)
+    return results
+
+
+def _review_tool_calls(state: GraphState):
+    """Review and execute the last message's tool calls.
+
+    A generator shared by the sync and async nodes: it yields lists of
+    ``(tool, args)`` to execute, receives their observations back in the
+    same order, and returns the state update. A run of consecutive read-only
+    lookups is yielded as one batch so it runs concurrently; every other
+    call, and any lookup after it, runs in the original tool-call order.
+    """
     # Store messages/results
     result = []
     
     # Track if user ignored and we should end
     should_end_workflow = False
     
+    tool_calls = state["messages"][-1].tool_calls
+    
+    # Observations of the current run of read-only lookups
+    lookup_results = {}
+    
     # Iterate over tool calls in the last message
-    for tool_call in state["messages"][-1].tool_calls:
+    for i, tool_call in enumerate(tool_calls):
         
         # Tools that require human review
         hitl_tools = ["write_email", "schedule_meeting", "Question"]
         
         # If tool doesn't require HITL, execute directly
         if tool_call["name"] not in hitl_tools:
-            tool = tools_by_name[tool_call["name"]]
-            observation = tool.invoke(tool_call["args"])
-            result.append({
-                "role": "tool",
-                "content": observation,
-                "tool_call_id": tool_call["id"]
-            })
+            if i in lookup_results:
+                observation = lookup_results.pop(i)
+            elif tool_call["name"] in READ_ONLY_TOOLS:
+                # Run this lookup together with the read-only calls right after it
+                end = i
+                while end < len(tool_calls) and tool_calls[end]["name"] in READ_ONLY_TOOLS:
+                    end += 1
+                observations = yield [(tools_by_name[tc["name"]], tc["args"]) for tc in tool_calls[i:end]]
+                lookup_results = dict(zip(range(i, end), observations))
+                observation = lookup_results.pop(i)
+            elif tool_call["name"] not in tools_by_name:
+                observation = ToolFailure(
+                    f"Error: {tool_call['name']} is not a valid tool, try one of [{', '.join(tools_by_name)}]."
+                )
+            else:
+                tool = tools_by_name[tool_call["name"]]
+                [observation] = yield [(tool, tool_call["args"])]
+            result.append(_tool_result(observation, tool_call["id"]))
             continue
         
         # Get original email for context
@@ -115,12 +280,8 @@ def action_handler_hitl(state: GraphState) -> GraphState:
         if response["type"] == "accept":
             # Execute tool with original args
             tool = tools_by_name[tool_call["name"]]
-            observation = tool.invoke(tool_call["args"])
-            result.append({
-                "role": "tool",
-                "content": observation,
-                "tool_call_id": tool_call["id"]
-            })
+            [observation] = yield [(tool, tool_call["args"])]
+            result.append(_tool_result(observation, tool_call["id"]))
             
         elif response["type"] == "edit":
             # Get edited args from user
@@ -147,12 +308,8 @@ def action_handler_hitl(state: GraphState) -> GraphState:
             result.append(ai_message.model_copy(update={"tool_calls": updated_tool_calls}))
             
             # Execute tool with edited args
-            observation = tool.invoke(edited_args)
-            result.append({
-                "role": "tool",
-                "content": observation,
-                "tool_call_id": current_id
-            })
+            [observation] = yield [(tool, edited_args)]
+            result.append(_tool_result(observation, current_id))
             
         elif response["type"] == "ignore":
             # Don't execute tool, provide feedback to agent
@@ -1,7 +1,13 @@
 """Agent node for HITL email response reasoning and tool calling."""
 
+import time
+
 from email_assistant_hitl.utils.state import GraphState
-from email_assistant_hitl.utils.router import llm_with_tools_hitl
+from email_assistant_hitl.utils.router import get_llm_with_tools_hitl
+from email_assistant.utils.context_window import get_context_window
+from email_assistant_hitl.utils.budget import call_tokens, charge, start_usage
+from email_assistant.utils.model_tiers import get_tier_selector, tool_errors
+from email_assistant_hitl.helpers import parse_email
 from email_assistant_hitl.prompts import (
     agent_system_prompt,
     default_background,
@@ -10,7 +16,6 @@ from email_assistant_hitl.prompts import (
 )
 
 
-# HITL-specific tools prompt
 # HITL-specific tools prompt
 AGENT_TOOLS_PROMPT_HITL = """
 You have access to the following tools to help respond to emails:
@@ -46,6 +51,60 @@ Think step-by-step:
 """
 
 
+def _agent_messages(state: GraphState) -> list:
+    # Build the system prompt with all preferences
+    system_message = {
+        "role": "system",
+        "content": agent_system_prompt.format(
+            tools_prompt=AGENT_TOOLS_PROMPT_HITL,
+            background=default_background,
+            response_preferences=default_response_preferences,
+            cal_preferences=default_cal_preferences,
+        ),
+    }
+    return [system_message] + state["messages"]
+
+
+def _fit_context(messages: list) -> tuple:
+    # Shrink only the request; checkpointed state keeps the full history
+    window = get_context_window()
+    if window is None:
+        return messages, None
+    return window.fit(messages)
+
+
+def _record_context(response, report):
+    if report is not None:
+        response.response_metadata["context_window"] = report
+    return response
+
+
+def _model_tier(state: GraphState):
+    # First step scores the email; later steps keep its tier and escalate on tool failures
+    selector = get_tier_selector()
+    if selector is None:
+        return None
+    current = state.get("model_tier")
+    if not current:
+        tier = selector.select(parse_email(state["email_input"]), state.get("triage_reasoning") or "")
+        current = {"initial": tier, "tier": tier}
+    return selector.escalate(current, tool_errors(state["messages"]))
+
+
+def _llm(tier):
+    if tier is None:
+        return get_llm_with_tools_hitl()
+    return get_llm_with_tools_hitl(get_tier_selector().models[tier["tier"]])
+
+
+def _agent_update(usage: dict, messages: list, response, report, tier, seconds: float) -> dict:
+    update = {"messages": [_record_context(response, report)], "budget_usage": charge(usage, messages, response)}
+    if tier is not None:
+        get_tier_selector().record_call(tier["tier"], call_tokens(messages, response), seconds)
+        update["model_tier"] = tier
+    return update
+
+
 def agent_node_hitl(state: GraphState) -> GraphState:
     """Agent reasoning node for HITL where the LLM decides which actions to take.
     
@@ -56,20 +115,24 @@ def agent_node_hitl(state: GraphState) -> GraphState:
         state: The current graph state containing messages.
 
     Returns:
-        A dictionary with the LLM's response message (may include tool calls).
+        A dictionary with the LLM's response message (may include tool calls),
+        the email's budget usage including this call and, with model tiering
+        on, the email's model tier.
     """
-    # Build the system prompt with all preferences
-    system_message = {
-        "role": "system",
-        "content": agent_system_prompt.format(
-            tools_prompt=AGENT_TOOLS_PROMPT_HITL,
-            background=default_background,
-            response_preferences=default_response_preferences,
-            cal_preferences=default_cal_preferences,
-        ),
-    }
+    usage = state.get("budget_usage") or start_usage()
+    tier = _model_tier(state)
+    # Invoke the LLM with HITL tools on a request fitted to the context budget
+    messages, report = _fit_context(_agent_messages(state))
+    start = time.perf_counter()
+    response = _llm(tier).invoke(messages)
+    return _agent_update(usage, messages, response, report, tier, time.perf_counter() - start)
 
-    # Invoke the LLM with HITL tools
-    response = llm_with_tools_hitl.invoke([system_message] + state["messages"])
 
-    return {"messages": [response]}
+async def aagent_node_hitl(state: GraphState) -> GraphState:
+    """Async variant of ``agent_node_hitl``, used by ``graph.ainvoke``/``astream``."""
+    usage = state.get("budget_usage") or start_usage()
+    tier = _model_tier(state)
+    messages, report = _fit_context(_agent_messages(state))
+    start = time.perf_counter()
+    response = await _llm(tier).ainvoke(messages)
+    return _agent_update(usage, messages, response, report, tier, time.perf_counter() - start)
@@ -0,0 +1,30 @@
+"""Terminal node for emails whose agent loop ran out of budget."""
+
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+
+from email_assistant_hitl.utils.budget import budget_from_config
+from email_assistant_hitl.utils.state import GraphState
+
+
+def budget_exhausted(state: GraphState, config: RunnableConfig = None) -> GraphState:
+    """Stop the agent loop gracefully once a per-email budget is spent.
+
+    The messages so far stay in state as the partial result; this node only
+    records which budget ran out and closes the conversation.
+
+    Args:
+        state: The current graph state.
+        config: The run config; may carry an ``email_budget`` override.
+
+    Returns:
+        The final budget usage (with ``exhausted`` set) and a closing message.
+    """
+    usage = dict(state["budget_usage"])
+    usage["exhausted"] = budget_from_config(config).exhausted(usage)
+    usage["elapsed_s"] = time.time() - usage["started_at"]
+    print(f"⏱️ Budget exhausted ({usage['exhausted']}) after {usage['llm_calls']} model calls")
+    message = AIMessage(content=f"Stopped before finishing: the {usage['exhausted']} budget for this email is exhausted.")
+    return {"budget_usage": usage, "messages": [message]}
@@ -60,3 +60,12 @@ def notify_handler_hitl(state: GraphState) -> GraphState:
     else:
         # User ignored - return empty update (conditional edge will route to END)
         return {}
+
+
+async def anotify_handler_hitl(state: GraphState) -> GraphState:
+    """Async variant of ``notify_handler_hitl``.
+
+    The node only raises an interrupt, so there is nothing to await; it
+    exists so the async graph never hands the node to a worker thread.
+    """
+    return notify_handler_hitl(state)
@@ -2,7 +2,7 @@
 
 from typing import Literal
 from email_assistant_hitl.utils.state import GraphState
-from email_assistant_hitl.utils.router import llm_router
+from email_assistant_hitl.utils.router import get_llm_router
 from email_assistant_hitl.helpers import parse_email, format_email_markdown
 from email_assistant_hitl.prompts import (
     triage_system_prompt,
@@ -12,21 +12,9 @@ from email_assistant_hitl.prompts import (
 )
 
 
-def triage_router(state: GraphState) -> GraphState:
-    """Analyze email content to decide if we should respond, notify, or ignore.
-    
-    Args:
-        state: The current graph state containing the email input.
-        
-    Returns:
-        Updated state with classification and messages.
-    """
-    # Parse the email
-    author, to, subject, email_thread = parse_email(state["email_input"])
-    
-    # Create email markdown for display
-    email_markdown = format_email_markdown(subject, author, to, email_thread)
-    
+def _router_messages(email: tuple) -> list:
+    author, to, subject, email_thread = email
+
     # Format system prompt
     system_prompt = triage_system_prompt.format(
         background=default_background,
@@ -38,13 +26,17 @@ def triage_router(state: GraphState) -> GraphState:
         author=author, to=to, subject=subject, email_thread=email_thread
     )
     
-    # Run the router LLM
-    result = llm_router.invoke([
+    return [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt},
-    ])
-    
-    classification = result.classification
+    ]
+
+
+def _triage_update(email: tuple, classification: str, reasoning: str = None) -> GraphState:
+    author, to, subject, email_thread = email
+
+    # Create email markdown for display
+    email_markdown = format_email_markdown(subject, author, to, email_thread)
     
     # Update state based on classification
     update = {"classification_decision": classification}
@@ -55,6 +47,7 @@ def triage_router(state: GraphState) -> GraphState:
             "role": "user",
             "content": f"Respond to the email: {email_markdown}"
         }]
+        update["triage_reasoning"] = reasoning
         
     elif classification == "ignore":
         print("🚫 Classification: IGNORE - This email can be safely ignored")
@@ -66,3 +59,28 @@ def triage_router(state: GraphState) -> GraphState:
         raise ValueError(f"Invalid classification: {classification}")
     
     return update
+
+
+def triage_router(state: GraphState) -> GraphState:
+    """Analyze email content to decide if we should respond, notify, or ignore.
+    
+    Args:
+        state: The current graph state containing the email input.
+        
+    Returns:
+        Updated state with classification and messages.
+    """
+    # Parse the email
+    email = parse_email(state["email_input"])
+    
+    # Run the router LLM
+    result = get_llm_router().invoke(_router_messages(email))
+    
+    return _triage_update(email, result.classification, result.reasoning)
+
+
+async def atriage_router(state: GraphState) -> GraphState:
+    """Async variant of ``triage_router``, used by ``graph.ainvoke``/``astream``."""
+    email = parse_email(state["email_input"])
+    result = await get_llm_router().ainvoke(_router_messages(email))
+    return _triage_update(email, result.classification, result.reasoning)
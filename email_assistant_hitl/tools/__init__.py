@@ -9,6 +9,12 @@ from email_assistant_hitl.tools.calendar_tools import (
 )
 from email_assistant_hitl.tools.hitl_tools import Question
 
+# Lookups without side effects: safe to run concurrently or reuse.
+READ_ONLY_TOOLS = frozenset({"search_emails", "search_events", "check_calendar_availability"})
+
+# Tools that change mailbox or calendar state.
+MUTATING_TOOLS = frozenset({"write_email", "schedule_meeting", "update_event"})
+
 __all__ = [
     "write_email",
     "search_emails",
@@ -17,4 +23,6 @@ __all__ = [
     "search_events",
     "update_event",
     "Question",
+    "READ_ONLY_TOOLS",
+    "MUTATING_TOOLS",
 ]
@@ -1,6 +1,49 @@
 """Utility modules for email assistant HITL."""
 
 from email_assistant_hitl.utils.state import GraphState
-from email_assistant_hitl.utils.router import llm_router, llm_with_tools_hitl
+from email_assistant_hitl.utils.router import get_llm_router, get_llm_with_tools_hitl
+from email_assistant.utils.tool_cache import ToolResultCache, get_tool_cache, set_tool_cache
+from email_assistant.utils.context_window import ContextWindow, get_context_window, set_context_window
+from email_assistant.utils.accounting import UsageLedger, get_usage_ledger, set_usage_ledger
+from email_assistant.utils.metrics import MetricsRegistry, get_metrics, set_metrics, start_metrics_server
+from email_assistant.utils.rate_limiter import ModelRateLimiter, get_rate_limiter, set_rate_limiter
+from email_assistant.utils.model_tiers import TierSelector, get_tier_selector, set_tier_selector
+from email_assistant.utils.cassette import Cassette, get_cassette, set_cassette
 
-__all__ = ["GraphState", "llm_router", "llm_with_tools_hitl"]
+__all__ = [
+    "GraphState",
+    "get_llm_router",
+    "get_llm_with_tools_hitl",
+    "ToolResultCache",
+    "get_tool_cache",
+    "set_tool_cache",
+    "ContextWindow",
+    "get_context_window",
+    "set_context_window",
+    "UsageLedger",
+    "get_usage_ledger",
+    "set_usage_ledger",
+    "MetricsRegistry",
+    "get_metrics",
+    "set_metrics",
+    "start_metrics_server",
+    "ModelRateLimiter",
+    "get_rate_limiter",
+    "set_rate_limiter",
+    "TierSelector",
+    "get_tier_selector",
+    "set_tier_selector",
+    "Cassette",
+    "get_cassette",
+    "set_cassette",
+    "llm_router",
+    "llm_with_tools_hitl",
+]
+
+
+def __getattr__(name):
+    if name in ("llm_router", "llm_with_tools_hitl"):
+        from email_assistant_hitl.utils import router
+
+        return getattr(router, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,8 @@
 """Router schema and LLM initialization for email triage HITL."""
-from langchain_openai import ChatOpenAI
 from typing import Literal
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+from email_assistant.utils.router import get_llm
 from email_assistant_hitl.tools import (
     write_email,
     schedule_meeting,
@@ -11,7 +11,6 @@ from email_assistant_hitl.tools import (
     update_event,
     search_emails,
     Question,
-    Question,
 )
 
 load_dotenv()
@@ -30,10 +29,7 @@ class RouterSchema(BaseModel):
     )
 
 
-# Initialize the router LLM with structured output for email classification
-llm_router = ChatOpenAI(model="gpt-4o-mini").with_structured_output(RouterSchema)
-
-# Initialize the HITL LLM with additional tools (Question)
+# HITL tool set, including the additional Question tool
 tools_hitl = [
     write_email,
     search_emails,
@@ -44,4 +40,26 @@ tools_hitl = [
     Question,
 ]
 
-llm_with_tools_hitl = ChatOpenAI(model="gpt-4o", temperature=0).bind_tools(tools_hitl)
+
+def get_llm_router():
+    """Get the router LLM with structured output for email classification.
+
+    The runnable comes from the shared registry of ``email_assistant``, so it
+    reuses the pooled HTTP clients, goes through the process-wide rate
+    limiter and is recorded or replayed when a cassette is active.
+    """
+    return get_llm("gpt-4o-mini", schema=RouterSchema)
+
+
+def get_llm_with_tools_hitl(model_name: str = "gpt-4o"):
+    """Get the HITL LLM bound to the HITL tools (including Question), from the shared registry."""
+    return get_llm(model_name, tools=tools_hitl, temperature=0)
+
+
+def __getattr__(name):
+    # Module-level singletons kept for compatibility, created on first access.
+    if name == "llm_router":
+        return get_llm_router()
+    if name == "llm_with_tools_hitl":
+        return get_llm_with_tools_hitl()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -9,7 +9,13 @@ class GraphState(MessagesState):
     email_input: email input
     classification_decision: classification decision
     workflow_should_end: flag set by interrupt_handler when user ignores
+    budget_usage: model calls, tokens and time spent by the agent loop (see utils.budget)
+    triage_reasoning: the router's reasoning for a respond decision
+    model_tier: the email's starting and current agent model tier (see utils.model_tiers)
     """
     email_input: dict
     classification_decision: Literal["ignore", "respond", "notify"]
-    workflow_should_end: Optional[bool] = None
\ No newline at end of file
+    workflow_should_end: Optional[bool] = None
+    budget_usage: Optional[dict] = None
+    triage_reasoning: Optional[str] = None
+    model_tier: Optional[dict] = None
\ No newline at end of file
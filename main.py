@@ -1,7 +1,32 @@
+import argparse
+
 from email_assistant.agent import graph
+from email_assistant.streaming import stream_email
+
+
+def print_stream(email_data, config):
+    """Print tokens, tool calls and node transitions as they happen."""
+    for event in stream_email(email_data, graph, config):
+        if event.kind == "node_start":
+            print(f"\n[{event.node}]", flush=True)
+        elif event.kind == "token":
+            print(event.data["text"], end="", flush=True)
+        elif event.kind == "tool_start":
+            print(f"\n-> {event.data['name']}({event.data['input']})", flush=True)
+        elif event.kind == "tool_end":
+            print(f"<- {event.data['output']}", flush=True)
+        elif event.kind == "done":
+            ttft = event.data["ttft_s"]
+            print(f"\n\nTime to first token: {f'{ttft:.2f}s' if ttft is not None else 'n/a'}")
+            print(f"Total latency: {event.data['total_s']:.2f}s")
 
-def main():
+
+def main(argv=None):
     """Run the email assistant agent."""
+    parser = argparse.ArgumentParser(description="Run the email assistant on a sample email.")
+    parser.add_argument("--stream", action="store_true", help="Print output as it is generated")
+    args = parser.parse_args(argv)
+
     email_data = {
         "author": "Sarah Johnson <sarah.johnson@company.com>",
         "to": "Martin Robatto <martin.robatto@company.com>",
@@ -27,6 +52,10 @@ def main():
     
     # Run the graph with thread_id config for checkpointer
     config = {"configurable": {"thread_id": "test-email-1"}}
+    if args.stream:
+        print_stream(email_data, config)
+        return
+
     result = graph.invoke({"email_input": email_data}, config=config)
     print(result["messages"][-1].content)
 